@@ -13,37 +13,103 @@
 # limitations under the License.
 from __future__ import annotations
 
+import faulthandler
+import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal
 
 import click
 from click import group, pass_context
-from rich import prompt
-from rich.padding import Padding
-from rich.table import Table
 
 from dma.__about__ import __version__ as current_version
 from dma.cli._utils import console
-from dma.collector.dependencies import provide_canonical_queries
-from dma.collector.workflows.collection_extractor.base import CollectionExtractor
-from dma.collector.workflows.readiness_check.base import ReadinessCheck
-from dma.lib.db.base import SourceInfo
-from dma.lib.db.local import get_duckdb_connection
+from dma.lib.db.governor import DEFAULT_LATENCY_THRESHOLD, DEFAULT_LOCK_TIMEOUT, DEFAULT_STATEMENT_TIMEOUT
+from dma.lib.db.local import (
+    MEMORY_LIMIT_ENV,
+    TEMP_DIRECTORY_ENV,
+    THREADS_ENV,
+    ResourceProfile,
+    resolve_resource_profile,
+)
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE
+from dma.lib.exceptions import ApplicationError
 
 if TYPE_CHECKING:
     from click import Context
     from rich.console import Console
 
+    from dma.collector.workflows.base import ExportFormat
+    from dma.lib.db.base import SourceInfo
+    from dma.lib.db.governor import SourceLimits
+
+# Each command imports its workflow, and with it the database drivers, DuckDB and Arrow, when it runs, so that
+# `dma --help` and the other commands don't pay for the imports of every command.
+
 __all__ = ("app",)
 
+DELTA_HELP = (
+    "Compare schema fingerprints with the last complete collection in the export database and only run the catalog "
+    "and table detail queries for schemas that changed.  A schema counts as changed when any of its objects was "
+    "altered, written to or scanned since that collection, so the results carried over for the other schemas, "
+    "including their statistics, are the same as a full collection would return."
+)
+
 
 @group(name="DMA", context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--duckdb-threads",
+    help=f"The number of threads the local DuckDB database may use.  Defaults to the CPU limit of the container, or the CPUs of the host.  Can also be set with `{THREADS_ENV}`.",
+    default=None,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--duckdb-memory-limit",
+    help=f"The memory the local DuckDB database may use, as a size such as `4GB` or a percentage of the available memory such as `50%`.  Defaults to 80% of the memory limit of the container, or the memory of the host.  Can also be set with `{MEMORY_LIMIT_ENV}`.",
+    default=None,
+    type=str,
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--duckdb-temp-directory",
+    help=f"The directory the local DuckDB database spills to when it runs out of memory.  Defaults to the working path of the command.  Can also be set with `{TEMP_DIRECTORY_ENV}`.",
+    default=None,
+    type=click.Path(file_okay=False),
+    required=False,
+    show_default=False,
+)
 @pass_context
-def app(ctx: Context) -> None:
+def app(
+    ctx: Context,
+    duckdb_threads: int | None = None,
+    duckdb_memory_limit: str | None = None,
+    duckdb_temp_directory: str | None = None,
+) -> None:
     """Database Migration Assessment"""
+    # the process' own stderr, as the stream the command writes to isn't always backed by a file
+    if sys.__stderr__ is not None and not faulthandler.is_enabled():
+        faulthandler.enable(file=sys.__stderr__)
+    # exported, so the assessment processes started by `fleet-check` use the same resource profile
+    for env, value in (
+        (THREADS_ENV, duckdb_threads),
+        (MEMORY_LIMIT_ENV, duckdb_memory_limit),
+        (TEMP_DIRECTORY_ENV, duckdb_temp_directory),
+    ):
+        if value is not None:
+            os.environ[env] = str(value)
+    # resolved once, so an invalid setting fails before any command runs, and shared with the command
+    ctx.obj = resolve_resource_profile()
 
 
+@app.command(
+    name="collect-data",
+    no_args_is_help=True,
+    short_help="Collect data from a source database into a local assessment database.",
+)
 @click.option(
     "--no-prompt",
     help="Do not prompt for confirmation before executing check.",
@@ -116,6 +182,117 @@ def app(ctx: Context) -> None:
     required=False,
     show_default=False,
 )
+@click.option(
+    "--export",
+    "-e",
+    help="Path to export the results.  Required to resume a collection.",
+    default=None,
+    type=click.Path(),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--working-path",
+    "-wp",
+    help="Path to store the temporary artifacts during collection.",
+    default=None,
+    type=click.Path(),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--export-format",
+    help="The format of the export.  `parquet` writes zstd compressed Parquet files partitioned by table and collection, which `import-assessments` can combine across many assessments.",
+    default="csv",
+    type=click.Choice(["csv", "parquet"]),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--collection-concurrency",
+    "-cc",
+    help="The maximum number of collection queries to execute concurrently against the source database.",
+    default=1,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--database-concurrency",
+    "-dc",
+    help="The maximum number of databases to collect per database queries from concurrently.",
+    default=1,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--async-collection",
+    help="Collect data over asyncio connections.  Queries are executed concurrently to hide the round trip latency to the source database.  Only supported for Postgres and MySQL.",
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--resume",
+    help="Resume the last unfinished collection in the export database.  Queries and databases that were already collected are skipped.",
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--delta",
+    help=DELTA_HELP,
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--fetch-size",
+    help="The number of rows fetched from the source database per round trip.  Large collection queries are streamed from a server side cursor in chunks of this size.",
+    default=DEFAULT_BATCH_SIZE,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--statement-timeout",
+    help="The seconds a collection query may run on the source database before it is cancelled.  Use 0 to disable the timeout.",
+    default=DEFAULT_STATEMENT_TIMEOUT,
+    type=click.FloatRange(min=0),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--lock-timeout",
+    help="The seconds a collection query may wait for a lock on the source database before it is cancelled.  Use 0 to disable the timeout.",
+    default=DEFAULT_LOCK_TIMEOUT,
+    type=click.FloatRange(min=0),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--max-active-sessions",
+    help="Throttle the collection while the source database has more active sessions than this.  By default, the collection is only throttled by the latency of the source.",
+    default=None,
+    type=click.IntRange(min=0),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--max-source-latency",
+    help="Throttle the collection while the source database takes longer than this many seconds to answer a probe query.",
+    default=DEFAULT_LATENCY_THRESHOLD,
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    show_default=True,
+)
 def collect_data(
     no_prompt: bool,
     db_type: Literal["mysql", "postgres", "mssql", "oracle"],
@@ -125,8 +302,26 @@ def collect_data(
     port: int | None = None,
     database: str | None = None,
     collection_identifier: str | None = None,
+    export: str | None = None,
+    working_path: str | None = None,
+    export_format: ExportFormat = "csv",
+    collection_concurrency: int = 1,
+    database_concurrency: int = 1,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+    async_collection: bool = False,
+    resume: bool = False,
+    delta: bool = False,
+    statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    max_active_sessions: int | None = None,
+    max_source_latency: float = DEFAULT_LATENCY_THRESHOLD,
 ) -> None:
     """Process a collection of advisor extracts."""
+    from rich import prompt  # noqa: PLC0415
+
+    from dma.lib.db.base import SourceInfo  # noqa: PLC0415
+    from dma.lib.db.governor import SourceLimits  # noqa: PLC0415
+
     print_app_info()
     console.rule("Starting data collection process", align="left")
     if hostname is None:
@@ -152,6 +347,21 @@ def collect_data(
             ),
             database=database,
             collection_identifier=collection_identifier,
+            working_path=Path(working_path) if working_path else None,
+            export_path=Path(export) if export else None,
+            export_format=export_format,
+            collection_concurrency=collection_concurrency,
+            database_concurrency=database_concurrency,
+            fetch_size=fetch_size,
+            async_collection=async_collection,
+            resume=resume,
+            delta=delta,
+            source_limits=SourceLimits(
+                statement_timeout=statement_timeout,
+                lock_timeout=lock_timeout,
+                max_active_sessions=max_active_sessions,
+                latency_threshold=max_source_latency,
+            ),
         )
     else:
         console.rule("Skipping execution until input is confirmed", align="left")
@@ -165,21 +375,54 @@ def _collect_data(
     working_path: Path | None = None,
     export_path: Path | None = None,
     export_delimiter: str = "|",
+    export_format: ExportFormat = "csv",
+    collection_concurrency: int = 1,
+    database_concurrency: int = 1,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+    async_collection: bool = False,
+    resume: bool = False,
+    delta: bool = False,
+    source_limits: SourceLimits | None = None,
 ) -> None:
+    from dma.collector.dependencies import provide_canonical_queries  # noqa: PLC0415
+    from dma.collector.workflows.collection_extractor.base import (  # noqa: PLC0415
+        AsyncCollectionExtractor,
+        CollectionExtractor,
+    )
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
     _execution_id = f"{src_info.db_type}_{current_version!s}_{datetime.now(tz=timezone.utc).strftime('%y%m%d%H%M%S')}"
-    with get_duckdb_connection(working_path=working_path, export_path=export_path) as local_db:
+    if (resume or delta) and export_path is None:
+        msg = "An export path is required to resume a collection or to run a delta collection."
+        raise ApplicationError(msg)
+    with get_duckdb_connection(
+        working_path=working_path, export_path=export_path, resource_profile=_resource_profile()
+    ) as local_db:
         canonical_query_manager = next(provide_canonical_queries(local_db=local_db, working_path=working_path))
-        collection_extractor = CollectionExtractor(
+        extractor_class = AsyncCollectionExtractor if async_collection else CollectionExtractor
+        collection_extractor = extractor_class(
             local_db=local_db,
             src_info=src_info,
             database=database,
             canonical_query_manager=canonical_query_manager,
             console=console,
             collection_identifier=collection_identifier,
+            collection_concurrency=collection_concurrency,
+            database_concurrency=database_concurrency,
+            fetch_size=fetch_size,
+            resume=resume,
+            delta=delta,
+            source_limits=source_limits,
         )
         collection_extractor.execute()
         if collection_extractor is not None and export_path is not None:
-            collection_extractor.dump_database(export_path=export_path, delimiter=export_delimiter)
+            collection_extractor.dump_database(
+                export_path=export_path,
+                delimiter=export_delimiter,
+                export_format=export_format,
+                collection_key=collection_identifier
+                or f"{src_info.db_type}_{src_info.hostname}_{src_info.port}_{database}",
+            )
         console.rule("Assessment complete.", align="left")
 
 
@@ -278,6 +521,99 @@ def _collect_data(
     required=False,
     show_default=False,
 )
+@click.option(
+    "--export-format",
+    help="The format of the export.  `parquet` writes zstd compressed Parquet files partitioned by table and collection, which `import-assessments` can combine across many assessments.",
+    default="csv",
+    type=click.Choice(["csv", "parquet"]),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--collection-concurrency",
+    "-cc",
+    help="The maximum number of collection queries to execute concurrently against the source database.",
+    default=1,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--database-concurrency",
+    "-dc",
+    help="The maximum number of databases to collect per database queries from concurrently.",
+    default=1,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--async-collection",
+    help="Collect data over asyncio connections.  Queries are executed concurrently to hide the round trip latency to the source database.  Only supported for Postgres and MySQL.",
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--resume",
+    help="Resume the last unfinished collection in the export database.  Queries and databases that were already collected are skipped.",
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--delta",
+    help=DELTA_HELP,
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+@click.option(
+    "--fetch-size",
+    help="The number of rows fetched from the source database per round trip.  Large collection queries are streamed from a server side cursor in chunks of this size.",
+    default=DEFAULT_BATCH_SIZE,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--statement-timeout",
+    help="The seconds a collection query may run on the source database before it is cancelled.  Use 0 to disable the timeout.",
+    default=DEFAULT_STATEMENT_TIMEOUT,
+    type=click.FloatRange(min=0),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--lock-timeout",
+    help="The seconds a collection query may wait for a lock on the source database before it is cancelled.  Use 0 to disable the timeout.",
+    default=DEFAULT_LOCK_TIMEOUT,
+    type=click.FloatRange(min=0),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--max-active-sessions",
+    help="Throttle the collection while the source database has more active sessions than this.  By default, the collection is only throttled by the latency of the source.",
+    default=None,
+    type=click.IntRange(min=0),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--max-source-latency",
+    help="Throttle the collection while the source database takes longer than this many seconds to answer a probe query.",
+    default=DEFAULT_LATENCY_THRESHOLD,
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    show_default=True,
+)
 def readiness_assessment(
     no_prompt: bool,
     db_type: Literal["mysql", "postgres", "mssql", "oracle"],
@@ -289,8 +625,24 @@ def readiness_assessment(
     collection_identifier: str | None = None,
     export: str | None = None,
     working_path: str | None = None,
+    export_format: ExportFormat = "csv",
+    collection_concurrency: int = 1,
+    database_concurrency: int = 1,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+    async_collection: bool = False,
+    resume: bool = False,
+    delta: bool = False,
+    statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT,
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    max_active_sessions: int | None = None,
+    max_source_latency: float = DEFAULT_LATENCY_THRESHOLD,
 ) -> None:
     """Process a collection of advisor extracts."""
+    from rich import prompt  # noqa: PLC0415
+
+    from dma.lib.db.base import SourceInfo  # noqa: PLC0415
+    from dma.lib.db.governor import SourceLimits  # noqa: PLC0415
+
     print_app_info()
     console.rule("Starting data collection process", align="left")
     if hostname is None:
@@ -318,6 +670,19 @@ def readiness_assessment(
             collection_identifier=collection_identifier,
             working_path=Path(working_path) if working_path else None,
             export_path=Path(export) if export else None,
+            export_format=export_format,
+            collection_concurrency=collection_concurrency,
+            database_concurrency=database_concurrency,
+            fetch_size=fetch_size,
+            async_collection=async_collection,
+            resume=resume,
+            delta=delta,
+            source_limits=SourceLimits(
+                statement_timeout=statement_timeout,
+                lock_timeout=lock_timeout,
+                max_active_sessions=max_active_sessions,
+                latency_threshold=max_source_latency,
+            ),
         )
     else:
         console.rule("Skipping execution until input is confirmed", align="left")
@@ -331,9 +696,27 @@ def _readiness_check(
     working_path: Path | None = None,
     export_path: Path | None = None,
     export_delimiter: str = "|",
+    export_format: ExportFormat = "csv",
+    collection_concurrency: int = 1,
+    database_concurrency: int = 1,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+    async_collection: bool = False,
+    resume: bool = False,
+    delta: bool = False,
+    source_limits: SourceLimits | None = None,
 ) -> None:
+    from rich.padding import Padding  # noqa: PLC0415
+
+    from dma.collector.workflows.readiness_check.base import ReadinessCheck  # noqa: PLC0415
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
     _execution_id = f"{src_info.db_type}_{current_version!s}_{datetime.now(tz=timezone.utc).strftime('%y%m%d%H%M%S')}"
-    with get_duckdb_connection(working_path=working_path, export_path=export_path) as local_db:
+    if (resume or delta) and export_path is None:
+        msg = "An export path is required to resume a collection or to run a delta collection."
+        raise ApplicationError(msg)
+    with get_duckdb_connection(
+        working_path=working_path, export_path=export_path, resource_profile=_resource_profile()
+    ) as local_db:
         workflow = ReadinessCheck(
             local_db=local_db,
             src_info=src_info,
@@ -341,20 +724,316 @@ def _readiness_check(
             console=console,
             collection_identifier=collection_identifier,
             working_path=working_path,
+            collection_concurrency=collection_concurrency,
+            database_concurrency=database_concurrency,
+            fetch_size=fetch_size,
+            async_collection=async_collection,
+            resume=resume,
+            delta=delta,
+            source_limits=source_limits,
         )
         workflow.execute()
         console.print(Padding("", 1, expand=True))
         console.rule("Processing collected data.", align="left")
         workflow.print_summary()
         if workflow.collection_extractor is not None and export_path is not None:
-            workflow.collection_extractor.dump_database(export_path=export_path, delimiter=export_delimiter)
+            workflow.collection_extractor.dump_database(
+                export_path=export_path,
+                delimiter=export_delimiter,
+                export_format=export_format,
+                collection_key=collection_identifier
+                or f"{src_info.db_type}_{src_info.hostname}_{src_info.port}_{database}",
+            )
         console.rule("Assessment complete.", align="left")
 
 
+@app.command(
+    name="fleet-check",
+    no_args_is_help=True,
+    short_help="Run the readiness check against every database in an inventory file.",
+)
+@click.option(
+    "--inventory",
+    "-i",
+    help="A CSV or YAML file listing the databases to assess.  Each entry requires `db_type`, `hostname`, `port`, `database` and `username`, and accepts `password`, `password_env` and `collection_key`.",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--export",
+    "-e",
+    help="Path to export the combined results.",
+    type=click.Path(),
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--working-path",
+    "-wp",
+    help="Path to store the per database assessments.  Defaults to a `hosts` directory under the export path.",
+    default=None,
+    type=click.Path(),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--max-workers",
+    "-w",
+    help="The maximum number of databases to assess at the same time.",
+    default=4,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--timeout",
+    help="The number of seconds a single assessment may run before it is stopped.",
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--retries",
+    help="The number of times to retry an assessment that failed or timed out.",
+    default=1,
+    type=click.IntRange(min=0),
+    required=False,
+    show_default=True,
+)
+@click.option(
+    "--warehouse",
+    help="Keep each assessment in memory and stream its tables to the fleet database as Arrow batches, so the fleet database is the only database written.  A single process appends every assessment to it, partitioned by `collection_key`, which lets a long lived fleet database collect many concurrent assessments without per database files.",
+    type=bool,
+    default=False,
+    required=False,
+    show_default=True,
+    is_flag=True,
+)
+def fleet_check(
+    inventory: str,
+    export: str,
+    working_path: str | None = None,
+    max_workers: int = 4,
+    timeout: float | None = None,
+    retries: int = 1,
+    warehouse: bool = False,
+) -> None:
+    """Assess a fleet of databases and combine the results into a single assessment database."""
+    print_app_info()
+    console.rule("Starting fleet assessment", align="left")
+    _fleet_check(
+        console=console,
+        inventory_path=Path(inventory),
+        export_path=Path(export),
+        working_path=Path(working_path) if working_path else None,
+        max_workers=max_workers,
+        timeout=timeout,
+        retries=retries,
+        warehouse=warehouse,
+    )
+
+
+def _fleet_check(
+    console: Console,
+    inventory_path: Path,
+    export_path: Path,
+    working_path: Path | None = None,
+    max_workers: int = 4,
+    timeout: float | None = None,
+    retries: int = 1,
+    warehouse: bool = False,
+) -> None:
+    from rich.padding import Padding  # noqa: PLC0415
+
+    from dma.collector.workflows.fleet_check.base import FleetCheck, load_inventory  # noqa: PLC0415
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
+    targets = load_inventory(inventory_path)
+    export_path.mkdir(parents=True, exist_ok=True)
+    with get_duckdb_connection(
+        working_path=working_path, export_path=export_path, resource_profile=_resource_profile()
+    ) as fleet_db:
+        workflow = FleetCheck(
+            fleet_db=fleet_db,
+            targets=targets,
+            console=console,
+            work_path=working_path or export_path / "hosts",
+            max_workers=max_workers,
+            timeout=timeout,
+            retries=retries,
+            warehouse=warehouse,
+            resource_profile=_resource_profile(),
+        )
+        workflow.execute()
+        console.print(Padding("", 1, expand=True))
+        workflow.print_summary()
+        console.rule("Fleet assessment complete.", align="left")
+
+
+@app.command(
+    name="import-assessments",
+    no_args_is_help=True,
+    short_help="Combine Parquet assessment exports into a single assessment database.",
+)
+@click.argument(
+    "exports",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--export",
+    "-e",
+    help="Path to write the combined assessment database to.  The database holds views over the Parquet exports, which are read in place.",
+    type=click.Path(),
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--working-path",
+    "-wp",
+    help="Path to store the temporary artifacts during the import.",
+    default=None,
+    type=click.Path(),
+    required=False,
+    show_default=False,
+)
+def import_assessments(
+    exports: tuple[str, ...],
+    export: str,
+    working_path: str | None = None,
+) -> None:
+    """Combine the Parquet exports of many assessments into a single assessment database."""
+    print_app_info()
+    console.rule("Importing assessments", align="left")
+    _import_assessments(
+        console=console,
+        export_paths=[Path(path) for path in exports],
+        target_path=Path(export),
+        working_path=Path(working_path) if working_path else None,
+    )
+
+
+def _import_assessments(
+    console: Console,
+    export_paths: list[Path],
+    target_path: Path,
+    working_path: Path | None = None,
+) -> None:
+    from dma.collector.workflows.assessment_import.base import AssessmentImport  # noqa: PLC0415
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
+    target_path.mkdir(parents=True, exist_ok=True)
+    with get_duckdb_connection(
+        working_path=working_path, export_path=target_path, resource_profile=_resource_profile()
+    ) as local_db:
+        workflow = AssessmentImport(local_db=local_db, export_paths=export_paths, console=console)
+        workflow.execute()
+        workflow.print_summary()
+        console.rule("Import complete.", align="left")
+
+
+@app.command(
+    name="import-collections",
+    no_args_is_help=True,
+    short_help="Load the archives written by the collection scripts into a local assessment database.",
+)
+@click.argument(
+    "collections",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+)
+@click.option(
+    "--export",
+    "-e",
+    help="Path to write the assessment database to.",
+    type=click.Path(),
+    required=True,
+    show_default=False,
+)
+@click.option(
+    "--working-path",
+    "-wp",
+    help="Path to unpack the collection archives to during the import.",
+    default=None,
+    type=click.Path(),
+    required=False,
+    show_default=False,
+)
+@click.option(
+    "--max-workers",
+    "-w",
+    help="The maximum number of collection archives to unpack at the same time.",
+    default=4,
+    type=click.IntRange(min=1),
+    required=False,
+    show_default=True,
+)
+def import_collections(
+    collections: str,
+    export: str,
+    working_path: str | None = None,
+    max_workers: int = 4,
+) -> None:
+    """Load a directory of `opdb_*` archives written by the Postgres and MySQL collection scripts into the canonical tables."""
+    print_app_info()
+    console.rule("Importing collections", align="left")
+    _import_collections(
+        console=console,
+        collections_path=Path(collections),
+        export_path=Path(export),
+        working_path=Path(working_path) if working_path else None,
+        max_workers=max_workers,
+    )
+
+
+def _import_collections(
+    console: Console,
+    collections_path: Path,
+    export_path: Path,
+    working_path: Path | None = None,
+    max_workers: int = 4,
+) -> None:
+    from rich.padding import Padding  # noqa: PLC0415
+
+    from dma.collector.dependencies import provide_canonical_queries  # noqa: PLC0415
+    from dma.collector.workflows.collection_import.base import CollectionImport  # noqa: PLC0415
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
+    export_path.mkdir(parents=True, exist_ok=True)
+    with get_duckdb_connection(
+        working_path=working_path, export_path=export_path, resource_profile=_resource_profile()
+    ) as local_db:
+        workflow = CollectionImport(
+            local_db=local_db,
+            canonical_query_manager=next(provide_canonical_queries(local_db=local_db)),
+            collections_path=collections_path,
+            console=console,
+            work_path=working_path,
+            max_workers=max_workers,
+        )
+        workflow.execute()
+        console.print(Padding("", 1, expand=True))
+        workflow.print_summary()
+        console.rule("Import complete.", align="left")
+
+
 def print_app_info() -> None:
+    from rich.table import Table  # noqa: PLC0415
+
     table = Table(show_header=False)
     table.add_column("title", style="cyan", width=80)
     table.add_row(
         f"[bold green]Google Database Migration Assessment[/]                [cyan]version {current_version}[/]"
     )
+    table.add_row(f"[dim]DuckDB: {_resource_profile().describe()}[/]")
     console.print(table)
+
+
+def _resource_profile() -> ResourceProfile:
+    """Get the resource profile the `app` group resolved for the running command."""
+    ctx = click.get_current_context(silent=True)
+    resource_profile = ctx.find_root().obj if ctx is not None else None
+    return resource_profile if isinstance(resource_profile, ResourceProfile) else resolve_resource_profile()
@@ -13,20 +13,31 @@
 # limitations under the License.
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
 
 from dma.collector.query_managers.base import CanonicalQueryManager
 from dma.lib.db.local import get_duckdb_connection
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE
+from dma.lib.db.query_registry import load_queries
 from dma.lib.exceptions import ApplicationError
+from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
-    from collections.abc import Generator, Iterator
+    from collections.abc import Callable, Generator, Iterator
+    from contextlib import AbstractContextManager
     from pathlib import Path
 
     import duckdb
+    from aiosql.queries import Queries
+    from sqlalchemy import Engine
     from sqlalchemy.orm import Session
 
     from dma.collector.query_managers.base import CollectionQueryManager
+    from dma.lib.db.governor import CollectionGovernor
+    from dma.types import SupportedSources
+
+_root_path = module_to_os_path("dma")
 
 
 def provide_collection_query_manager(
@@ -34,21 +45,34 @@ def provide_collection_query_manager(
     execution_id: str | None = None,
     source_id: str | None = None,
     manual_id: str | None = None,
+    collection_concurrency: int = 1,
+    db_version: str | None = None,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+    governor: CollectionGovernor | None = None,
 ) -> Iterator[CollectionQueryManager]:
     """Provide collection query manager.
 
     Uses SQLAlchemy Connection management to establish and retrieve a valid database session.
 
     The driver dialect is detected from the session and the underlying raw DBAPI connection is fetched and passed to the Query Manager.
+
+    When `collection_concurrency` is greater than 1, the query manager is also given a connection provider that checks out
+    additional raw connections from the engine pool so that independent collection queries can run in parallel.
+
+    A `governor` shared by the query managers of a collection paces their queries by the load of the source.
     """
     dialect = db_session.bind.dialect if db_session.bind is not None else db_session.get_bind().dialect
     db_connection = db_session.connection()
 
-    raw_connection = db_connection.engine.raw_connection()
+    # the driver connection of the session, so it goes back to the engine pool when the session is closed
+    raw_connection = db_connection.connection
     if not raw_connection.driver_connection:
         msg = "Unable to fetch raw connection from session."
         raise ApplicationError(msg)
     rdbms_type = dialect.name
+    connection_provider = (
+        _provide_driver_connection(db_connection.engine, rdbms_type) if collection_concurrency > 1 else None
+    )
     if rdbms_type == "postgresql":
         from psycopg.rows import dict_row  # noqa: PLC0415
 
@@ -60,6 +84,11 @@ def provide_collection_query_manager(
             manual_id=manual_id,
             source_id=source_id,
             execution_id=execution_id,
+            db_version=db_version,
+            connection_provider=connection_provider,
+            collection_concurrency=collection_concurrency,
+            fetch_size=fetch_size,
+            governor=governor,
         )
     elif rdbms_type == "mysql":
         from dma.collector.query_managers.mysql import MySQLCollectionQueryManager  # noqa: PLC0415
@@ -69,6 +98,11 @@ def provide_collection_query_manager(
             manual_id=manual_id,
             source_id=source_id,
             execution_id=execution_id,
+            db_version=db_version,
+            connection_provider=connection_provider,
+            collection_concurrency=collection_concurrency,
+            fetch_size=fetch_size,
+            governor=governor,
         )
     elif rdbms_type == "oracle":
         from dma.collector.query_managers.oracle import OracleCollectionQueryManager  # noqa: PLC0415
@@ -78,6 +112,11 @@ def provide_collection_query_manager(
             manual_id=manual_id,
             source_id=source_id,
             execution_id=execution_id,
+            db_version=db_version,
+            connection_provider=connection_provider,
+            collection_concurrency=collection_concurrency,
+            fetch_size=fetch_size,
+            governor=governor,
         )
     elif rdbms_type == "mssql":
         from dma.collector.query_managers.mssql import SQLServerCollectionQueryManager  # noqa: PLC0415
@@ -87,6 +126,11 @@ def provide_collection_query_manager(
             manual_id=manual_id,
             source_id=source_id,
             execution_id=execution_id,
+            db_version=db_version,
+            connection_provider=connection_provider,
+            collection_concurrency=collection_concurrency,
+            fetch_size=fetch_size,
+            governor=governor,
         )
     else:
         msg = "Unable to identify driver adapter from dialect."
@@ -94,6 +138,74 @@ def provide_collection_query_manager(
     yield query_manager
 
 
+def _provide_driver_connection(engine: Engine, rdbms_type: str) -> Callable[[], AbstractContextManager[Any]]:
+    """Build a factory of raw driver connections checked out from the engine pool.
+
+    Each connection is configured the same way as the primary collection connection and is returned to the pool on exit.
+    """
+
+    @contextmanager
+    def _driver_connection() -> Generator[Any, None, None]:
+        pooled_connection = engine.raw_connection()
+        try:
+            if rdbms_type == "postgresql":
+                from psycopg.rows import dict_row  # noqa: PLC0415
+
+                pooled_connection.driver_connection.row_factory = dict_row  # type: ignore[union-attr]
+            yield pooled_connection.driver_connection
+        finally:
+            pooled_connection.close()
+
+    return _driver_connection
+
+
+def provide_async_collection_query_manager(
+    db_type: SupportedSources,
+    execution_id: str | None = None,
+    source_id: str | None = None,
+    manual_id: str | None = None,
+    db_version: str | None = None,
+    fetch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[CollectionQueryManager]:
+    """Provide a collection query manager for asynchronous collection.
+
+    The queries are loaded with the async aiosql adapter of the driver.  The query manager isn't bound to a
+    connection; an async driver connection is passed to each of its `*_async` methods instead.
+    """
+    if db_type == "POSTGRES":
+        from dma.collector.query_managers.postgres import PostgresCollectionQueryManager  # noqa: PLC0415
+
+        query_manager: CollectionQueryManager = PostgresCollectionQueryManager(
+            connection=None,
+            queries=_load_async_queries("postgres", "apsycopg"),
+            manual_id=manual_id,
+            source_id=source_id,
+            execution_id=execution_id,
+            db_version=db_version,
+            fetch_size=fetch_size,
+        )
+    elif db_type == "MYSQL":
+        from dma.collector.query_managers.mysql import MySQLCollectionQueryManager  # noqa: PLC0415
+
+        query_manager = MySQLCollectionQueryManager(
+            connection=None,
+            queries=_load_async_queries("mysql", "asyncmy"),
+            manual_id=manual_id,
+            source_id=source_id,
+            execution_id=execution_id,
+            db_version=db_version,
+            fetch_size=fetch_size,
+        )
+    else:
+        msg = f"{db_type} is not implemented for asynchronous collection."
+        raise ApplicationError(msg)
+    yield query_manager
+
+
+def _load_async_queries(source: str, driver_adapter: str) -> Queries:
+    return load_queries(_root_path / "collector/sql/sources" / source, driver_adapter)
+
+
 def provide_canonical_queries(
     local_db: duckdb.DuckDBPyConnection | None = None,
     working_path: Path | None = None,
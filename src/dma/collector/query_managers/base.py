@@ -13,19 +13,31 @@
 # limitations under the License.
 from __future__ import annotations
 
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from typing import TYPE_CHECKING, Any, cast
 
-import aiosql
 import psycopg
 from rich.padding import Padding
 
 from dma.cli._utils import console
-from dma.lib.db.query_manager import QueryManager
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE, QueryManager
+from dma.lib.db.query_registry import load_queries
 from dma.lib.exceptions import ApplicationError
 from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+    from contextlib import AbstractContextManager
+
+    import pyarrow as pa
     from aiosql.queries import Queries
+    from rich.status import Status
+
+    from dma.lib.db.governor import CollectionGovernor
 
 _root_path = module_to_os_path("dma")
 
@@ -39,12 +51,10 @@ class CanonicalQueryManager(QueryManager):
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        queries: Queries = aiosql.from_path(
-            sql_path=f"{_root_path}/collector/sql/canonical/",
-            driver_adapter="duckdb",
-            mandatory_parameters=False,
-        ),
+        queries: Queries | None = None,
     ) -> None:
+        if queries is None:
+            queries = load_queries(_root_path / "collector/sql/canonical", "duckdb")
         self.execution_id = execution_id
         self.source_id = source_id
         self.manual_id = manual_id
@@ -65,6 +75,9 @@ class CanonicalQueryManager(QueryManager):
 class CollectionQueryManager(QueryManager):
     """Collection Query Manager"""
 
+    uses_bind_parameters: bool = True
+    """Whether the collection scripts take the execution identifiers as bind parameters."""
+
     def __init__(
         self,
         connection: Any,
@@ -74,12 +87,23 @@ class CollectionQueryManager(QueryManager):
         manual_id: str | None = None,
         db_version: str | None = None,
         expected_queries: set[str] | None = None,
+        connection_provider: Callable[[], AbstractContextManager[Any]] | None = None,
+        collection_concurrency: int = 1,
+        fetch_size: int = DEFAULT_BATCH_SIZE,
+        governor: CollectionGovernor | None = None,
     ) -> None:
         self.execution_id = execution_id
         self.source_id = source_id
         self.manual_id = manual_id
         self.db_version = db_version
         self.expected_collection_queries = expected_queries
+        self.connection_provider = connection_provider
+        self.collection_concurrency = max(collection_concurrency, 1)
+        self.fetch_size = fetch_size
+        self.delta_schemas: dict[str, list[str]] = {}
+        self.governor = governor
+        # keyed by identity, and holding on to the connections so an identity is never reused for another one
+        self._limited_connections: dict[int, Any] = {}
         super().__init__(connection, queries)
 
     def get_collection_queries(self) -> set[str]:
@@ -99,6 +123,24 @@ class CollectionQueryManager(QueryManager):
         msg = "Implement this execution method."
         raise NotImplementedError(msg)
 
+    def get_schema_fingerprints(self) -> dict[str, str]:
+        """Get a fingerprint of each schema that changes when the objects or the data in the schema change.
+
+        Returns an empty dictionary when the source doesn't provide a `fingerprint` query.
+        """
+        results: dict[str, str] = {}
+        for script in self.available_queries("fingerprint"):
+            results.update((row["schema_name"], row["fingerprint"]) for row in self.select(script))
+        return results
+
+    def delta_schema_column(self, script: str) -> str | None:
+        """Get the schema column of a script that supports delta collection.
+
+        These scripts are declared with a `delta:<column>` tag and only collect the schemas in the
+        `DMA_DELTA_SCHEMAS` bind parameter when it is set.
+        """
+        return next((tag.split(":", 1)[1] for tag in self.query_tags(script) if tag.startswith("delta:")), None)
+
     def get_db_version(self) -> str:
         if self.db_version is None:
             msg = "Database Version was not set.  Ensure the initialization step complete successfully."
@@ -170,21 +212,11 @@ class CollectionQueryManager(QueryManager):
         *args: Any,
         **kwargs: Any,
     ) -> dict[str, Any]:
-        """Execute pre-processing queries."""
-        self.set_identifiers(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
-        console.print(Padding("COLLECTION QUERIES", 1, style="bold", expand=True), width=80)
-        with console.status("[bold green]Executing queries...[/]") as status:
-            results: dict[str, Any] = {}
-            for script in self.get_collection_queries():
-                status.update(rf" [yellow]*[/] Executing [bold magenta]`{script}`[/]")
-                script_result = self.select(
-                    script, PKEY=self.execution_id, DMA_SOURCE_ID=self.source_id, DMA_MANUAL_ID=self.manual_id
-                )
-                results[script] = script_result
-                status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
-            if not self.get_collection_queries():
-                status.console.print(" [dim grey]:heavy_check_mark: No collection queries for this database type[/]")
-            return results
+        """Execute collection queries and return the rows of each result set."""
+        results = _rows_by_script(
+            self.stream_collection_queries(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
+        )
+        return {script: results.get(script, []) for script in self.get_collection_queries()}
 
     def execute_extended_collection_queries(
         self,
@@ -194,52 +226,331 @@ class CollectionQueryManager(QueryManager):
         *args: Any,
         **kwargs: Any,
     ) -> dict[str, Any]:
-        """Execute extended collection queries.
+        """Execute extended collection queries and return the rows of each result set."""
+        results = _rows_by_script(
+            self.stream_extended_collection_queries(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
+        )
+        return {script: results.get(script, []) for script in self.get_extended_collection_queries()}
+
+    def execute_per_db_collection_queries(
+        self,
+        execution_id: str | None = None,
+        source_id: str | None = None,
+        manual_id: str | None = None,
+        *args: Any,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Execute per DB queries and return the rows of each result set."""
+        return _rows_by_script(
+            self.stream_per_db_collection_queries(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
+        )
+
+    def stream_collection_queries(
+        self,
+        execution_id: str | None = None,
+        source_id: str | None = None,
+        manual_id: str | None = None,
+        skip_scripts: set[str] | None = None,
+        on_script_complete: Callable[[str], None] | None = None,
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """Execute collection queries, yielding each result set as Arrow record batches paired with the script name.
 
-        Returns: None
+        Scripts in `skip_scripts` are not executed.  `on_script_complete` is called with the name of each script once
+        every batch of its result set was consumed.
         """
         self.set_identifiers(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
+        console.print(Padding("COLLECTION QUERIES", 1, style="bold", expand=True), width=80)
+        with console.status("[bold green]Executing queries...[/]") as status:
+            yield from self._stream_collection_scripts(
+                self.get_collection_queries() - (skip_scripts or set()), status, on_script_complete
+            )
+            if not self.get_collection_queries():
+                status.console.print(" [dim grey]:heavy_check_mark: No collection queries for this database type[/]")
+
+    def stream_extended_collection_queries(
+        self,
+        execution_id: str | None = None,
+        source_id: str | None = None,
+        manual_id: str | None = None,
+        skip_scripts: set[str] | None = None,
+        on_script_complete: Callable[[str], None] | None = None,
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """Execute extended collection queries, yielding Arrow record batches paired with the script name."""
+        self.set_identifiers(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
         console.print(Padding("EXTENDED COLLECTION QUERIES", 1, style="bold", expand=True), width=80)
         with console.status("[bold green]Executing queries...[/]") as status:
-            results: dict[str, Any] = {}
-            for script in self.get_extended_collection_queries():
-                status.update(rf" [yellow]*[/] Executing [bold magenta]`{script}`[/]")
-                script_result = self.select(
-                    script, PKEY=self.execution_id, DMA_SOURCE_ID=self.source_id, DMA_MANUAL_ID=self.manual_id
-                )
-                results[script] = script_result
-                status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
+            yield from self._stream_collection_scripts(
+                self.get_extended_collection_queries() - (skip_scripts or set()), status, on_script_complete
+            )
             if not self.get_extended_collection_queries():
                 console.print(" [dim grey]:heavy_check_mark: No extended collection queries for this database type[/]")
-            return results
 
-    def execute_per_db_collection_queries(
+    def stream_per_db_collection_queries(
         self,
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        *args: Any,
-        **kwargs: Any,
-    ) -> dict[str, Any]:
-        """Execute per DB pre-processing queries."""
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """Execute per DB queries, yielding Arrow record batches paired with the script name."""
         self.set_identifiers(execution_id=execution_id, source_id=source_id, manual_id=manual_id)
         console.print(Padding("PER DB QUERIES", 1, style="bold", expand=True), width=80)
         with console.status("[bold green]Executing queries...[/]") as status:
-            results: dict[str, Any] = {}
-            for script in self.get_per_db_collection_queries():
-                status.update(rf" [yellow]*[/] Executing [bold magenta]`{script}`[/]")
-                try:
-                    script_result = self.select(
-                        script, PKEY=self.execution_id, DMA_SOURCE_ID=self.source_id, DMA_MANUAL_ID=self.manual_id
-                    )
-                    results[script] = script_result
-                    status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
-                except psycopg.errors.UndefinedTable:
-                    status.console.print(rf"Skipped `{script}` as the table doesn't exist")
-                except psycopg.errors.InsufficientPrivilege:
-                    status.console.print(rf"Skipped `{script}` due to insufficient privileges.")
+            with self._governed("per_db"):
+                results = self._select_per_db_scripts(sorted(self.get_per_db_collection_queries()))
+            for script, (batches, skip_reason) in results.items():
+                if skip_reason is not None:
+                    status.console.print(skip_reason)
+                    continue
+                for batch in batches:
+                    yield script, batch
+                status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
             if not self.get_per_db_collection_queries():
                 status.console.print(
                     " [dim grey]:heavy_check_mark: No DB specific collection queries for this database type[/]"
                 )
-            return results
+
+    def gather_per_db_collection_queries(
+        self,
+        execution_id: str | None = None,
+        source_id: str | None = None,
+        manual_id: str | None = None,
+        db_version: str | None = None,
+    ) -> tuple[dict[str, list[pa.RecordBatch]], list[str]]:
+        """Execute per DB queries without writing to the console.
+
+        This is used when several databases are collected at once from worker threads.  Console output is left
+        to the caller, so the messages for scripts that were skipped are returned along with the result sets.
+
+        Returns:
+            The Arrow record batches keyed by script name and the list of skip messages.
+        """
+        self.set_identifiers(execution_id=execution_id, source_id=source_id, manual_id=manual_id, db_version=db_version)
+        results: dict[str, list[pa.RecordBatch]] = {}
+        skipped: list[str] = []
+        with self._governed("per_db"):
+            per_db_results = self._select_per_db_scripts(sorted(self.get_per_db_collection_queries()))
+        for script, (batches, skip_reason) in per_db_results.items():
+            if skip_reason is not None:
+                skipped.append(skip_reason)
+                continue
+            results[script] = batches
+        return results, skipped
+
+    def _select_per_db_scripts(self, scripts: list[str]) -> dict[str, tuple[list[pa.RecordBatch], str | None]]:
+        """Execute the per DB scripts in order, returning the batches and the skip message of each script."""
+        return {script: self._select_per_db_script(script) for script in scripts}
+
+    def _select_per_db_script(self, script: str) -> tuple[list[pa.RecordBatch], str | None]:
+        """Execute a per DB script, returning a skip message instead of raising for missing objects or privileges.
+
+        The batches of a script are only returned once the whole result set was fetched, so a script that fails
+        part way through never leaves partial results behind.
+        """
+        try:
+            return list(self._select_script_batches(script)), None
+        except (psycopg.errors.UndefinedTable, psycopg.errors.InsufficientPrivilege) as exc:
+            return [], _per_db_skip_reason(script, exc)
+
+    def _select_script_batches(self, script: str, connection: Any | None = None) -> Iterator[pa.RecordBatch]:
+        """Select the batches of a collection script.
+
+        Scripts tagged as `large` are streamed from a server side cursor when the driver supports it.
+        """
+        return self.select_batches(
+            script,
+            batch_size=self.fetch_size,
+            connection=connection,
+            server_side="large" in self.query_tags(script),
+            PKEY=self.execution_id,
+            DMA_SOURCE_ID=self.source_id,
+            DMA_MANUAL_ID=self.manual_id,
+            DMA_DELTA_SCHEMAS=self.delta_schemas.get(script),
+        )
+
+    def _stream_collection_scripts(
+        self, scripts: set[str], status: Status, on_script_complete: Callable[[str], None] | None = None
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """Execute collection scripts and yield their Arrow record batches paired with the script name.
+
+        When a connection provider is configured and the collection concurrency is greater than 1, independent
+        scripts are executed in parallel on a bounded pool of source connections.  Otherwise, each script is
+        executed sequentially on the query manager's connection.
+        """
+        if self.connection_provider is None or self.collection_concurrency <= 1 or len(scripts) <= 1:
+            for script in sorted(scripts):
+                status.update(rf" [yellow]*[/] Executing [bold magenta]`{script}`[/]")
+                with self._governed(script):
+                    for batch in self._select_script_batches(script):
+                        yield script, batch
+                if on_script_complete is not None:
+                    on_script_complete(script)
+                status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
+            return
+        yield from self._stream_collection_scripts_concurrently(scripts, status, on_script_complete)
+
+    def _stream_collection_scripts_concurrently(
+        self, scripts: set[str], status: Status, on_script_complete: Callable[[str], None] | None = None
+    ) -> Iterator[tuple[str, pa.RecordBatch]]:
+        """Execute collection scripts on worker threads and yield their batches on the calling thread.
+
+        Workers hand batches over through a bounded queue, so at most a few batches per worker are held in memory
+        while the caller is busy writing.  A `None` batch marks the end of a script's result set.
+        """
+        status.update(
+            rf" [yellow]*[/] Executing {len(scripts)} queries with a concurrency of {self.collection_concurrency}"
+        )
+        batch_queue: queue.Queue[tuple[str, pa.RecordBatch | BaseException | None]] = queue.Queue(
+            maxsize=self.collection_concurrency * 2
+        )
+        cancelled = threading.Event()
+
+        def _produce(script: str) -> None:
+            try:
+                with self._provide_connection() as connection, self._governed(script, connection):
+                    for batch in self._select_script_batches(script, connection=connection):
+                        if cancelled.is_set():
+                            return
+                        batch_queue.put((script, batch))
+                batch_queue.put((script, None))
+            except Exception as exc:  # noqa: BLE001
+                batch_queue.put((script, exc))
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.collection_concurrency, len(scripts)), thread_name_prefix="dma-collection"
+        ) as executor:
+            futures = [executor.submit(_produce, script) for script in sorted(scripts)]
+            try:
+                remaining = len(futures)
+                while remaining:
+                    script, item = batch_queue.get()
+                    if isinstance(item, BaseException):
+                        raise item
+                    if item is None:
+                        remaining -= 1
+                        if on_script_complete is not None:
+                            on_script_complete(script)
+                        status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
+                        continue
+                    yield script, item
+            finally:
+                cancelled.set()
+                while not all(future.done() for future in futures):
+                    with suppress(queue.Empty):
+                        batch_queue.get(timeout=0.1)
+
+    @contextmanager
+    def _governed(self, script: str, connection: Any | None = None) -> Iterator[None]:
+        """Run a collection script within the limits of the collection governor, when there is one.
+
+        The script waits for a slot of the governor, the session limits are set on its connection the first time it
+        is used, and the load of the source is sampled when it is due.
+        """
+        if self.governor is None:
+            yield
+            return
+        conn = self.connection if connection is None else connection
+        with self.governor.slot():
+            if id(conn) not in self._limited_connections:
+                self._apply_source_limits(conn)
+                self._limited_connections[id(conn)] = conn
+            if self.governor.claim_sample():
+                self._sample_source_load(script, conn)
+            yield
+
+    def source_limit_statements(self) -> list[str]:  # noqa: PLR6301
+        """Get the statements that set the timeouts of the governor on a session.  Sources without any return none."""
+        return []
+
+    def _apply_source_limits(self, connection: Any) -> None:
+        """Set the statement and lock timeouts of the governor on a source connection."""
+        statements = self.source_limit_statements()
+        if not statements:
+            return
+        cursor = connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def _sample_source_load(self, script: str, connection: Any) -> None:
+        """Time the `governor_active_sessions` probe of the source and pass the sample on to the governor.
+
+        The probe counts the sessions of the source that are busy with a query.  Sources
+        without the probe are not sampled.  A probe that fails is only timed, as the round trip still tells how
+        busy the source is.
+        """
+        if self.governor is None or "governor_active_sessions" not in self.queries.available_queries:
+            return
+        started = time.monotonic()
+        try:
+            active_sessions = self.fn("governor_active_sessions")(conn=connection)
+        except Exception:  # noqa: BLE001
+            active_sessions = None
+        latency = time.monotonic() - started
+        decision = self.governor.observe(script, latency, int(active_sessions) if active_sessions is not None else None)
+        if decision is not None:
+            console.print(rf" [yellow]![/] {decision.describe()}")
+
+    def _provide_connection(self) -> AbstractContextManager[Any]:
+        if self.connection_provider is None:
+            msg = "A connection provider is required to execute queries concurrently."
+            raise ApplicationError(msg)
+        return self.connection_provider()
+
+    async def execute_init_queries_async(self, connection: Any) -> dict[str, Any]:
+        """Execute the initialization queries on an async connection and return the value of each."""
+        results: dict[str, Any] = {}
+        for script in self.available_queries("init"):
+            batches = [
+                batch async for batch in self.select_batches_async(script, connection, binds=self._binds(script))
+            ]
+            results[script] = batches[0].column(0)[0].as_py() if batches else None
+        return results
+
+    async def stream_script_batches_async(self, script: str, connection: Any) -> AsyncIterator[pa.RecordBatch]:
+        """Execute a collection script on an async connection and yield its Arrow record batches."""
+        async for batch in self.select_batches_async(
+            script, connection, batch_size=self.fetch_size, binds=self._binds(script)
+        ):
+            yield batch
+
+    async def gather_per_db_collection_queries_async(
+        self, connection: Any
+    ) -> tuple[dict[str, list[pa.RecordBatch]], list[str]]:
+        """Execute per DB queries on an async connection without writing to the console.
+
+        Returns:
+            The Arrow record batches keyed by script name and the list of skip messages.
+        """
+        results: dict[str, list[pa.RecordBatch]] = {}
+        skipped: list[str] = []
+        for script in sorted(self.get_per_db_collection_queries()):
+            try:
+                results[script] = [batch async for batch in self.stream_script_batches_async(script, connection)]
+            except (psycopg.errors.UndefinedTable, psycopg.errors.InsufficientPrivilege) as exc:
+                skipped.append(_per_db_skip_reason(script, exc))
+        return results, skipped
+
+    def _binds(self, script: str) -> dict[str, Any] | None:
+        if not self.uses_bind_parameters:
+            return None
+        return {
+            "PKEY": self.execution_id,
+            "DMA_SOURCE_ID": self.source_id,
+            "DMA_MANUAL_ID": self.manual_id,
+            "DMA_DELTA_SCHEMAS": self.delta_schemas.get(script),
+        }
+
+
+def _per_db_skip_reason(script: str, exc: Exception) -> str:
+    if isinstance(exc, psycopg.errors.UndefinedTable):
+        return rf"Skipped `{script}` as the table doesn't exist"
+    return rf"Skipped `{script}` due to insufficient privileges."
+
+
+def _rows_by_script(stream: Iterable[tuple[str, pa.RecordBatch]]) -> dict[str, list[dict[str, Any]]]:
+    results: dict[str, list[dict[str, Any]]] = {}
+    for script, batch in stream:
+        results.setdefault(script, []).extend(batch.to_pylist())
+    return results
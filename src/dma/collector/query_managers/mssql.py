@@ -15,9 +15,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-import aiosql
-
 from dma.collector.query_managers.base import CollectionQueryManager
+from dma.lib.db.query_registry import load_queries
 from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
@@ -33,12 +32,16 @@ class SQLServerCollectionQueryManager(CollectionQueryManager):
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        queries: Queries = aiosql.from_path(
-            sql_path=f"{_root_path}/collector/sql/sources/mssql/",
-            driver_adapter="pymssql",
-            mandatory_parameters=False,
-        ),
+        queries: Queries | None = None,
+        **kwargs: Any,
     ) -> None:
+        if queries is None:
+            queries = load_queries(_root_path / "collector/sql/sources/mssql", "pymssql")
         super().__init__(
-            connection=connection, queries=queries, execution_id=execution_id, source_id=source_id, manual_id=manual_id
+            connection=connection,
+            queries=queries,
+            execution_id=execution_id,
+            source_id=source_id,
+            manual_id=manual_id,
+            **kwargs,
         )
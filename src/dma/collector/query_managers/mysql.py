@@ -13,37 +13,85 @@
 # limitations under the License.
 from __future__ import annotations
 
+import math
+from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
 
-import aiosql
-
 from dma.collector.query_managers.base import CollectionQueryManager
+from dma.lib.db.query_registry import load_queries
 from dma.lib.exceptions import ApplicationError
 from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
+    from collections.abc import Generator
+
     from aiosql.queries import Queries
 
 _root_path = module_to_os_path("dma")
 
 
 class MySQLCollectionQueryManager(CollectionQueryManager):
+    supports_server_side_cursors = True
+    uses_bind_parameters = False
+    """The MySQL scripts read the execution identifiers from session variables (`@PKEY`) instead."""
+
     def __init__(
         self,
         connection: Any,
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        queries: Queries = aiosql.from_path(
-            sql_path=f"{_root_path}/collector/sql/sources/mysql/",
-            driver_adapter="pymysql",
-            mandatory_parameters=False,
-        ),
+        queries: Queries | None = None,
+        **kwargs: Any,
     ) -> None:
+        if queries is None:
+            queries = load_queries(_root_path / "collector/sql/sources/mysql", "pymysql")
         super().__init__(
-            connection=connection, queries=queries, execution_id=execution_id, source_id=source_id, manual_id=manual_id
+            connection=connection,
+            queries=queries,
+            execution_id=execution_id,
+            source_id=source_id,
+            manual_id=manual_id,
+            **kwargs,
         )
 
+    @contextmanager
+    def server_side_cursor(
+        self, connection: Any, method: str, batch_size: int, **binds: Any
+    ) -> Generator[Any, None, None]:
+        """Execute a query on an unbuffered cursor so that rows are streamed from the server as they are fetched.
+
+        The connection can't be used for anything else until the cursor is closed.
+        """
+        from pymysql.cursors import SSCursor  # noqa: PLC0415
+
+        cursor = connection.cursor(SSCursor)
+        try:
+            cursor.execute(self.fn(method).sql, binds)
+            yield cursor
+        finally:
+            cursor.close()
+
+    def source_limit_statements(self) -> list[str]:
+        """Set the statement and lock timeouts for the session.
+
+        `max_execution_time` only limits `SELECT` statements and is only available from MySQL 5.7.8.  The lock wait
+        timeouts are in whole seconds and can't be disabled, so they are left alone when the lock timeout is `0`.
+        """
+        if self.governor is None:
+            return []
+        limits = self.governor.limits
+        statements = []
+        if self.db_version is not None and _version_tuple(self.db_version) >= (5, 7, 8):
+            statements.append(f"SET SESSION max_execution_time = {round(limits.statement_timeout * 1000)}")
+        if limits.lock_timeout > 0:
+            lock_timeout = max(math.ceil(limits.lock_timeout), 1)
+            statements.extend([
+                f"SET SESSION lock_wait_timeout = {lock_timeout}",
+                f"SET SESSION innodb_lock_wait_timeout = {lock_timeout}",
+            ])
+        return statements
+
     def get_collection_queries(self) -> set[str]:
         if self.db_version is None:
             msg = "Database Version was not set.  Ensure the initialization step complete successfully."
@@ -81,3 +129,7 @@ class MySQLCollectionQueryManager(CollectionQueryManager):
             "collection_mysql_table_details": "mysql_table_details",
             "collection_mysql_users": "mysql_users",
         }
+
+
+def _version_tuple(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version.split("-", 1)[0].split(".")[:3] if part.isdigit())
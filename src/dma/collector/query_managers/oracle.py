@@ -19,6 +19,7 @@ import aiosql
 from aiosql.adapters.generic import GenericAdapter
 
 from dma.collector.query_managers.base import CollectionQueryManager
+from dma.lib.db.query_registry import load_queries
 from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
@@ -36,12 +37,16 @@ class OracleCollectionQueryManager(CollectionQueryManager):
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        queries: Queries = aiosql.from_path(
-            sql_path=f"{_root_path}/collector/sql/sources/oracle/",
-            driver_adapter="oracledb",
-            mandatory_parameters=False,
-        ),
+        queries: Queries | None = None,
+        **kwargs: Any,
     ) -> None:
+        if queries is None:
+            queries = load_queries(_root_path / "collector/sql/sources/oracle", "oracledb")
         super().__init__(
-            connection=connection, queries=queries, execution_id=execution_id, source_id=source_id, manual_id=manual_id
+            connection=connection,
+            queries=queries,
+            execution_id=execution_id,
+            source_id=source_id,
+            manual_id=manual_id,
+            **kwargs,
         )
@@ -13,38 +13,179 @@
 # limitations under the License.
 from __future__ import annotations
 
+from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
 
-import aiosql
+import psycopg
+from psycopg import sql
+from psycopg.pq import Format
 
-from dma.collector.query_managers.base import CollectionQueryManager
+from dma.collector.query_managers.base import CollectionQueryManager, _per_db_skip_reason
 from dma.collector.util.postgres.helpers import get_db_major_version
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE, rows_to_record_batch
+from dma.lib.db.query_registry import load_queries
 from dma.lib.exceptions import ApplicationError
 from dma.utils import module_to_os_path
 
 if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+    import pyarrow as pa
     from aiosql.queries import Queries
 
 _root_path = module_to_os_path("dma")
 
 
 class PostgresCollectionQueryManager(CollectionQueryManager):
+    """Scripts tagged as `copy` are extracted with a binary `COPY` unless `copy_extraction` is disabled."""
+
+    supports_server_side_cursors = True
+
     def __init__(
         self,
         connection: Any,
         execution_id: str | None = None,
         source_id: str | None = None,
         manual_id: str | None = None,
-        queries: Queries = aiosql.from_path(
-            sql_path=f"{_root_path}/collector/sql/sources/postgres/",
-            driver_adapter="psycopg",
-            mandatory_parameters=False,
-        ),
+        queries: Queries | None = None,
+        copy_extraction: bool = True,
+        **kwargs: Any,
     ) -> None:
+        if queries is None:
+            queries = load_queries(_root_path / "collector/sql/sources/postgres", "psycopg")
+        self.copy_extraction = copy_extraction
         super().__init__(
-            connection=connection, queries=queries, execution_id=execution_id, source_id=source_id, manual_id=manual_id
+            connection=connection,
+            queries=queries,
+            execution_id=execution_id,
+            source_id=source_id,
+            manual_id=manual_id,
+            **kwargs,
+        )
+
+    @contextmanager
+    def server_side_cursor(
+        self, connection: Any, method: str, batch_size: int, **binds: Any
+    ) -> Generator[Any, None, None]:
+        """Execute a query on a named (server side) cursor.
+
+        Named cursors only exist for the duration of a transaction, so one is opened even on autocommit connections.
+        """
+        with connection.transaction(), connection.cursor(name=f"dma_{method}"[:63]) as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(self.fn(method).sql, binds)
+            yield cursor
+
+    def source_limit_statements(self) -> list[str]:
+        """Set `statement_timeout` and `lock_timeout` for the session, in milliseconds.
+
+        The session is also named, so the sessions of the collection aren't counted as load by the governor probe.
+        """
+        if self.governor is None:
+            return []
+        limits = self.governor.limits
+        return [
+            "set application_name = 'dma-collection'",
+            f"set statement_timeout = {round(limits.statement_timeout * 1000)}",
+            f"set lock_timeout = {round(limits.lock_timeout * 1000)}",
+        ]
+
+    def select_batches_copy(
+        self,
+        method: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        connection: Any | None = None,
+        **binds: Any,
+    ) -> Iterator[pa.RecordBatch]:
+        """Execute a query with `COPY (...) TO STDOUT (FORMAT binary)` and yield the rows as Arrow record batches.
+
+        The binary format saves the server from converting every value to text and the client from parsing it
+        back.  `COPY` doesn't describe the columns it returns, so their types are read from the query with `limit 0`
+        first.  Columns of types psycopg can't load from the binary format are converted to text by the server,
+        which is what selecting them returns too.
+        """
+        conn = self.connection if connection is None else connection
+        query = self.fn(method).sql.strip().rstrip(";")
+        with conn.cursor() as cursor:
+            cursor.execute(f"select * from ({query}) as dma_copy limit 0", binds)  # noqa: S608
+            columns = [
+                (column.name, column.type_code, conn.adapters.get_loader(column.type_code, Format.BINARY) is not None)
+                for column in cursor.description or []
+            ]
+        select_list = sql.SQL(", ").join(
+            sql.Identifier(name) if is_binary else sql.SQL("{0}::text as {0}").format(sql.Identifier(name))
+            for name, _, is_binary in columns
+        )
+        statement = f"copy (select {select_list.as_string(conn)} from ({query}) as dma_copy) to stdout (format binary)"  # noqa: S608
+        with conn.cursor() as cursor, cursor.copy(statement, binds) as copy:
+            copy.set_types([type_code if is_binary else "text" for _, type_code, is_binary in columns])
+            column_names = [name for name, _, _ in columns]
+            rows: list[tuple[Any, ...]] = []
+            for row in copy.rows():
+                rows.append(row)
+                if len(rows) == batch_size:
+                    yield rows_to_record_batch(rows, column_names)
+                    rows = []
+            if rows:
+                yield rows_to_record_batch(rows, column_names)
+
+    def _select_script_batches(self, script: str, connection: Any | None = None) -> Iterator[pa.RecordBatch]:
+        """Select the batches of a collection script, with a binary `COPY` for the scripts tagged as `copy`."""
+        if not self.copy_extraction or "copy" not in self.query_tags(script):
+            return super()._select_script_batches(script, connection)
+        return self.select_batches_copy(
+            script,
+            batch_size=self.fetch_size,
+            connection=connection,
+            PKEY=self.execution_id,
+            DMA_SOURCE_ID=self.source_id,
+            DMA_MANUAL_ID=self.manual_id,
+            DMA_DELTA_SCHEMAS=self.delta_schemas.get(script),
         )
 
+    def _select_per_db_scripts(self, scripts: list[str]) -> dict[str, tuple[list[pa.RecordBatch], str | None]]:
+        """Execute the per DB scripts in a pipeline, so a database costs a single round trip instead of one per script.
+
+        A script that fails aborts the scripts queued after it.  Its error is handled the same way as when the scripts
+        are executed one at a time, and the aborted scripts are sent again in a new pipeline.  Scripts tagged as
+        `large` are still streamed from a server side cursor.
+        """
+        pipelined = [script for script in scripts if "large" not in self.query_tags(script)]
+        if not psycopg.Pipeline.is_supported():
+            pipelined = []
+        results = super()._select_per_db_scripts([script for script in scripts if script not in pipelined])
+        while pipelined:
+            cursors = [(script, self.connection.cursor()) for script in pipelined]
+            error: psycopg.Error | None = None
+            try:
+                with self.connection.pipeline():
+                    for script, cursor in cursors:
+                        cursor.execute(self.fn(script).sql, self._binds(script))
+            except psycopg.Error as exc:
+                error = exc
+            pipelined = []
+            failed_script_found = False
+            for script, cursor in cursors:
+                with cursor:
+                    # the scripts before the failed script have their results, the scripts after it were aborted
+                    if cursor.pgresult is not None or error is None:
+                        results[script] = (self._fetch_batches(cursor), None)
+                    elif not failed_script_found:
+                        if not isinstance(error, (psycopg.errors.UndefinedTable, psycopg.errors.InsufficientPrivilege)):
+                            raise error
+                        results[script] = ([], _per_db_skip_reason(script, error))
+                        failed_script_found = True
+                    else:
+                        pipelined.append(script)
+        return {script: results[script] for script in scripts}
+
+    def _fetch_batches(self, cursor: psycopg.Cursor[Any]) -> list[pa.RecordBatch]:
+        column_names = [column[0] for column in cursor.description or []]
+        batches = []
+        while rows := cursor.fetchmany(self.fetch_size):
+            batches.append(rows_to_record_batch(rows, column_names))
+        return batches
+
     def get_collection_queries(self) -> set[str]:
         if self.db_version is None:
             msg = "Database Version was not set.  Ensure the initialization step complete successfully."
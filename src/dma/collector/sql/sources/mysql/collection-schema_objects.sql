@@ -14,6 +14,7 @@
  limitations under the License.
  */
 -- name: collection-mysql-schema-objects
+-- tags: large
 select @PKEY as pkey,
   @DMA_SOURCE_ID as dma_source_id,
   @DMA_MANUAL_ID as dma_manual_id,
@@ -14,6 +14,7 @@
  limitations under the License.
  */
 -- name: collection-mysql-table-details
+-- tags: large
 select
   /*+ MAX_EXECUTION_TIME(5000) */
   @PKEY as pkey,
@@ -0,0 +1,20 @@
+/*
+ Copyright 2024 Google LLC
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+ https://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+ */
+-- name: governor-active-sessions$
+select count(*) as active_sessions
+from information_schema.processlist
+where command not in ('Sleep', 'Daemon', 'Binlog Dump', 'Binlog Dump GTID')
+  and id <> connection_id();
@@ -14,6 +14,7 @@
  limitations under the License.
  */
 -- name: collection-postgres-index-details
+-- tags: copy, delta:table_owner
 with src as (
   select i.indexrelid as object_id,
     sut.relname as table_name,
@@ -72,4 +73,6 @@ select :PKEY as pkey,
   src.index_scan,
   src.index_tuples_read,
   src.index_tuples_fetched
-from src;
+from src
+where :DMA_DELTA_SCHEMAS::text [] is null
+  or src.table_owner = any (:DMA_DELTA_SCHEMAS::text []);
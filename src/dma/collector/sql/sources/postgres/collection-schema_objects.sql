@@ -14,6 +14,7 @@
  limitations under the License.
  */
 -- name: collection-postgres-schema-objects
+-- tags: large, copy, delta:object_schema
 with all_tables as (
   select distinct c.oid as object_id,
     'TABLE' as object_category,
@@ -202,4 +203,6 @@ select :PKEY as pkey,
   src.object_name,
   src.object_id,
   current_database() as database_name
-from src;
+from src
+where :DMA_DELTA_SCHEMAS::text [] is null
+  or src.object_schema = any (:DMA_DELTA_SCHEMAS::text []);
@@ -14,6 +14,7 @@
  limitations under the License.
  */
 -- name: collection-postgres-base-table-details
+-- tags: large, copy, delta:table_schema
 with all_objects as (
   select c.oid as object_id,
     case
@@ -152,9 +153,12 @@ select :PKEY as pkey,
   COALESCE(src.toast_index_hit, 0) as toast_index_hit,
   COALESCE(src.toast_index_read, 0) as toast_index_read,
   current_database() as database_name
-from src;
+from src
+where :DMA_DELTA_SCHEMAS::text [] is null
+  or src.table_schema = any (:DMA_DELTA_SCHEMAS::text []);
 
 -- name: collection-postgres-12-table-details
+-- tags: large, copy, delta:table_schema
 with all_objects as (
   select c.oid as object_id,
     case
@@ -293,9 +297,12 @@ select :PKEY as pkey,
   COALESCE(src.toast_index_hit, 0) as toast_index_hit,
   COALESCE(src.toast_index_read, 0) as toast_index_read,
   current_database() as database_name
-from src;
+from src
+where :DMA_DELTA_SCHEMAS::text [] is null
+  or src.table_schema = any (:DMA_DELTA_SCHEMAS::text []);
 
 -- name: collection-postgres-13-table-details
+-- tags: large, copy, delta:table_schema
 with all_objects as (
   select c.oid as object_id,
     case
@@ -434,7 +441,9 @@ select :PKEY as pkey,
   COALESCE(src.toast_index_hit, 0) as toast_index_hit,
   COALESCE(src.toast_index_read, 0) as toast_index_read,
   current_database() as database_name
-from src;
+from src
+where :DMA_DELTA_SCHEMAS::text [] is null
+  or src.table_schema = any (:DMA_DELTA_SCHEMAS::text []);
 
 
 -- name: collection-postgres-tables-with-no-primary-key
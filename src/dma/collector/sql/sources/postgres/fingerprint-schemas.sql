@@ -0,0 +1,85 @@
+/*
+ Copyright 2024 Google LLC
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+ https://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+ */
+-- name: fingerprint-postgres-schemas
+-- Cheap per schema fingerprints used to detect the schemas that changed since the previous collection.
+-- Every catalog row is rewritten with a new xmin when an object is created, altered or dropped, and the
+-- DML, maintenance and scan counters move when the data in the tables changes or is read.  The results of
+-- unchanged schemas are carried over into the next collection, including the scan and block read statistics of
+-- their tables and indexes, so a schema that was only queried must be collected again as well.
+select ns.nspname as schema_name,
+  md5(
+    concat_ws(
+      '|',
+      (
+        select string_agg(c.oid::text || ':' || c.xmin::text, ',' order by c.oid)
+        from pg_class c
+        where c.relnamespace = ns.oid
+      ),
+      (
+        select string_agg(p.oid::text || ':' || p.xmin::text, ',' order by p.oid)
+        from pg_proc p
+        where p.pronamespace = ns.oid
+      ),
+      (
+        select string_agg(con.oid::text || ':' || con.xmin::text, ',' order by con.oid)
+        from pg_constraint con
+        where con.connamespace = ns.oid
+      ),
+      (
+        select string_agg(i.indexrelid::text || ':' || i.xmin::text, ',' order by i.indexrelid)
+        from pg_index i
+          join pg_class c on (i.indrelid = c.oid)
+        where c.relnamespace = ns.oid
+      ),
+      (
+        select string_agg(t.oid::text || ':' || t.xmin::text, ',' order by t.oid)
+        from pg_trigger t
+          join pg_class c on (t.tgrelid = c.oid)
+        where c.relnamespace = ns.oid
+      ),
+      (
+        select string_agg(
+            concat_ws(
+              ':',
+              s.relid,
+              s.seq_scan,
+              s.idx_scan,
+              s.n_tup_ins,
+              s.n_tup_upd,
+              s.n_tup_del,
+              s.n_live_tup,
+              s.n_dead_tup,
+              s.vacuum_count,
+              s.autovacuum_count,
+              s.analyze_count,
+              s.autoanalyze_count
+            ),
+            ',' order by s.relid
+          )
+        from pg_stat_user_tables s
+        where s.schemaname = ns.nspname
+      ),
+      (
+        select string_agg(s.indexrelid::text || ':' || s.idx_scan::text, ',' order by s.indexrelid)
+        from pg_stat_user_indexes s
+        where s.schemaname = ns.nspname
+      )
+    )
+  ) as fingerprint
+from pg_namespace ns
+where ns.nspname <> all (array ['pg_catalog', 'information_schema'])
+  and ns.nspname !~ '^pg_toast'
+  and ns.nspname !~ '^pg_temp';
@@ -13,7 +13,17 @@
 # limitations under the License.
 from __future__ import annotations
 
-from dma.collector.workflows.collection_extractor import CollectionExtractor
+from dma.collector.workflows.assessment_import import AssessmentImport
+from dma.collector.workflows.collection_extractor import AsyncCollectionExtractor, CollectionExtractor
+from dma.collector.workflows.collection_import import CollectionImport
+from dma.collector.workflows.fleet_check import FleetCheck
 from dma.collector.workflows.readiness_check import ReadinessCheck
 
-__all__ = ("CollectionExtractor", "ReadinessCheck")
+__all__ = (
+    "AssessmentImport",
+    "AsyncCollectionExtractor",
+    "CollectionExtractor",
+    "CollectionImport",
+    "FleetCheck",
+    "ReadinessCheck",
+)
@@ -0,0 +1,80 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rich.table import Table
+
+from dma.collector.workflows.base import PARTITION_COLUMN
+from dma.lib.exceptions import ApplicationError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from duckdb import DuckDBPyConnection
+    from rich.console import Console
+
+
+class AssessmentImport:
+    """Combine the Parquet exports of many assessments into a single queryable database.
+
+    Every table found in the exports becomes a view over the Parquet files of all exports, so the data is read in
+    place rather than copied into DuckDB.  Rows keep the `collection_key` of the partition they were exported to.
+    """
+
+    def __init__(self, local_db: DuckDBPyConnection, export_paths: list[Path], console: Console) -> None:
+        self.local_db = local_db
+        self.export_paths = export_paths
+        self.console = console
+        self.tables: dict[str, list[Path]] = {}
+
+    def execute(self) -> dict[str, list[Path]]:
+        """Create a view for every exported table.
+
+        Returns:
+            The exports that contain each table.
+        """
+        for export_path in self.export_paths:
+            if not export_path.is_dir():
+                msg = f"Export path '{export_path!s}' is not a directory."
+                raise ApplicationError(msg)
+            for table_path in sorted(export_path.iterdir()):
+                if table_path.is_dir() and next(table_path.glob(f"{PARTITION_COLUMN}=*/*.parquet"), None):
+                    self.tables.setdefault(table_path.name, []).append(table_path.absolute())
+        if not self.tables:
+            msg = f"No Parquet exports were found in {', '.join(repr(str(path)) for path in self.export_paths)}."
+            raise ApplicationError(msg)
+        for table_name, table_paths in self.tables.items():
+            files = ", ".join(
+                "'{}'".format(str(table_path / f"{PARTITION_COLUMN}=*" / "*.parquet").replace("'", "''"))
+                for table_path in table_paths
+            )
+            self.local_db.execute(
+                f'create or replace view main."{table_name}" as select * from read_parquet([{files}], '  # noqa: S608
+                f"hive_partitioning = true, hive_types = {{'{PARTITION_COLUMN}': varchar}}, union_by_name = true)"
+            )
+        return self.tables
+
+    def print_summary(self) -> None:
+        table = Table(title="Imported Assessments", show_lines=False)
+        table.add_column("Table", style="cyan")
+        table.add_column("Exports", justify="right")
+        table.add_column("Collections", justify="right")
+        for table_name, table_paths in self.tables.items():
+            result = self.local_db.execute(
+                f'select count(distinct {PARTITION_COLUMN}) from main."{table_name}"'  # noqa: S608
+            ).fetchone()
+            table.add_row(table_name, str(len(table_paths)), str(result[0] if result else 0))
+        self.console.print(table)
@@ -13,18 +13,24 @@
 # limitations under the License.
 from __future__ import annotations
 
+import shutil
 from typing import TYPE_CHECKING, Literal
 
 import polars as pl
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from pathlib import Path
 
+    import pyarrow as pa
     from duckdb import DuckDBPyConnection
     from rich.console import Console
 
     from dma.collector.query_managers.base import CanonicalQueryManager
 
+ExportFormat = Literal["csv", "parquet"]
+PARTITION_COLUMN = "collection_key"
+
 
 class BaseWorkflow:
     """A collection of tasks that interact with DuckDB"""
@@ -63,7 +69,85 @@ class BaseWorkflow:
 
                 self.local_db.execute(f"drop view obj_{table_name}")
 
-    def dump_database(self, export_path: Path, delimiter: str = "|") -> None:
-        """Export the entire database with DDLs and data as CSV"""
-        self.local_db.execute(f"export database '{export_path!s}' (format csv, delimiter '{delimiter}')")
+    def import_batches(self, data: Iterable[tuple[str, pa.RecordBatch]]) -> dict[str, int]:
+        """Stream Arrow record batches into duckdb.
+
+        Each item pairs a table name with a record batch for that table.  Batches are appended one at a time as they
+        are received, so memory use is bounded by the batch size rather than by the size of the result set.
+
+        Returns:
+            The number of rows imported into each table.
+        """
+        row_counts: dict[str, int] = {}
+        for table_name, batch in data:
+            if batch.num_rows > 0:
+                self.local_db.register(f"obj_{table_name}", batch)
+                self.local_db.execute(
+                    f"insert into {table_name}({', '.join(batch.schema.names)}) select {', '.join(batch.schema.names)} from obj_{table_name}"  # noqa: S608
+                )
+                self.local_db.execute(f"drop view obj_{table_name}")
+                row_counts[table_name] = row_counts.get(table_name, 0) + batch.num_rows
+        return row_counts
+
+    def dump_database(
+        self,
+        export_path: Path,
+        delimiter: str = "|",
+        export_format: ExportFormat = "csv",
+        collection_key: str | None = None,
+    ) -> None:
+        """Export the entire database with DDLs and data as CSV, or as zstd compressed Parquet.
+
+        Parquet exports write one directory per table, partitioned by `collection_key`, so the exports of many
+        assessments can share an export path and be read together with `AssessmentImport`.
+        """
+        if export_format == "parquet":
+            self.dump_database_parquet(export_path, collection_key=collection_key or "default")
+        else:
+            self.local_db.execute(f"export database '{export_path!s}' (format csv, delimiter '{delimiter}')")
         self.console.print(f"Database exported to '{export_path!s}'")
+
+    def dump_database_parquet(self, export_path: Path, collection_key: str) -> None:
+        """Export every table as zstd compressed Parquet, partitioned by table and `collection_key`.
+
+        Tables that already carry a `collection_key` column, such as the tables of a fleet assessment, are
+        partitioned by it.  Other tables are tagged with `collection_key`.  Partitions from an earlier export of the
+        same collection are replaced, and empty tables are written as a single empty file so their schema survives.
+        """
+        tables = self.local_db.execute(
+            "select table_name from duckdb_tables() where database_name = current_database() and schema_name = 'main' order by table_name"
+        ).fetchall()
+        for (table_name,) in tables:
+            columns = {
+                row[0]
+                for row in self.local_db.execute(
+                    "select column_name from duckdb_columns() where database_name = current_database() and schema_name = 'main' and table_name = ?",
+                    [table_name],
+                ).fetchall()
+            }
+            projection = "*" if PARTITION_COLUMN in columns else f"*, cast(? as varchar) as {PARTITION_COLUMN}"
+            parameters = [] if PARTITION_COLUMN in columns else [collection_key]
+            table_path = export_path / table_name
+            partition_keys = [
+                row[0]
+                for row in self.local_db.execute(
+                    f'select distinct {PARTITION_COLUMN} from (select {projection} from main."{table_name}")',  # noqa: S608
+                    parameters,
+                ).fetchall()
+            ]
+            for partition_key in partition_keys or [collection_key]:
+                shutil.rmtree(table_path / f"{PARTITION_COLUMN}={partition_key}", ignore_errors=True)
+            if partition_keys:
+                self.local_db.execute(
+                    f"copy (select {projection} from main.\"{table_name}\") to '{table_path!s}' "  # noqa: S608
+                    f"(format parquet, compression zstd, partition_by ({PARTITION_COLUMN}), overwrite_or_ignore true)",
+                    parameters,
+                )
+            else:
+                partition_path = table_path / f"{PARTITION_COLUMN}={collection_key}"
+                partition_path.mkdir(parents=True, exist_ok=True)
+                self.local_db.execute(
+                    f'copy (select * exclude ({PARTITION_COLUMN}) from (select {projection} from main."{table_name}")) '  # noqa: S608
+                    f"to '{partition_path / 'data_0.parquet'!s}' (format parquet, compression zstd)",
+                    parameters,
+                )
@@ -13,6 +13,14 @@
 # limitations under the License.
 from __future__ import annotations
 
-from dma.collector.workflows.collection_extractor.base import CollectionExtractor
+from dma.collector.workflows.collection_extractor.base import AsyncCollectionExtractor, CollectionExtractor
+from dma.collector.workflows.collection_extractor.checkpoint import CollectionCheckpoints
+from dma.collector.workflows.collection_extractor.delta import DeltaBaseline, SchemaFingerprints
 
-__all__ = ("CollectionExtractor",)
+__all__ = (
+    "AsyncCollectionExtractor",
+    "CollectionCheckpoints",
+    "CollectionExtractor",
+    "DeltaBaseline",
+    "SchemaFingerprints",
+)
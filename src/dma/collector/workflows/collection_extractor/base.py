@@ -13,26 +13,50 @@
 # limitations under the License.
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
+import anyio
+from rich.padding import Padding
 from rich.table import Table
 from sqlalchemy.orm import Session
 
 from dma.__about__ import __version__ as current_version
-from dma.collector.dependencies import provide_collection_query_manager
+from dma.collector.dependencies import provide_async_collection_query_manager, provide_collection_query_manager
 from dma.collector.workflows.base import BaseWorkflow
-from dma.lib.db.base import SourceInfo, get_engine
+from dma.collector.workflows.collection_extractor.checkpoint import CollectionCheckpoints
+from dma.collector.workflows.collection_extractor.delta import SchemaFingerprints
+from dma.collector.workflows.collection_extractor.throttle import ThrottleEvents
+from dma.lib.db.base import SourceInfo, get_async_engine, get_cached_engine
+from dma.lib.db.governor import CollectionGovernor
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE
 from dma.lib.exceptions import ApplicationError
+from dma.utils import wrap_sync
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine, Iterator
+
+    import pyarrow as pa
+    from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
     from duckdb import DuckDBPyConnection
     from rich.console import Console
+    from sqlalchemy.ext.asyncio import AsyncConnection
 
     from dma.collector.query_managers.base import CanonicalQueryManager, CollectionQueryManager
+    from dma.collector.workflows.collection_extractor.delta import DeltaBaseline
+    from dma.lib.db.governor import SourceLimits
 
 
 class CollectionExtractor(BaseWorkflow):
+    """Collect data from the source database into the local database.
+
+    The queries sent to the source are paced by a `CollectionGovernor` within `source_limits`, and the throttle
+    decisions it makes are recorded in the `collection_throttle_event` table.
+    """
+
     def __init__(
         self,
         local_db: DuckDBPyConnection,
@@ -41,47 +65,223 @@ class CollectionExtractor(BaseWorkflow):
         canonical_query_manager: CanonicalQueryManager,
         console: Console,
         collection_identifier: str | None,
+        collection_concurrency: int = 1,
+        database_concurrency: int = 1,
+        fetch_size: int = DEFAULT_BATCH_SIZE,
+        resume: bool = False,
+        delta: bool = False,
+        source_limits: SourceLimits | None = None,
     ) -> None:
         self.src_info = src_info
         self.database = database
         self.collection_identifier = collection_identifier
+        self.collection_concurrency = collection_concurrency
+        self.database_concurrency = max(database_concurrency, 1)
+        self.fetch_size = fetch_size
+        self.resume = resume
+        self.delta = delta
+        self.delta_baseline: DeltaBaseline | None = None
+        self.source_id: str | None = None
+        self.db_version: str | None = None
         super().__init__(local_db, canonical_query_manager, src_info.db_type, console)
+        self.checkpoints = CollectionCheckpoints(local_db)
+        self.fingerprints = SchemaFingerprints(local_db)
+        self.throttle_events = ThrottleEvents(local_db)
+        self.governor = CollectionGovernor(
+            source_limits, max_concurrency=max(self.collection_concurrency, self.database_concurrency)
+        )
 
     def execute(self) -> None:
+        execution_id = self.start_execution()
+        try:
+            self.collect_data(execution_id)
+            self.collect_db_specific_data(execution_id)
+        finally:
+            self.throttle_events.record(execution_id, self.database, self.governor.drain_decisions())
+        throttled = self.throttle_events.count(execution_id)
+        if throttled:
+            self.console.print(
+                f"Collection was throttled {throttled} times to protect the source.  "
+                "See `collection_throttle_event` for each decision."
+            )
+        self.checkpoints.complete_execution(execution_id)
+
+    def start_execution(self) -> str:
+        """Start a new execution, or pick up the last unfinished one against this source when resuming.
+
+        A resumed execution keeps the collection tables and its checkpoints.  A new execution recreates the
+        collection tables, so any earlier checkpoints are discarded with them.  For a delta collection, the results
+        of the previous execution are set aside first so they can be reused for the schemas that didn't change.
+        """
+        execution_id = self.checkpoints.resumable_execution(self.src_info, self.database) if self.resume else None
+        if execution_id is not None:
+            self.console.print(rf"Resuming execution [bold magenta]`{execution_id}`[/]")
+            return execution_id
+        if self.resume:
+            self.console.print("No unfinished execution found to resume.  Starting a new collection.")
+        if self.delta:
+            previous_execution_id = self.checkpoints.last_completed_execution(self.src_info, self.database)
+            if previous_execution_id is not None:
+                self.delta_baseline = self.fingerprints.stash(previous_execution_id, self.database)
+            if self.delta_baseline is None:
+                self.console.print("No previous collection found to compare against.  Collecting every schema.")
         super().execute()
-        execution_id = (
-            f"{self.src_info.db_type}_{current_version!s}_{datetime.now(tz=timezone.utc).strftime('%y%m%d%H%M%S')}"
-        )
-        self.collect_data(execution_id)
-        self.collect_db_specific_data(execution_id)
+        self.checkpoints.clear()
+        self.fingerprints.clear()
+        self.throttle_events.clear()
+        execution_id = self.generate_execution_id()
+        self.checkpoints.start_execution(execution_id, self.src_info, self.database)
+        return execution_id
+
+    def generate_execution_id(self) -> str:
+        return f"{self.src_info.db_type}_{current_version!s}_{datetime.now(tz=timezone.utc).strftime('%y%m%d%H%M%S')}"
 
     def collect_data(self, execution_id: str) -> None:
-        sync_engine = get_engine(self.src_info, self.database)
-        with Session(sync_engine) as db_session:
+        with Session(get_cached_engine(self.src_info, self.database)) as db_session:
             collection_manager = next(
                 provide_collection_query_manager(
-                    db_session=db_session, execution_id=execution_id, manual_id=self.collection_identifier
+                    db_session=db_session,
+                    execution_id=execution_id,
+                    manual_id=self.collection_identifier,
+                    collection_concurrency=self.collection_concurrency,
+                    fetch_size=self.fetch_size,
+                    governor=self.governor,
                 )
             )
-            self.extract_collection(collection_manager)
-            self.extract_extended_collection(collection_manager)
+            collection_manager.set_identifiers(execution_id=execution_id)
+            completed = self.checkpoints.completed_scripts(execution_id, "collection", self.database)
+            self.checkpoints.discard_partial_results(
+                execution_id,
+                (collection_manager.get_collection_queries() | collection_manager.get_extended_collection_queries())
+                - completed,
+            )
+            self.prepare_delta(execution_id, collection_manager)
+            self.extract_collection(collection_manager, execution_id, completed)
+            self.extract_extended_collection(collection_manager, execution_id, completed)
             self.process_collection()
             self.db_version = collection_manager.get_db_version()
-        sync_engine.dispose()
+            self.source_id = collection_manager.source_id
+
+    def prepare_delta(self, execution_id: str, collection_manager: CollectionQueryManager) -> None:
+        """Fingerprint the schemas of the source and, for a delta collection, reuse the unchanged results.
+
+        The previous results of unchanged schemas are copied into the new execution, and the delta scripts are
+        limited to the schemas that changed.  Delta scripts that weren't part of the previous collection, such as
+        after a major version upgrade, collect every schema.
+        """
+        fingerprints = collection_manager.get_schema_fingerprints()
+        scripts = collection_manager.get_collection_queries() | collection_manager.get_extended_collection_queries()
+        delta_scripts = {
+            script: column for script in scripts if (column := collection_manager.delta_schema_column(script))
+        }
+        self.fingerprints.record(execution_id, self.database, fingerprints, delta_scripts)
+        baseline, self.delta_baseline = self.delta_baseline, None
+        if baseline is None:
+            return
+        changed = baseline.changed_schemas(fingerprints)
+        self.console.print(
+            rf"{len(changed)} of {len(fingerprints)} schemas changed since [bold magenta]`{baseline.execution_id}`[/]"
+        )
+        for script in sorted(delta_scripts.keys() & baseline.scripts.keys()):
+            self.fingerprints.restore(baseline, execution_id, script, set(fingerprints) - changed)
+            collection_manager.delta_schemas[script] = sorted(changed)
+        self.fingerprints.drop_stash(baseline)
 
     def collect_db_specific_data(self, execution_id: str) -> None:
-        dbs = self.get_all_dbs()
+        completed = self.checkpoints.completed_databases(execution_id)
+        if completed:
+            self.console.print(f"Skipping {len(completed)} databases that were already collected.")
+        dbs = sorted(self.get_all_dbs() - completed)
+        if self.database_concurrency > 1 and len(dbs) > 1:
+            self.collect_db_specific_data_concurrently(execution_id, dbs)
+            return
         for db in dbs:
-            async_engine = get_engine(src_info=self.src_info, database=db)
-            with Session(async_engine) as db_session:
+            with Session(get_cached_engine(src_info=self.src_info, database=db)) as db_session:
                 collection_manager = next(
                     provide_collection_query_manager(
-                        db_session=db_session, execution_id=execution_id, manual_id=self.collection_identifier
+                        db_session=db_session,
+                        execution_id=execution_id,
+                        source_id=self.source_id,
+                        manual_id=self.collection_identifier,
+                        db_version=self.db_version,
+                        fetch_size=self.fetch_size,
+                        governor=self.governor,
+                    )
+                )
+                with self.checkpoint_database(execution_id, db) as row_counts:
+                    row_counts.update(self.import_batches(collection_manager.stream_per_db_collection_queries()))
+                    row_counts.update(
+                        dict.fromkeys(collection_manager.get_per_db_collection_queries() - row_counts.keys(), 0)
+                    )
+
+    def collect_db_specific_data_concurrently(self, execution_id: str, dbs: list[str]) -> None:
+        """Collect the per DB queries from several databases at once.
+
+        Each worker thread connects to one database at a time and returns its result sets.  All writes to the
+        local database happen on the calling thread as each database completes, so DuckDB only ever has a single writer.
+        """
+        self.console.print(Padding("PER DB QUERIES", 1, style="bold", expand=True), width=80)
+        with self.console.status(
+            rf"[bold green]Collecting {len(dbs)} databases with a concurrency of {self.database_concurrency}...[/]"
+        ) as status:
+            executor = ThreadPoolExecutor(
+                max_workers=min(self.database_concurrency, len(dbs)), thread_name_prefix="dma-per-db"
+            )
+            try:
+                futures = {executor.submit(self._gather_db_specific_data, execution_id, db): db for db in dbs}
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    db = futures[future]
+                    db_collection, skipped = future.result()
+                    for skip_reason in skipped:
+                        status.console.print(rf"[bold magenta]`{db}`[/]: {skip_reason}")
+                    with self.checkpoint_database(execution_id, db) as row_counts:
+                        row_counts.update(dict.fromkeys(db_collection, 0))
+                        row_counts.update(
+                            self.import_batches(
+                                (script, batch) for script, batches in db_collection.items() for batch in batches
+                            )
+                        )
+                    status.console.print(
+                        rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{db}`[/] ({completed}/{len(dbs)})"
                     )
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _gather_db_specific_data(self, execution_id: str, db: str) -> tuple[dict[str, list[pa.RecordBatch]], list[str]]:
+        with Session(get_cached_engine(src_info=self.src_info, database=db)) as db_session:
+            collection_manager = next(
+                provide_collection_query_manager(
+                    db_session=db_session,
+                    execution_id=execution_id,
+                    source_id=self.source_id,
+                    manual_id=self.collection_identifier,
+                    db_version=self.db_version,
+                    fetch_size=self.fetch_size,
+                    governor=self.governor,
                 )
-                db_collection = collection_manager.execute_per_db_collection_queries()
-                self.import_to_table(db_collection)
-            async_engine.dispose()
+            )
+            results, skipped = collection_manager.gather_per_db_collection_queries()
+            # skipped scripts are returned without batches, so a database is checkpointed even when every script
+            # of it was skipped, and isn't collected again on resume
+            return {
+                script: results.get(script, []) for script in collection_manager.get_per_db_collection_queries()
+            }, skipped
+
+    @contextmanager
+    def checkpoint_database(self, execution_id: str, db: str) -> Iterator[dict[str, int]]:
+        """Import the per DB results of a database and record its checkpoint in a single transaction.
+
+        Yields a dictionary to be filled with the row count of each script imported for the database.
+        """
+        row_counts: dict[str, int] = {}
+        self.local_db.begin()
+        try:
+            yield row_counts
+            self.checkpoints.record(execution_id, "per_db", db, sorted(row_counts), row_counts)
+        except BaseException:
+            self.local_db.rollback()
+            raise
+        self.local_db.commit()
 
     def get_all_dbs(self) -> set[str]:
         result = self.local_db.sql("""
@@ -95,13 +295,34 @@ class CollectionExtractor(BaseWorkflow):
             raise ApplicationError(msg)
         return self.db_version
 
-    def extract_collection(self, collection_query_manager: CollectionQueryManager) -> None:
-        collection = collection_query_manager.execute_collection_queries()
-        self.import_to_table(collection)
+    def extract_collection(
+        self,
+        collection_query_manager: CollectionQueryManager,
+        execution_id: str | None = None,
+        completed: set[str] | None = None,
+    ) -> None:
+        self.import_batches(
+            collection_query_manager.stream_collection_queries(
+                skip_scripts=completed, on_script_complete=self._script_checkpointer(execution_id)
+            )
+        )
 
-    def extract_extended_collection(self, collection_query_manager: CollectionQueryManager) -> None:
-        extended_collection = collection_query_manager.execute_extended_collection_queries()
-        self.import_to_table(extended_collection)
+    def extract_extended_collection(
+        self,
+        collection_query_manager: CollectionQueryManager,
+        execution_id: str | None = None,
+        completed: set[str] | None = None,
+    ) -> None:
+        self.import_batches(
+            collection_query_manager.stream_extended_collection_queries(
+                skip_scripts=completed, on_script_complete=self._script_checkpointer(execution_id)
+            )
+        )
+
+    def _script_checkpointer(self, execution_id: str | None) -> Callable[[str], None] | None:
+        if execution_id is None:
+            return None
+        return partial(self.checkpoints.record_script, execution_id, self.database)
 
     def process_collection(self) -> None:
         """Process Collections"""
@@ -123,3 +344,145 @@ class CollectionExtractor(BaseWorkflow):
         else:
             msg = f"{self.db_type} is not implemented."
             raise ApplicationError(msg)
+
+
+class AsyncCollectionExtractor(CollectionExtractor):
+    """Collect data from the source database over asyncio connections.
+
+    The initialization, collection and extended collection queries are executed concurrently on up to
+    `collection_concurrency` connections, and the per DB queries on up to `database_concurrency` databases at once.
+    This hides the round trip latency of each query when collecting over high latency links.  Result batches are
+    sent over a memory object stream to a single consumer task, which is the only writer to the local database.
+    The collection governor doesn't pace async collection, so its concurrency is the only limit on the source.
+    """
+
+    def execute(self) -> None:
+        if self.resume or self.delta:
+            msg = "Resuming a collection or a delta collection is not supported with async collection."
+            raise ApplicationError(msg)
+        BaseWorkflow.execute(self)
+        self.checkpoints.clear()
+        self.fingerprints.clear()
+        self.throttle_events.clear()
+        anyio.run(self.execute_async, self.generate_execution_id())
+
+    async def execute_async(self, execution_id: str) -> None:
+        await self.collect_data_async(execution_id)
+        await self.collect_db_specific_data_async(execution_id)
+
+    async def collect_data_async(self, execution_id: str) -> None:
+        collection_manager = next(
+            provide_async_collection_query_manager(
+                db_type=self.src_info.db_type,
+                execution_id=execution_id,
+                manual_id=self.collection_identifier,
+                fetch_size=self.fetch_size,
+            )
+        )
+        engine = get_async_engine(self.src_info, self.database, pool_size=self.collection_concurrency)
+        try:
+            async with engine.connect() as connection:
+                init_results = await collection_manager.execute_init_queries_async(await _driver_connection(connection))
+            collection_manager.set_identifiers(
+                execution_id=execution_id,
+                source_id=init_results.get("init_get_source_id"),
+                db_version=init_results.get("init_get_db_version"),
+            )
+            scripts = sorted(
+                collection_manager.get_collection_queries() | collection_manager.get_extended_collection_queries()
+            )
+            limiter = anyio.CapacityLimiter(self.collection_concurrency)
+            self.console.print(Padding("COLLECTION QUERIES", 1, style="bold", expand=True), width=80)
+            with self.console.status(
+                rf"[bold green]Executing {len(scripts)} queries with a concurrency of {self.collection_concurrency}...[/]"
+            ) as status:
+
+                async def _collect(
+                    script: str, send_stream: MemoryObjectSendStream[tuple[str, pa.RecordBatch]]
+                ) -> None:
+                    async with send_stream, limiter, engine.connect() as connection:
+                        async for batch in collection_manager.stream_script_batches_async(
+                            script, await _driver_connection(connection)
+                        ):
+                            await send_stream.send((script, batch))
+                    status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{script}`[/]")
+
+                await self._run_producers([partial(_collect, script) for script in scripts])
+            self.db_version = collection_manager.get_db_version()
+            self.source_id = collection_manager.source_id
+        finally:
+            await engine.dispose()
+
+    async def collect_db_specific_data_async(self, execution_id: str) -> None:
+        dbs = sorted(self.get_all_dbs())
+        if not dbs:
+            return
+        limiter = anyio.CapacityLimiter(self.database_concurrency)
+        self.console.print(Padding("PER DB QUERIES", 1, style="bold", expand=True), width=80)
+        with self.console.status(
+            rf"[bold green]Collecting {len(dbs)} databases with a concurrency of {self.database_concurrency}...[/]"
+        ) as status:
+
+            async def _collect(db: str, send_stream: MemoryObjectSendStream[tuple[str, pa.RecordBatch]]) -> None:
+                async with send_stream, limiter:
+                    db_collection, skipped = await self._gather_db_specific_data_async(execution_id, db)
+                    for skip_reason in skipped:
+                        status.console.print(rf"[bold magenta]`{db}`[/]: {skip_reason}")
+                    for script, batches in db_collection.items():
+                        for batch in batches:
+                            await send_stream.send((script, batch))
+                status.console.print(rf" [green]:heavy_check_mark:[/] Gathered [bold magenta]`{db}`[/]")
+
+            await self._run_producers([partial(_collect, db) for db in dbs])
+
+    async def _gather_db_specific_data_async(
+        self, execution_id: str, db: str
+    ) -> tuple[dict[str, list[pa.RecordBatch]], list[str]]:
+        collection_manager = next(
+            provide_async_collection_query_manager(
+                db_type=self.src_info.db_type,
+                execution_id=execution_id,
+                source_id=self.source_id,
+                manual_id=self.collection_identifier,
+                db_version=self.db_version,
+                fetch_size=self.fetch_size,
+            )
+        )
+        collection_manager.set_identifiers()
+        engine = get_async_engine(src_info=self.src_info, database=db, pool_size=1)
+        try:
+            async with engine.connect() as connection:
+                return await collection_manager.gather_per_db_collection_queries_async(
+                    await _driver_connection(connection)
+                )
+        finally:
+            await engine.dispose()
+
+    async def _run_producers(
+        self, producers: list[Callable[[MemoryObjectSendStream[tuple[str, pa.RecordBatch]]], Coroutine[Any, Any, None]]]
+    ) -> None:
+        """Run producer tasks concurrently and import everything they send from a single consumer task.
+
+        Returns once every producer finished and all of their batches were written to the local database.
+        """
+        send_stream: MemoryObjectSendStream[tuple[str, pa.RecordBatch]]
+        receive_stream: MemoryObjectReceiveStream[tuple[str, pa.RecordBatch]]
+        send_stream, receive_stream = anyio.create_memory_object_stream(
+            max_buffer_size=max(self.collection_concurrency, self.database_concurrency) * 2
+        )
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(self._consume, receive_stream)
+            async with send_stream:
+                for producer in producers:
+                    task_group.start_soon(producer, send_stream.clone())
+
+    async def _consume(self, receive_stream: MemoryObjectReceiveStream[tuple[str, pa.RecordBatch]]) -> None:
+        import_batches = wrap_sync(self.import_batches)
+        async with receive_stream:
+            async for script, batch in receive_stream:
+                await import_batches([(script, batch)])
+
+
+async def _driver_connection(connection: AsyncConnection) -> Any:
+    raw_connection = await connection.get_raw_connection()
+    return raw_connection.driver_connection
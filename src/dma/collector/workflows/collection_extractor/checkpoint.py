@@ -0,0 +1,144 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from duckdb import DuckDBPyConnection
+
+    from dma.lib.db.base import SourceInfo
+
+CheckpointStage = Literal["collection", "per_db"]
+
+
+class CollectionCheckpoints:
+    """Track the units of work a collection has finished in the local database.
+
+    A unit is a single collection script run against a single database of an execution.  The collection and extended
+    collection scripts are recorded as each one is imported.  The per DB scripts of a database are imported and
+    recorded in one transaction, so a database is either complete or has no rows at all.
+
+    The checkpoint tables are not part of the canonical DDL, so they survive in a persistent local database until
+    the next collection that doesn't resume.
+    """
+
+    def __init__(self, local_db: DuckDBPyConnection) -> None:
+        self.local_db = local_db
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        self.local_db.execute("""
+            create table if not exists collection_execution(
+                execution_id varchar,
+                database_type varchar,
+                hostname varchar,
+                port integer,
+                database_name varchar,
+                started_at timestamptz default current_timestamp,
+                completed_at timestamptz
+            )
+        """)
+        self.local_db.execute("""
+            create table if not exists collection_checkpoint(
+                execution_id varchar,
+                stage varchar,
+                database_name varchar,
+                script varchar,
+                row_count bigint,
+                completed_at timestamptz default current_timestamp
+            )
+        """)
+
+    def clear(self) -> None:
+        """Forget every execution.  Used when the collection tables were recreated for a new collection."""
+        self.local_db.execute("delete from collection_checkpoint")
+        self.local_db.execute("delete from collection_execution")
+
+    def start_execution(self, execution_id: str, src_info: SourceInfo, database: str) -> None:
+        self.local_db.execute(
+            "insert into collection_execution(execution_id, database_type, hostname, port, database_name) values (?, ?, ?, ?, ?)",
+            [execution_id, src_info.db_type, src_info.hostname, src_info.port, database],
+        )
+
+    def complete_execution(self, execution_id: str) -> None:
+        self.local_db.execute(
+            "update collection_execution set completed_at = current_timestamp where execution_id = ?", [execution_id]
+        )
+
+    def resumable_execution(self, src_info: SourceInfo, database: str) -> str | None:
+        """Get the most recent unfinished execution against the same source database, if there is one."""
+        return self._latest_execution(src_info, database, completed=False)
+
+    def last_completed_execution(self, src_info: SourceInfo, database: str) -> str | None:
+        """Get the most recent finished execution against the same source database, if there is one."""
+        return self._latest_execution(src_info, database, completed=True)
+
+    def _latest_execution(self, src_info: SourceInfo, database: str, completed: bool) -> str | None:
+        result = self.local_db.execute(
+            """
+            select execution_id
+            from collection_execution
+            where (completed_at is not null) = ?
+                and database_type = ?
+                and hostname = ?
+                and port = ?
+                and database_name = ?
+            order by started_at desc
+            limit 1
+            """,
+            [completed, src_info.db_type, src_info.hostname, src_info.port, database],
+        ).fetchone()
+        return result[0] if result else None
+
+    def completed_scripts(self, execution_id: str, stage: CheckpointStage, database: str) -> set[str]:
+        result = self.local_db.execute(
+            "select script from collection_checkpoint where execution_id = ? and stage = ? and database_name = ?",
+            [execution_id, stage, database],
+        ).fetchall()
+        return {row[0] for row in result}
+
+    def completed_databases(self, execution_id: str) -> set[str]:
+        result = self.local_db.execute(
+            "select distinct database_name from collection_checkpoint where execution_id = ? and stage = 'per_db'",
+            [execution_id],
+        ).fetchall()
+        return {row[0] for row in result}
+
+    def record(
+        self,
+        execution_id: str,
+        stage: CheckpointStage,
+        database: str,
+        scripts: Iterable[str],
+        row_counts: Mapping[str, int] | None = None,
+    ) -> None:
+        row_counts = row_counts or {}
+        rows = [[execution_id, stage, database, script, row_counts.get(script, 0)] for script in scripts]
+        if rows:
+            self.local_db.executemany(
+                "insert into collection_checkpoint(execution_id, stage, database_name, script, row_count) values (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def record_script(self, execution_id: str, database: str, script: str) -> None:
+        """Record a collection or extended collection script as complete."""
+        self.record(execution_id, "collection", database, [script])
+
+    def discard_partial_results(self, execution_id: str, scripts: Iterable[str]) -> None:
+        """Delete the rows an interrupted run imported for scripts that never completed."""
+        for script in scripts:
+            self.local_db.execute(f"delete from {script} where pkey = ?", [execution_id])  # noqa: S608
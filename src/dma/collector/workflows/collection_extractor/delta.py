@@ -0,0 +1,144 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from duckdb import DuckDBPyConnection
+
+
+@dataclass
+class DeltaBaseline:
+    """The results of the previous collection that a delta collection can reuse."""
+
+    execution_id: str
+    fingerprints: dict[str, str]
+    """The fingerprint of each schema when the previous collection ran."""
+    scripts: dict[str, str] = field(default_factory=dict)
+    """The schema column of each delta script whose previous results were kept."""
+
+    def changed_schemas(self, fingerprints: Mapping[str, str]) -> set[str]:
+        """Get the schemas that are new or whose fingerprint changed.
+
+        Schema names with a double quote are stored with a different character by some scripts, so they can't be
+        matched to the previous results and are always collected again.
+        """
+        return {
+            schema
+            for schema, fingerprint in fingerprints.items()
+            if self.fingerprints.get(schema) != fingerprint or '"' in schema
+        }
+
+
+class SchemaFingerprints:
+    """Store schema fingerprints in the local database so the next collection can skip unchanged schemas.
+
+    Like the checkpoints, these tables are not part of the canonical DDL.  Their rows only describe the collection
+    currently held in the collection tables.
+    """
+
+    def __init__(self, local_db: DuckDBPyConnection) -> None:
+        self.local_db = local_db
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        self.local_db.execute("""
+            create table if not exists collection_schema_fingerprint(
+                execution_id varchar,
+                database_name varchar,
+                schema_name varchar,
+                fingerprint varchar
+            )
+        """)
+        self.local_db.execute("""
+            create table if not exists collection_delta_script(
+                execution_id varchar,
+                database_name varchar,
+                script varchar,
+                schema_column varchar
+            )
+        """)
+
+    def clear(self) -> None:
+        self.local_db.execute("delete from collection_schema_fingerprint")
+        self.local_db.execute("delete from collection_delta_script")
+
+    def record(
+        self, execution_id: str, database: str, fingerprints: Mapping[str, str], scripts: Mapping[str, str]
+    ) -> None:
+        """Record the schema fingerprints and the delta scripts of an execution."""
+        self.local_db.execute(
+            "delete from collection_schema_fingerprint where execution_id = ? and database_name = ?",
+            [execution_id, database],
+        )
+        self.local_db.execute(
+            "delete from collection_delta_script where execution_id = ? and database_name = ?",
+            [execution_id, database],
+        )
+        if fingerprints:
+            self.local_db.executemany(
+                "insert into collection_schema_fingerprint values (?, ?, ?, ?)",
+                [[execution_id, database, schema, fingerprint] for schema, fingerprint in fingerprints.items()],
+            )
+        if scripts:
+            self.local_db.executemany(
+                "insert into collection_delta_script values (?, ?, ?, ?)",
+                [[execution_id, database, script, column] for script, column in scripts.items()],
+            )
+
+    def stash(self, execution_id: str, database: str) -> DeltaBaseline | None:
+        """Copy the results of the delta scripts of an execution into temporary tables.
+
+        This must run before the collection tables are recreated for the next execution.
+        """
+        fingerprints = dict(
+            self.local_db.execute(
+                "select schema_name, fingerprint from collection_schema_fingerprint where execution_id = ? and database_name = ?",
+                [execution_id, database],
+            ).fetchall()
+        )
+        if not fingerprints:
+            return None
+        baseline = DeltaBaseline(execution_id=execution_id, fingerprints=fingerprints)
+        for script, column in self.local_db.execute(
+            "select script, schema_column from collection_delta_script where execution_id = ? and database_name = ?",
+            [execution_id, database],
+        ).fetchall():
+            self.local_db.execute(
+                f"create or replace temp table delta_{script} as select * from {script} where pkey = ?",  # noqa: S608
+                [execution_id],
+            )
+            baseline.scripts[script] = column
+        return baseline
+
+    def restore(self, baseline: DeltaBaseline, execution_id: str, script: str, schemas: set[str]) -> int:
+        """Copy the previous results of a delta script for the given schemas into the current execution.
+
+        Returns:
+            The number of rows restored.
+        """
+        column = baseline.scripts[script]
+        result = self.local_db.execute(
+            f'insert into {script} by name select * replace (cast(? as varchar) as pkey) from temp.delta_{script} where list_contains(?, "{column}")',  # noqa: S608
+            [execution_id, sorted(schemas)],
+        ).fetchone()
+        return result[0] if result else 0
+
+    def drop_stash(self, baseline: DeltaBaseline) -> None:
+        for script in baseline.scripts:
+            self.local_db.execute(f"drop table if exists temp.delta_{script}")
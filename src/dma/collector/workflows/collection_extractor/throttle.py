@@ -0,0 +1,85 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from duckdb import DuckDBPyConnection
+
+    from dma.lib.db.governor import ThrottleDecision
+
+
+class ThrottleEvents:
+    """Record the decisions of the collection governor in the local database.
+
+    Each row is a change the governor made to the pace of a collection, with the source latency and active sessions
+    that caused it, so an assessment shows how hard the source was pushed.  Like the checkpoint tables, the table is
+    not part of the canonical DDL and is exported along with the collection.
+    """
+
+    def __init__(self, local_db: DuckDBPyConnection) -> None:
+        self.local_db = local_db
+        self.create_tables()
+
+    def create_tables(self) -> None:
+        self.local_db.execute("""
+            create table if not exists collection_throttle_event(
+                execution_id varchar,
+                database_name varchar,
+                script varchar,
+                action varchar,
+                concurrency integer,
+                back_off_seconds double,
+                latency_seconds double,
+                active_sessions integer,
+                reason varchar,
+                decided_at timestamptz
+            )
+        """)
+
+    def clear(self) -> None:
+        """Forget the decisions of every execution.  Used when the collection tables were recreated."""
+        self.local_db.execute("delete from collection_throttle_event")
+
+    def record(self, execution_id: str, database: str, decisions: Iterable[ThrottleDecision]) -> None:
+        rows = [
+            [
+                execution_id,
+                database,
+                decision.script,
+                decision.action,
+                decision.concurrency,
+                decision.back_off,
+                decision.latency,
+                decision.active_sessions,
+                decision.reason,
+                decision.decided_at,
+            ]
+            for decision in decisions
+        ]
+        if rows:
+            self.local_db.executemany(
+                "insert into collection_throttle_event values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def count(self, execution_id: str) -> int:
+        result = self.local_db.execute(
+            "select count(*) from collection_throttle_event where execution_id = ? and action = 'throttle'",
+            [execution_id],
+        ).fetchone()
+        return result[0] if result else 0
@@ -0,0 +1,30 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from dma.collector.workflows.collection_import.base import (
+    CollectionImport,
+    CollectionImportResult,
+    ScriptCollection,
+    find_script_collections,
+    get_script_tables,
+)
+
+__all__ = (
+    "CollectionImport",
+    "CollectionImportResult",
+    "ScriptCollection",
+    "find_script_collections",
+    "get_script_tables",
+)
@@ -0,0 +1,344 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import re
+import shutil
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Literal
+
+import duckdb
+from rich.table import Table
+
+from dma.collector.util.postgres.helpers import get_db_major_version
+from dma.lib.exceptions import ApplicationError
+
+if TYPE_CHECKING:
+    from duckdb import DuckDBPyConnection
+    from rich.console import Console
+
+    from dma.collector.query_managers.base import CanonicalQueryManager
+
+CollectionImportStatus = Literal["SUCCESS", "FAILED"]
+
+ARCHIVE_SUFFIXES = (".zip", ".tar.gz", ".tgz", ".tar")
+_ARCHIVE_NAME = re.compile(r"^opdb_(?P<database_type>[a-z]+)_[a-z]+__(?P<file_tag>.+?)(?:_ERROR)?$")
+
+
+@dataclass
+class ScriptCollection:
+    """A collection archive written by the collection scripts."""
+
+    archive: Path
+    database_type: str
+    file_tag: str
+
+    @property
+    def db_version(self) -> str:
+        """The version recorded at the start of the file tag."""
+        return self.file_tag.split("_", 1)[0]
+
+
+@dataclass
+class CollectionImportResult:
+    collection: ScriptCollection
+    status: CollectionImportStatus
+    files: int
+    error: str | None = None
+
+
+def find_script_collections(collections_path: Path) -> list[ScriptCollection]:
+    """Find the collection archives in a directory and its subdirectories.
+
+    Archives are recognised by the `opdb_<database type>_<database type>__<file tag>` name the collection scripts
+    give them.  Other files are ignored.
+    """
+    collections: list[ScriptCollection] = []
+    for archive in sorted(collections_path.rglob("opdb_*")):
+        suffix = next((suffix for suffix in ARCHIVE_SUFFIXES if archive.name.endswith(suffix)), None)
+        if suffix is None or not archive.is_file():
+            continue
+        match = _ARCHIVE_NAME.match(archive.name.removesuffix(suffix))
+        if match is not None:
+            collections.append(ScriptCollection(archive, match["database_type"], match["file_tag"]))
+    return collections
+
+
+def get_script_tables(database_type: str, db_version: str) -> dict[str, str]:
+    """Map the data files of a script collection to the canonical tables they are loaded into.
+
+    Data files are named `opdb__<name>_<file tag>.csv`, and the keys of the mapping are the `<name>` part.  As with a
+    live collection, the version of the source database decides which of the version specific tables is used.
+
+    Raises:
+        ApplicationError: Raised when the collection scripts of the database type have no canonical tables.
+    """
+    if database_type == "postgres":
+        major_version = get_db_major_version(_postgres_version(db_version))
+        version_prefix = "base" if major_version > 13 else "13" if major_version == 13 else "12"
+        return {
+            "pg_applications": "collection_postgres_applications",
+            "pg_aws_extension_dependency": "collection_postgres_aws_extension_dependency",
+            "pg_aws_oracle_exists": "collection_postgres_aws_oracle_exists",
+            "pg_bg_writer_stats": "collection_postgres_bg_writer_stats"
+            if major_version < 17
+            else "collection_postgres_bg_writer_stats_from_pg17",
+            "pg_calculated_metrics": "collection_postgres_calculated_metrics",
+            "pg_data_types": "collection_postgres_data_types",
+            "pg_database_details": f"collection_postgres_{version_prefix}_database_details",
+            "pg_db_machine_specs": "collection_postgres_db_machine_specs",
+            "pg_extensions": "collection_postgres_extensions",
+            "pg_index_details": "collection_postgres_index_details",
+            "pg_replication_slots": f"collection_postgres_{version_prefix}_replication_slots",
+            "pg_replication_stats": "collection_postgres_replication_stats",
+            "pg_schema_details": "collection_postgres_schema_details",
+            "pg_schema_objects": "collection_postgres_schema_objects",
+            "pg_settings": "collection_postgres_settings",
+            "pg_source_details": "collection_postgres_source_details",
+            "pg_table_details": f"collection_postgres_{version_prefix}_table_details",
+        }
+    if database_type == "mysql":
+        version_prefix = "base" if _mysql_version(db_version) >= (8, 0) else "5"
+        return {
+            "mysql_config": "collection_mysql_config",
+            "mysql_data_types": "collection_mysql_data_types",
+            "mysql_database_details": "collection_mysql_database_details",
+            "mysql_engines": "collection_mysql_engines",
+            "mysql_plugins": "collection_mysql_plugins",
+            "mysql_process_list": f"collection_mysql_{version_prefix}_process_list",
+            "mysql_resource_groups": f"collection_mysql_{version_prefix}_resource_groups",
+            "mysql_schema_objects": "collection_mysql_schema_objects",
+            "mysql_table_details": "collection_mysql_table_details",
+            "mysql_users": "collection_mysql_users",
+        }
+    msg = f"Script collections for {database_type} can not be imported into the canonical tables."
+    raise ApplicationError(msg)
+
+
+def _postgres_version(db_version: str) -> str:
+    """Convert the `server_version_num` recorded by the Postgres collection script to a version string."""
+    if not db_version.isdigit():
+        return db_version
+    version_num = int(db_version)
+    if version_num >= 100000:
+        return f"{version_num // 10000}.{version_num % 10000}"
+    return f"{version_num // 10000}.{version_num // 100 % 100}.{version_num % 100}"
+
+
+def _mysql_version(db_version: str) -> tuple[int, int]:
+    """Return the major and minor version of the version recorded by the MySQL collection script.
+
+    Raises:
+        ApplicationError: Raised when the version can not be parsed.
+    """
+    version_match = re.match(r"(\d+)(?:\.(\d+))?", db_version)
+    if version_match is None:
+        msg = f"Could not determine the MySQL version from '{db_version}'."
+        raise ApplicationError(msg)
+    return int(version_match[1]), int(version_match[2] or 0)
+
+
+class CollectionImport:
+    """Load the archives written by the collection scripts into the canonical tables.
+
+    Up to `max_workers` archives are unpacked at once, keeping only the data files that map to a canonical table.
+    Each table is then loaded with a single DuckDB `read_csv` over the files of every collection, which DuckDB parses
+    in parallel.  If a table fails to load, its files are retried one at a time so a malformed file only fails the
+    collection it belongs to.  The other tables of that collection are still loaded.
+    """
+
+    def __init__(
+        self,
+        local_db: DuckDBPyConnection,
+        canonical_query_manager: CanonicalQueryManager,
+        collections_path: Path,
+        console: Console,
+        work_path: Path | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        self.local_db = local_db
+        self.canonical_query_manager = canonical_query_manager
+        self.collections_path = collections_path
+        self.console = console
+        self.work_path = work_path
+        self.max_workers = max(max_workers, 1)
+        self.results: list[CollectionImportResult] = []
+        self.row_counts: dict[str, int] = {}
+
+    def execute(self) -> list[CollectionImportResult]:
+        collections = find_script_collections(self.collections_path)
+        if not collections:
+            msg = f"No collection archives were found in '{self.collections_path!s}'."
+            raise ApplicationError(msg)
+        self.canonical_query_manager.execute_ddl_scripts()
+        staged_files: dict[str, int] = {}
+        errors: dict[str, str] = {}
+        files_by_table: dict[str, list[tuple[ScriptCollection, Path]]] = {}
+        if self.work_path is not None:
+            self.work_path.mkdir(parents=True, exist_ok=True)
+        with (
+            TemporaryDirectory(dir=self.work_path) as staging_dir,
+            self.console.status("[bold green]Importing collections...[/]") as status,
+        ):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(_stage_collection, collection, Path(staging_dir)): collection
+                    for collection in collections
+                }
+                for future in as_completed(futures):
+                    collection = futures[future]
+                    try:
+                        staged = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        errors[collection.file_tag] = str(exc)
+                        continue
+                    staged_files[collection.file_tag] = len(staged)
+                    for table_name, path in staged.items():
+                        files_by_table.setdefault(table_name, []).append((collection, path))
+                    status.update(
+                        rf"[bold green]Importing collections...[/] {len(staged_files) + len(errors)}/{len(collections)} unpacked"
+                    )
+            for table_name, files in sorted(files_by_table.items()):
+                status.update(rf" [yellow]*[/] Loading [bold magenta]`{table_name}`[/]")
+                self.row_counts[table_name] = self._load_table(table_name, files, errors)
+                status.console.print(
+                    rf" [green]:heavy_check_mark:[/] Loaded {self.row_counts[table_name]} rows into [bold magenta]`{table_name}`[/]"
+                )
+        self.results = [
+            CollectionImportResult(
+                collection=collection,
+                status="FAILED" if collection.file_tag in errors else "SUCCESS",
+                files=staged_files.get(collection.file_tag, 0),
+                error=errors.get(collection.file_tag),
+            )
+            for collection in collections
+        ]
+        return self.results
+
+    def print_summary(self) -> None:
+        table = Table(title="Imported Collections", show_lines=False)
+        table.add_column("Collection", style="cyan")
+        table.add_column("Database Type")
+        table.add_column("Files", justify="right")
+        table.add_column("Status")
+        table.add_column("Error", style="dim")
+        styles = {"SUCCESS": "green", "FAILED": "red"}
+        for result in self.results:
+            table.add_row(
+                result.collection.file_tag,
+                result.collection.database_type,
+                str(result.files),
+                f"[{styles[result.status]}]{result.status}[/]",
+                result.error or "",
+            )
+        self.console.print(table)
+        row_table = Table(title="Imported Rows", show_lines=False)
+        row_table.add_column("Table", style="cyan")
+        row_table.add_column("Rows", justify="right")
+        for table_name, row_count in self.row_counts.items():
+            row_table.add_row(table_name, str(row_count))
+        self.console.print(row_table)
+
+    def _load_table(self, table_name: str, files: list[tuple[ScriptCollection, Path]], errors: dict[str, str]) -> int:
+        columns = self.local_db.execute(
+            "select column_name, data_type from duckdb_columns() where database_name = current_database() and schema_name = 'main' and table_name = ? order by column_index",
+            [table_name],
+        ).fetchall()
+        try:
+            return self._insert_files(table_name, columns, [path for _, path in files])
+        except duckdb.Error:
+            row_count = 0
+            for collection, path in files:
+                try:
+                    row_count += self._insert_files(table_name, columns, [path])
+                except duckdb.Error as exc:
+                    errors.setdefault(collection.file_tag, f"Failed to load {table_name}: {exc}")
+            return row_count
+
+    def _insert_files(self, table_name: str, columns: list[tuple[str, str]], paths: list[Path]) -> int:
+        """Insert the data files of a table, casting each column to the type of the canonical table.
+
+        The scripts write upper case headers, except for the headers of empty result sets, so columns are matched
+        regardless of case.  Columns missing from every file are left null and values that do not cast are nulled.
+        """
+        files = ", ".join("'{}'".format(str(path).replace("'", "''")) for path in paths)
+        source = (
+            f"read_csv([{files}], delim = '|', quote = '\"', header = true, skip = 0, all_varchar = true, "
+            "union_by_name = true)"
+        )
+        file_columns: dict[str, list[str]] = {}
+        for column_name, *_ in self.local_db.execute(f"describe select * from {source}").fetchall():  # noqa: S608
+            file_columns.setdefault(column_name.lower(), []).append(column_name)
+        projection = ", ".join(
+            'try_cast(coalesce({}) as {}) as "{}"'.format(
+                ", ".join(f'"{name}"' for name in file_columns[column_name]), data_type, column_name
+            )
+            if column_name in file_columns
+            else f'cast(null as {data_type}) as "{column_name}"'
+            for column_name, data_type in columns
+        )
+        result = self.local_db.execute(
+            f'insert into main."{table_name}" select {projection} from {source}'  # noqa: S608
+        ).fetchone()
+        return int(result[0]) if result else 0
+
+
+def _stage_collection(collection: ScriptCollection, staging_path: Path) -> dict[str, Path]:
+    """Copy the data files of a collection archive that map to a canonical table into the staging directory.
+
+    Returns:
+        The staged file of each canonical table.
+    """
+    tables = get_script_tables(collection.database_type, collection.db_version)
+    collection_path = staging_path / re.sub(r"[^\w.-]", "_", collection.file_tag)
+    collection_path.mkdir()
+    staged: dict[str, Path] = {}
+
+    def _staged_path(member_name: str, size: int) -> Path | None:
+        table_name = tables.get(_data_file_name(member_name, collection.file_tag) or "")
+        if table_name is None or size == 0:
+            return None
+        staged[table_name] = collection_path / f"{table_name}.csv"
+        return staged[table_name]
+
+    if collection.archive.name.endswith(".zip"):
+        with zipfile.ZipFile(collection.archive) as zip_archive:
+            for zip_info in zip_archive.infolist():
+                path = None if zip_info.is_dir() else _staged_path(zip_info.filename, zip_info.file_size)
+                if path is not None:
+                    with zip_archive.open(zip_info) as member, path.open("wb") as staged_file:
+                        shutil.copyfileobj(member, staged_file)
+    else:
+        with tarfile.open(collection.archive, "r:*") as tar_archive:
+            for tar_info in tar_archive:
+                path = _staged_path(tar_info.name, tar_info.size) if tar_info.isfile() else None
+                tar_member = tar_archive.extractfile(tar_info) if path is not None else None
+                if path is not None and tar_member is not None:
+                    with tar_member, path.open("wb") as staged_file:
+                        shutil.copyfileobj(tar_member, staged_file)
+    return staged
+
+
+def _data_file_name(member_name: str, file_tag: str) -> str | None:
+    """Get the `<name>` part of a `opdb__<name>_<file tag>.csv` data file."""
+    file_name = Path(member_name).name
+    suffix = f"_{file_tag}.csv"
+    if not file_name.startswith("opdb__") or not file_name.endswith(suffix):
+        return None
+    return file_name.removeprefix("opdb__").removesuffix(suffix).rstrip("_")
@@ -0,0 +1,531 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import csv
+import faulthandler
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import wait
+from typing import TYPE_CHECKING, Any, Literal, cast, get_args
+
+import pyarrow as pa
+from rich.table import Table
+
+from dma.lib.db.base import SourceInfo
+from dma.lib.db.local import resolve_resource_profile
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE
+from dma.lib.exceptions import ApplicationError
+from dma.types import SupportedSources
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.context import BaseContext
+    from multiprocessing.process import BaseProcess
+    from pathlib import Path
+
+    from duckdb import DuckDBPyConnection
+    from rich.console import Console
+
+    from dma.lib.db.local import ResourceProfile
+
+FleetTargetStatus = Literal["SUCCESS", "FAILED", "TIMEOUT"]
+
+_REQUIRED_INVENTORY_FIELDS = ("db_type", "hostname", "port", "database", "username")
+_STAGING_DATABASE = "fleet_staging"
+
+
+@dataclass
+class FleetTarget:
+    """A source database listed in a fleet inventory."""
+
+    src_info: SourceInfo
+    database: str
+    collection_key: str
+
+
+@dataclass
+class FleetTargetResult:
+    target: FleetTarget
+    status: FleetTargetStatus
+    attempts: int
+    elapsed_seconds: float
+    error: str | None = None
+
+
+@dataclass
+class _RunningAssessment:
+    target: FleetTarget
+    attempt: int
+    process: BaseProcess
+    result_reader: Connection
+    started: float = field(default_factory=time.monotonic)
+    finished: bool = False
+    error: str | None = None
+
+
+def load_inventory(inventory_path: Path) -> list[FleetTarget]:
+    """Load the fleet targets from a CSV or YAML inventory file.
+
+    Every entry needs a `db_type`, `hostname`, `port`, `database` and `username`.  The password is read from
+    `password`, or from the environment variable named by `password_env`.  The `collection_key` identifies the target
+    in the fleet database and defaults to `<db_type>_<hostname>_<port>_<database>`.
+    """
+    suffix = inventory_path.suffix.lower()
+    if suffix == ".csv":
+        with inventory_path.open(newline="", encoding="utf-8") as inventory_file:
+            entries: list[dict[str, Any]] = list(csv.DictReader(inventory_file))
+    elif suffix in {".yaml", ".yml"}:
+        entries = _load_yaml_inventory(inventory_path)
+    else:
+        msg = f"Unsupported inventory file '{inventory_path}'.  Use a .csv, .yaml or .yml file."
+        raise ApplicationError(msg)
+    targets = [_to_fleet_target(entry, idx) for idx, entry in enumerate(entries, start=1)]
+    collection_keys = [target.collection_key for target in targets]
+    if duplicates := sorted({key for key in collection_keys if collection_keys.count(key) > 1}):
+        msg = f"Duplicate collection keys in the inventory: {', '.join(duplicates)}"
+        raise ApplicationError(msg)
+    return targets
+
+
+def _load_yaml_inventory(inventory_path: Path) -> list[dict[str, Any]]:
+    try:
+        import yaml  # noqa: PLC0415
+    except ImportError as exc:
+        msg = "PyYAML is required to read YAML inventories.  Install it with `pip install pyyaml`."
+        raise ApplicationError(msg) from exc
+    inventory = yaml.safe_load(inventory_path.read_text(encoding="utf-8")) or []
+    if isinstance(inventory, dict):
+        inventory = inventory.get("targets", [])
+    if not isinstance(inventory, list) or not all(isinstance(entry, dict) for entry in inventory):
+        msg = f"The inventory '{inventory_path}' must be a list of targets or a mapping with a `targets` list."
+        raise ApplicationError(msg)
+    return inventory
+
+
+def _to_fleet_target(entry: dict[str, Any], idx: int) -> FleetTarget:
+    entry = {key.strip().lower(): value for key, value in entry.items() if key is not None}
+    if missing := [name for name in _REQUIRED_INVENTORY_FIELDS if entry.get(name) in {None, ""}]:
+        msg = f"Inventory entry {idx} is missing {', '.join(missing)}."
+        raise ApplicationError(msg)
+    db_type = str(entry["db_type"]).upper()
+    if db_type not in get_args(SupportedSources):
+        msg = f"Inventory entry {idx} has an unsupported db_type '{entry['db_type']}'."
+        raise ApplicationError(msg)
+    try:
+        port = int(entry["port"])
+    except ValueError as exc:
+        msg = f"Inventory entry {idx} has an invalid port '{entry['port']}'."
+        raise ApplicationError(msg) from exc
+    password = entry.get("password")
+    if password in {None, ""} and entry.get("password_env"):
+        password = os.environ.get(str(entry["password_env"]))
+    if password is None:
+        msg = f"Inventory entry {idx} doesn't provide a password or a `password_env` that is set."
+        raise ApplicationError(msg)
+    hostname, database = str(entry["hostname"]), str(entry["database"])
+    return FleetTarget(
+        src_info=SourceInfo(
+            db_type=cast("SupportedSources", db_type),
+            username=str(entry["username"]),
+            password=str(password),
+            hostname=hostname,
+            port=port,
+        ),
+        database=database,
+        collection_key=str(entry.get("collection_key") or f"{db_type}_{hostname}_{port}_{database}"),
+    )
+
+
+class FleetCheck:
+    """Run the readiness check for every target in a fleet and combine the results.
+
+    Each target is assessed in its own process, writing to its own DuckDB file, with at most `max_workers` running
+    at once.  Attempts that fail or exceed `timeout` seconds are retried up to `retries` times.  As each target
+    finishes, its tables are copied into the fleet database with a `collection_key` column, so a single DuckDB file
+    holds the results of the whole estate.
+
+    With `warehouse` set, the fleet database is the only database written to disk.  Each assessment runs in memory
+    and streams its tables to this process as Arrow record batches over its result pipe, and this process, as the
+    single writer, stages the batches and replaces the rows of the target's `collection_key` in one transaction once
+    the assessment succeeds.  Many concurrent collections can then build one long lived warehouse without contending
+    for file locks.
+
+    The threads and memory of `resource_profile` are split between the workers, so the assessments running at once
+    don't ask DuckDB for more than the machine has.
+    """
+
+    def __init__(
+        self,
+        fleet_db: DuckDBPyConnection,
+        targets: list[FleetTarget],
+        console: Console,
+        work_path: Path,
+        max_workers: int = 4,
+        timeout: float | None = None,
+        retries: int = 1,
+        poll_interval: float = 0.5,
+        warehouse: bool = False,
+        resource_profile: ResourceProfile | None = None,
+    ) -> None:
+        self.fleet_db = fleet_db
+        self.targets = targets
+        self.console = console
+        self.work_path = work_path
+        self.max_workers = max(max_workers, 1)
+        self.timeout = timeout
+        self.retries = max(retries, 0)
+        self.poll_interval = poll_interval
+        self.warehouse = warehouse
+        self.worker_profile = (resource_profile or resolve_resource_profile()).divide(self.max_workers)
+        self.results: list[FleetTargetResult] = []
+        self._staged_tables: dict[str, set[str]] = {}
+
+    def execute(self) -> list[FleetTargetResult]:
+        self.fleet_db.execute("""
+            create table if not exists fleet_check_status(
+                collection_key varchar,
+                database_type varchar,
+                hostname varchar,
+                port integer,
+                database_name varchar,
+                status varchar,
+                attempts integer,
+                elapsed_seconds double,
+                error varchar
+            )
+        """)
+        if self.warehouse:
+            self.fleet_db.execute(f"attach if not exists ':memory:' as {_STAGING_DATABASE}")
+        context = _get_process_context()
+        pending: deque[tuple[FleetTarget, int]] = deque((target, 1) for target in self.targets)
+        running: dict[str, _RunningAssessment] = {}
+        started: dict[str, float] = {}
+        with self.console.status("[bold green]Assessing fleet...[/]") as status:
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    target, attempt = pending.popleft()
+                    started.setdefault(target.collection_key, time.monotonic())
+                    running[target.collection_key] = self._start(context, target, attempt)
+                status.update(
+                    rf"[bold green]Assessing fleet...[/] {len(self.results)}/{len(self.targets)} complete, "
+                    rf"{len(running)} running"
+                )
+                wait(
+                    [assessment.process.sentinel for assessment in running.values()]
+                    + [assessment.result_reader for assessment in running.values()],
+                    timeout=self.poll_interval,
+                )
+                for collection_key, assessment in list(running.items()):
+                    outcome = self._poll(assessment)
+                    if outcome is None:
+                        continue
+                    del running[collection_key]
+                    target_status, error = outcome
+                    if target_status == "SUCCESS":
+                        target_status, error = self._merge_results(assessment.target)
+                    self.discard_staged(assessment.target)
+                    if target_status != "SUCCESS" and assessment.attempt <= self.retries:
+                        status.console.print(
+                            rf" [yellow]*[/] Retrying [bold magenta]`{collection_key}`[/] "
+                            rf"(attempt {assessment.attempt} {target_status.lower()}: {error})"
+                        )
+                        pending.append((assessment.target, assessment.attempt + 1))
+                        continue
+                    self._record_result(
+                        FleetTargetResult(
+                            target=assessment.target,
+                            status=target_status,
+                            attempts=assessment.attempt,
+                            elapsed_seconds=time.monotonic() - started[collection_key],
+                            error=error,
+                        )
+                    )
+                    if target_status == "SUCCESS":
+                        status.console.print(
+                            rf" [green]:heavy_check_mark:[/] Assessed [bold magenta]`{collection_key}`[/]"
+                        )
+                    else:
+                        status.console.print(
+                            rf" [red]:x:[/] Failed to assess [bold magenta]`{collection_key}`[/]: {error}"
+                        )
+        return self.results
+
+    def target_path(self, target: FleetTarget) -> Path:
+        return self.work_path / re.sub(r"[^\w.-]", "_", target.collection_key)
+
+    def merge_target(self, target: FleetTarget, target_db: Path) -> None:
+        """Copy the tables of a target's assessment database into the fleet database.
+
+        Rows are tagged with the target's `collection_key`, and rows from an earlier run for the same key are replaced.
+        """
+        self.fleet_db.execute(f"attach '{target_db!s}' as fleet_target (read_only)")
+        try:
+            self._merge_tables("fleet_target", "main", target.collection_key)
+        finally:
+            self.fleet_db.execute("detach fleet_target")
+
+    def stage_batch(self, target: FleetTarget, table_name: str, batch: pa.RecordBatch) -> None:
+        """Append a record batch streamed by a target's assessment to its staging table."""
+        schema_name = _quote(target.collection_key)
+        staging_table = f"{_STAGING_DATABASE}.{schema_name}.{_quote(table_name)}"
+        self.fleet_db.register("fleet_batch", batch)
+        try:
+            if table_name in self._staged_tables.setdefault(target.collection_key, set()):
+                self.fleet_db.execute(f"insert into {staging_table} by name select * from fleet_batch")  # noqa: S608
+            else:
+                self.fleet_db.execute(f"create schema if not exists {_STAGING_DATABASE}.{schema_name}")
+                self.fleet_db.execute(f"create or replace table {staging_table} as select * from fleet_batch")  # noqa: S608
+                self._staged_tables[target.collection_key].add(table_name)
+        finally:
+            self.fleet_db.unregister("fleet_batch")
+
+    def merge_staged(self, target: FleetTarget) -> None:
+        """Copy the tables a target's assessment streamed into the fleet database, replacing its earlier rows."""
+        if self._staged_tables.get(target.collection_key):
+            self._merge_tables(_STAGING_DATABASE, target.collection_key, target.collection_key)
+
+    def discard_staged(self, target: FleetTarget) -> None:
+        if self._staged_tables.pop(target.collection_key, None) is not None:
+            self.fleet_db.execute(f"drop schema if exists {_STAGING_DATABASE}.{_quote(target.collection_key)} cascade")
+
+    def _merge_tables(self, database_name: str, schema_name: str, collection_key: str) -> None:
+        tables = self.fleet_db.execute(
+            "select table_name from duckdb_tables() where database_name = ? and schema_name = ?",
+            [database_name, schema_name],
+        ).fetchall()
+        self.fleet_db.execute("begin transaction")
+        try:
+            for (table_name,) in tables:
+                self._merge_table(database_name, schema_name, table_name, collection_key)
+            self.fleet_db.execute("commit")
+        except Exception:
+            self.fleet_db.execute("rollback")
+            raise
+
+    def _merge_table(self, database_name: str, schema_name: str, table_name: str, collection_key: str) -> None:
+        source_columns = dict(
+            self.fleet_db.execute(
+                "select column_name, data_type from duckdb_columns() where database_name = ? and schema_name = ? and table_name = ?",
+                [database_name, schema_name, table_name],
+            ).fetchall()
+        )
+        source_table = f"{database_name}.{_quote(schema_name)}.{_quote(table_name)}"
+        projection = (
+            "* replace (cast(? as varchar) as collection_key)"
+            if "collection_key" in source_columns
+            else "cast(? as varchar) as collection_key, *"
+        )
+        self.fleet_db.execute(
+            f'create table if not exists main."{table_name}" as select {projection} from {source_table} limit 0',  # noqa: S608
+            [collection_key],
+        )
+        fleet_columns = {
+            row[0]
+            for row in self.fleet_db.execute(
+                "select column_name from duckdb_columns() where database_name = current_database() and schema_name = 'main' and table_name = ?",
+                [table_name],
+            ).fetchall()
+        }
+        for column_name, data_type in source_columns.items():
+            if column_name not in fleet_columns:
+                self.fleet_db.execute(f'alter table main."{table_name}" add column "{column_name}" {data_type}')
+        self.fleet_db.execute(f'delete from main."{table_name}" where collection_key = ?', [collection_key])  # noqa: S608
+        self.fleet_db.execute(
+            f'insert into main."{table_name}" by name select {projection} from {source_table}',  # noqa: S608
+            [collection_key],
+        )
+
+    def print_summary(self) -> None:
+        table = Table(title="Fleet Readiness Check", show_lines=False)
+        table.add_column("Collection Key", style="cyan")
+        table.add_column("Status")
+        table.add_column("Attempts", justify="right")
+        table.add_column("Elapsed (s)", justify="right")
+        table.add_column("Error", style="dim")
+        styles = {"SUCCESS": "green", "FAILED": "red", "TIMEOUT": "yellow"}
+        for result in sorted(self.results, key=lambda result: result.target.collection_key):
+            table.add_row(
+                result.target.collection_key,
+                f"[{styles[result.status]}]{result.status}[/]",
+                str(result.attempts),
+                f"{result.elapsed_seconds:.1f}",
+                result.error or "",
+            )
+        self.console.print(table)
+
+    def _start(self, context: BaseContext, target: FleetTarget, attempt: int) -> _RunningAssessment:
+        result_reader, result_writer = context.Pipe(duplex=False)
+        process = context.Process(  # type: ignore[attr-defined]
+            target=_assess_target,
+            args=(target, self.target_path(target), result_writer, self.warehouse, self.worker_profile),
+            name=f"dma-fleet-{target.collection_key}",
+            daemon=True,
+        )
+        process.start()
+        result_writer.close()
+        return _RunningAssessment(target=target, attempt=attempt, process=process, result_reader=result_reader)
+
+    def _poll(self, assessment: _RunningAssessment) -> tuple[FleetTargetStatus, str | None] | None:
+        """Check on a running assessment, returning its outcome once it has finished or timed out."""
+        process = assessment.process
+        if process.is_alive():
+            self._receive(assessment)
+            if self.timeout is None or time.monotonic() - assessment.started < self.timeout:
+                return None
+            process.terminate()
+            process.join(5)
+            if process.is_alive():
+                process.kill()
+                process.join()
+            assessment.result_reader.close()
+            return "TIMEOUT", f"Timed out after {self.timeout:g} seconds"
+        process.join()
+        self._receive(assessment)
+        assessment.result_reader.close()
+        if process.exitcode == 0 and assessment.finished and assessment.error is None:
+            return "SUCCESS", None
+        return "FAILED", assessment.error or f"Exited with code {process.exitcode}"
+
+    def _receive(self, assessment: _RunningAssessment) -> None:
+        """Stage the record batches an assessment has streamed so far, and keep its result once it is sent.
+
+        Batches arrive as `(table_name, batch)` tuples, and the result is `None` or the error of a failed assessment.
+        """
+        while not assessment.finished and assessment.result_reader.poll():
+            try:
+                message = assessment.result_reader.recv()
+            except EOFError:
+                return
+            if isinstance(message, tuple):
+                self.stage_batch(assessment.target, *message)
+            else:
+                assessment.error, assessment.finished = message, True
+
+    def _merge_results(self, target: FleetTarget) -> tuple[FleetTargetStatus, str | None]:
+        try:
+            if self.warehouse:
+                self.merge_staged(target)
+            else:
+                self.merge_target(target, self.target_path(target) / "assessment.db")
+        except Exception as exc:  # noqa: BLE001
+            return "FAILED", f"Failed to merge results: {exc}"
+        return "SUCCESS", None
+
+    def _record_result(self, result: FleetTargetResult) -> None:
+        self.results.append(result)
+        src_info = result.target.src_info
+        self.fleet_db.execute("delete from fleet_check_status where collection_key = ?", [result.target.collection_key])
+        self.fleet_db.execute(
+            "insert into fleet_check_status values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                result.target.collection_key,
+                src_info.db_type,
+                src_info.hostname,
+                src_info.port,
+                result.target.database,
+                result.status,
+                result.attempts,
+                result.elapsed_seconds,
+                result.error,
+            ],
+        )
+
+
+def _get_process_context() -> BaseContext:
+    """Get the multiprocessing context used for the assessment processes.
+
+    Where available, a fork server with the collector preloaded is used, so each assessment starts from a process
+    that has already paid for the interpreter start up and imports.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["dma.collector.workflows.readiness_check.base"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _assess_target(
+    target: FleetTarget,
+    target_path: Path,
+    result_writer: Connection,
+    warehouse: bool = False,
+    resource_profile: ResourceProfile | None = None,
+) -> None:
+    """Run the readiness check for a single target.  This is the entry point of the assessment processes.
+
+    In warehouse mode the assessment database is kept in memory and its tables are streamed over `result_writer`.
+    """
+    from dma.cli._utils import console  # noqa: PLC0415
+    from dma.lib.db.local import get_duckdb_connection  # noqa: PLC0415
+
+    faulthandler.enable()
+    console.quiet = True
+    try:
+        target_path.mkdir(parents=True, exist_ok=True)
+        with get_duckdb_connection(
+            working_path=target_path / "tmp",
+            export_path=None if warehouse else target_path,
+            resource_profile=resource_profile,
+        ) as local_db:
+            _run_readiness_check(local_db, target, target_path / "tmp", console)
+            if warehouse:
+                _send_tables(local_db, result_writer)
+    except Exception as exc:  # noqa: BLE001
+        result_writer.send(f"{type(exc).__name__}: {exc}")
+    else:
+        result_writer.send(None)
+    finally:
+        result_writer.close()
+
+
+def _run_readiness_check(
+    local_db: DuckDBPyConnection, target: FleetTarget, working_path: Path, console: Console
+) -> None:
+    from dma.collector.workflows.readiness_check.base import ReadinessCheck  # noqa: PLC0415
+
+    workflow = ReadinessCheck(
+        local_db=local_db,
+        src_info=target.src_info,
+        database=target.database,
+        console=console,
+        collection_identifier=target.collection_key,
+        working_path=working_path,
+    )
+    workflow.execute()
+    local_db.execute(
+        "insert into database_summary(collection_key, database_name, database_type, database_version) values (?, ?, ?, ?)",
+        [target.collection_key, target.database, target.src_info.db_type, workflow.db_version],
+    )
+
+
+def _send_tables(local_db: DuckDBPyConnection, result_writer: Connection) -> None:
+    """Stream every table of an assessment database as `(table_name, batch)` messages."""
+    tables = local_db.execute(
+        "select table_name from duckdb_tables() where database_name = current_database() and schema_name = 'main'"
+    ).fetchall()
+    for (table_name,) in tables:
+        result = local_db.execute(f"select * from main.{_quote(table_name)}").arrow()  # noqa: S608
+        # `arrow()` returns a table before DuckDB 1.5 and a record batch reader from 1.5 on
+        batches = result.to_batches(max_chunksize=DEFAULT_BATCH_SIZE) if isinstance(result, pa.Table) else result
+        for batch in batches:
+            result_writer.send((table_name, batch))
+
+
+def _quote(identifier: str) -> str:
+    return '"{}"'.format(identifier.replace('"', '""'))
@@ -70,8 +70,9 @@ class MySQLReadinessCheckExecutor(ReadinessCheckExecutor):
 
     def execute(self) -> None:
         """Execute postgres checks"""
-        self._check_version()
-        self._check_plugins()
+        with self.buffered_results():
+            self._check_version()
+            self._check_plugins()
 
     def _check_version(self) -> None:
         rule_code = "DATABASE_VERSION"
@@ -121,31 +121,66 @@ class PostgresReadinessCheckExecutor(ReadinessCheckExecutor):
 
     def execute(self) -> None:
         """Execute postgres checks"""
-        self._check_version()
-        self._check_collation()
-        self._check_rds_logical_replication()
-        self._check_wal_level()
-        self._check_max_replication_slots()
-        self._check_max_wal_senders_replication_slots()
-        self._check_max_worker_processes()
-        self._check_fdw()
+        with self.buffered_results():
+            self._check_version()
+            self._check_collation()
+            self._check_rds_logical_replication()
+            self._check_wal_level()
+            self._check_max_replication_slots()
+            self._check_max_wal_senders_replication_slots()
+            self._check_max_worker_processes()
+            self._check_fdw()
 
         # Per DB Checks.
-        self._check_extensions()
-        self._check_replication_role()
-        # db_check_results stores the verification results for all DBs.
-        for config in self.rule_config:
-            db_check_results: dict[str, dict[str, list]] = {}
-            for db in sorted(self.get_all_dbs()):
-                is_pglogical_installed = self._check_pglogical_installed(db, db_check_results)
-                if is_pglogical_installed:
-                    privilege_check_passed = self._check_privileges(db, db_check_results)
-                    if not privilege_check_passed:
-                        continue
-                    self._check_if_node_exists(db, db_check_results)
-                self._check_tables_without_pk(db, db_check_results)
-                self._check_tables_replica_identity(db, db_check_results)
-            self._save_results(config.db_variant, db_check_results)
+        with self.buffered_results():
+            self._check_extensions()
+            self._check_replication_role()
+            # The per DB results don't depend on the migration target, so they are evaluated once for every DB.
+            db_check_results = self._check_databases(sorted(self.get_all_dbs()))
+            for config in self.rule_config:
+                self._save_results(config.db_variant, db_check_results)
+
+    def _check_databases(self, dbs: list[str]) -> dict[str, dict[str, list]]:
+        """Evaluate the per DB rules for every database.
+
+        Each collection table is read once, grouped by database, rather than queried separately for every database.
+        """
+        pglogical_dbs = self._get_pglogical_databases()
+        privilege_errors = self._get_privilege_errors(pglogical_dbs)
+        provider_node_dbs = self._get_provider_node_databases()
+        tables_without_pk = self._get_tables_by_database("collection_postgres_tables_with_no_primary_key")
+        tables_with_replica_identity = self._get_tables_by_database(
+            "collection_postgres_tables_with_primary_key_replica_identity"
+        )
+        db_check_results: dict[str, dict[str, list]] = {}
+        for db in dbs:
+            init_results_dict(db_check_results, PGLOGICAL_INSTALLED)
+            if db in pglogical_dbs:
+                db_check_results[PGLOGICAL_INSTALLED][PASS].append(db)
+                init_results_dict(db_check_results, PRIVILEGES)
+                if errors := privilege_errors.get(db, []):
+                    all_errors = "\n".join(errors)
+                    db_check_results[PRIVILEGES][ACTION_REQUIRED].append(f"{all_errors} in database {db}")
+                    continue
+                db_check_results[PRIVILEGES][PASS].append(
+                    f"User has all privileges required for migration for the database {db}"
+                )
+                init_results_dict(db_check_results, PGLOGICAL_NODE_ALREADY_EXISTS)
+                severity = ACTION_REQUIRED if db in provider_node_dbs else PASS
+                db_check_results[PGLOGICAL_NODE_ALREADY_EXISTS][severity].append(db)
+            else:
+                db_check_results[PGLOGICAL_INSTALLED][ACTION_REQUIRED].append(db)
+            init_results_dict(db_check_results, TABLES_WITH_NO_PK)
+            if tables := tables_without_pk.get(db):
+                db_check_results[TABLES_WITH_NO_PK][WARNING].append(
+                    f"In database {db}, {tables} don't have primary keys"
+                )
+            init_results_dict(db_check_results, UNSUPPORTED_TABLES_WITH_REPLICA_IDENTITY)
+            if tables := tables_with_replica_identity.get(db):
+                db_check_results[UNSUPPORTED_TABLES_WITH_REPLICA_IDENTITY][ACTION_REQUIRED].append(
+                    f"{tables} in database {db}"
+                )
+        return db_check_results
 
     def _save_results(self, db_variant: PostgresVariants, db_check_results: dict[str, dict[str, list]]) -> None:
         for rule, result in db_check_results.items():
@@ -224,27 +259,11 @@ class PostgresReadinessCheckExecutor(ReadinessCheckExecutor):
                     "All utilized collations are supported.",
                 )
 
-    def _check_tables_without_pk(self, db_name: str, db_check_results: dict[str, dict[str, list]]) -> None:
-        rule_code = TABLES_WITH_NO_PK
-        result = self.local_db.sql(
-            "select CONCAT(nspname, '.', relname) from collection_postgres_tables_with_no_primary_key where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchall()
-        tables = ", ".join(row[0] for row in result)
-        init_results_dict(db_check_results, rule_code)
-        if tables:
-            db_check_results[rule_code][WARNING].append(f"In database {db_name}, {tables} don't have primary keys")
-
-    def _check_tables_replica_identity(self, db_name: str, db_check_results: dict[str, dict[str, list]]) -> None:
-        rule_code = UNSUPPORTED_TABLES_WITH_REPLICA_IDENTITY
+    def _get_tables_by_database(self, table_name: str) -> dict[str, str]:
         result = self.local_db.sql(
-            "select CONCAT(nspname, '.', relname) from collection_postgres_tables_with_primary_key_replica_identity where database_name = $db_name",
-            params={"db_name": db_name},
+            f"select database_name, string_agg(CONCAT(nspname, '.', relname), ', ') from {table_name} group by database_name"  # noqa: S608
         ).fetchall()
-        tables = ", ".join(row[0] for row in result)
-        init_results_dict(db_check_results, rule_code)
-        if tables:
-            db_check_results[rule_code][ACTION_REQUIRED].append(f"{tables} in database {db_name}")
+        return {row[0]: row[1] for row in result}
 
     def _check_version(self) -> None:
         rule_code = "DATABASE_VERSION"
@@ -291,91 +310,71 @@ class PostgresReadinessCheckExecutor(ReadinessCheckExecutor):
                     f"Version {self.db_version} is supported.  Please ensure that you selected a version that meets or exceeds version {detected_major_version!s}.",
                 )
 
-    def _check_pglogical_installed(self, db_name: str, db_check_results: dict[str, dict[str, list]]) -> bool:
-        rule_code = PGLOGICAL_INSTALLED
-        result = self.local_db.sql(
-            query="select count(*) from collection_postgres_extensions where extension_name = 'pglogical' and database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchone()
-        is_installed = result[0] > 0 if result is not None else False
-        init_results_dict(db_check_results, rule_code)
-        if not is_installed:
-            db_check_results[rule_code][ACTION_REQUIRED].append(db_name)
-        else:
-            db_check_results[rule_code][PASS].append(db_name)
-        return is_installed
-
-    def _check_pglogical_schema_usage_privilege(self, db_name: str) -> str | None:
-        result = self.local_db.sql(
-            "select has_schema_usage_privilege from collection_postgres_pglogical_schema_usage_privilege where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchone()
-        if result is None:
-            return "Empty result reading pglogical schema usage privilege for the user"
-        if not result[0]:
-            return "user doesn't have USAGE privilege on schema pglogical"
-        return None
-
-    def _check_pglogical_privileges(self, db_name: str) -> list[str]:
-        err = self._check_pglogical_schema_usage_privilege(db_name)
-        if err is not None:
-            return [err]
+    def _get_pglogical_databases(self) -> set[str]:
         result = self.local_db.sql(
-            "select has_tables_select_privilege, has_local_node_select_privilege, has_node_select_privilege, has_node_interface_select_privilege from collection_postgres_pglogical_privileges where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchone()
-        errors: list[str] = []
-        if result is None:
-            errors.append("Empty result reading pglogical privileges for the user")
-        else:
-            if not result[0]:
-                errors.append("user doesn't have SELECT privilege on table pglogical.tables")
-            if not result[1]:
-                errors.append("user doesn't have SELECT privilege on table pglogical.local_node")
-            if not result[2]:
-                errors.append("user doesn't have SELECT privilege on table pglogical.node")
-            if not result[3]:
-                errors.append("user doesn't have SELECT privilege on table pglogical.node_interface")
-        return errors
-
-    def _check_if_node_exists(self, db_name: str, db_check_results: dict[str, dict[str, list]]) -> None:
-        rule_code = PGLOGICAL_NODE_ALREADY_EXISTS
-        result = self.local_db.sql(
-            "select count(*) from collection_postgres_pglogical_provider_node where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchone()
-        node_exists = result[0] > 0 if result is not None else False
-        init_results_dict(db_check_results, rule_code)
-        if node_exists:
-            db_check_results[rule_code][ACTION_REQUIRED].append(db_name)
-        else:
-            db_check_results[rule_code][PASS].append(db_name)
-
-    def check_user_obj_privileges(self, db_name: str) -> list[str]:
-        errors: list[str] = []
-        rows = self.local_db.sql(
-            "select namespace_name from collection_postgres_user_schemas_without_privilege where database_name = $db_name",
-            params={"db_name": db_name},
+            "select distinct database_name from collection_postgres_extensions where extension_name = 'pglogical'"
         ).fetchall()
-        errors.extend(f"user doesn't have USAGE privilege on schema {row[0]}" for row in rows)
+        return {row[0] for row in result}
 
-        rows = self.local_db.sql(
-            "select schema_name, table_name from collection_postgres_user_tables_without_privilege where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchall()
-        errors.extend(f"user doesn't have SELECT privilege on table {row[0]}.{row[1]}" for row in rows)
-
-        rows = self.local_db.sql(
-            "select schema_name, view_name from collection_postgres_user_views_without_privilege where database_name = $db_name",
-            params={"db_name": db_name},
+    def _get_provider_node_databases(self) -> set[str]:
+        result = self.local_db.sql(
+            "select distinct database_name from collection_postgres_pglogical_provider_node"
         ).fetchall()
-        errors.extend(f"user doesn't have SELECT privilege on view {row[0]}.{row[1]}" for row in rows)
+        return {row[0] for row in result}
+
+    def _get_privilege_errors(self, pglogical_dbs: set[str]) -> dict[str, list[str]]:
+        """Get the privileges the user is missing for a pglogical migration, keyed by database."""
+        errors: dict[str, list[str]] = defaultdict(list)
+        schema_usage = dict(
+            self.local_db.sql(
+                "select database_name, any_value(has_schema_usage_privilege) from collection_postgres_pglogical_schema_usage_privilege group by database_name"
+            ).fetchall()
+        )
+        privileges = {
+            row[0]: row[1:]
+            for row in self.local_db.sql(
+                "select database_name, any_value(has_tables_select_privilege), any_value(has_local_node_select_privilege), any_value(has_node_select_privilege), any_value(has_node_interface_select_privilege) from collection_postgres_pglogical_privileges group by database_name"
+            ).fetchall()
+        }
+        for db in pglogical_dbs:
+            if db not in schema_usage:
+                errors[db].append("Empty result reading pglogical schema usage privilege for the user")
+            elif not schema_usage[db]:
+                errors[db].append("user doesn't have USAGE privilege on schema pglogical")
+            elif db not in privileges:
+                errors[db].append("Empty result reading pglogical privileges for the user")
+            else:
+                tables, local_node, node, node_interface = privileges[db]
+                if not tables:
+                    errors[db].append("user doesn't have SELECT privilege on table pglogical.tables")
+                if not local_node:
+                    errors[db].append("user doesn't have SELECT privilege on table pglogical.local_node")
+                if not node:
+                    errors[db].append("user doesn't have SELECT privilege on table pglogical.node")
+                if not node_interface:
+                    errors[db].append("user doesn't have SELECT privilege on table pglogical.node_interface")
+        for db, errors_for_db in self._get_user_obj_privilege_errors().items():
+            errors[db].extend(errors_for_db)
+        return errors
 
-        rows = self.local_db.sql(
-            "select namespace_name, rel_name from collection_postgres_user_sequences_without_privilege where database_name = $db_name",
-            params={"db_name": db_name},
-        ).fetchall()
-        errors.extend(f"user doesn't have SELECT privilege on sequence {row[0]}.{row[1]}" for row in rows)
+    def _get_user_obj_privilege_errors(self) -> dict[str, list[str]]:
+        errors: dict[str, list[str]] = defaultdict(list)
+        for db, namespace_name in self.local_db.sql(
+            "select database_name, namespace_name from collection_postgres_user_schemas_without_privilege"
+        ).fetchall():
+            errors[db].append(f"user doesn't have USAGE privilege on schema {namespace_name}")
+        for db, schema_name, table_name in self.local_db.sql(
+            "select database_name, schema_name, table_name from collection_postgres_user_tables_without_privilege"
+        ).fetchall():
+            errors[db].append(f"user doesn't have SELECT privilege on table {schema_name}.{table_name}")
+        for db, schema_name, view_name in self.local_db.sql(
+            "select database_name, schema_name, view_name from collection_postgres_user_views_without_privilege"
+        ).fetchall():
+            errors[db].append(f"user doesn't have SELECT privilege on view {schema_name}.{view_name}")
+        for db, namespace_name, rel_name in self.local_db.sql(
+            "select database_name, namespace_name, rel_name from collection_postgres_user_sequences_without_privilege"
+        ).fetchall():
+            errors[db].append(f"user doesn't have SELECT privilege on sequence {namespace_name}.{rel_name}")
         return errors
 
     def _check_replication_role(self) -> None:
@@ -401,21 +400,6 @@ class PostgresReadinessCheckExecutor(ReadinessCheckExecutor):
                     "user has rolreplication role.",
                 )
 
-    def _check_privileges(self, db_name: str, db_check_results: dict[str, dict[str, list]]) -> bool:
-        rule_code = PRIVILEGES
-        errors = self._check_pglogical_privileges(db_name)
-
-        errors.extend(self.check_user_obj_privileges(db_name))
-        all_errors = "\n".join(errors)
-        init_results_dict(db_check_results, rule_code)
-        if len(errors) > 0:
-            db_check_results[rule_code][ACTION_REQUIRED].append(f"{all_errors} in database {db_name}")
-        else:
-            db_check_results[rule_code][PASS].append(
-                f"User has all privileges required for migration for the database {db_name}"
-            )
-        return len(errors) == 0
-
     def _check_wal_level(self) -> None:
         rule_code = "WAL_LEVEL"
         result = self.local_db.sql(
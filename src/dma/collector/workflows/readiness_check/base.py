@@ -13,23 +13,28 @@
 # limitations under the License.
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
+import pyarrow as pa
 from rich.console import Console
 from rich.table import Table
 
 from dma.collector.dependencies import provide_canonical_queries
-from dma.collector.workflows.collection_extractor.base import CollectionExtractor
+from dma.collector.workflows.collection_extractor.base import AsyncCollectionExtractor, CollectionExtractor
+from dma.lib.db.query_manager import DEFAULT_BATCH_SIZE
 from dma.lib.exceptions import ApplicationError
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
     from duckdb import DuckDBPyConnection
     from rich.console import Console
 
     from dma.lib.db.base import SourceInfo
+    from dma.lib.db.governor import SourceLimits
     from dma.types import (
         MSSQLVariants,
         MySQLVariants,
@@ -56,6 +61,13 @@ class ReadinessCheck:
         console: Console,
         collection_identifier: str | None,
         working_path: Path | None = None,
+        collection_concurrency: int = 1,
+        database_concurrency: int = 1,
+        fetch_size: int = DEFAULT_BATCH_SIZE,
+        async_collection: bool = False,
+        resume: bool = False,
+        delta: bool = False,
+        source_limits: SourceLimits | None = None,
     ) -> None:
         self.executor: ReadinessCheckExecutor | None = None
         self.collection_extractor: CollectionExtractor | None = None
@@ -65,6 +77,13 @@ class ReadinessCheck:
         self.console = console
         self.collection_identifier = collection_identifier
         self.working_path = working_path
+        self.collection_concurrency = collection_concurrency
+        self.database_concurrency = database_concurrency
+        self.fetch_size = fetch_size
+        self.async_collection = async_collection
+        self.resume = resume
+        self.delta = delta
+        self.source_limits = source_limits
 
     def execute(self) -> None:
         self.execute_data_collection()
@@ -75,13 +94,20 @@ class ReadinessCheck:
             provide_canonical_queries(local_db=self.local_db, working_path=self.working_path)
         )
 
-        self.collection_extractor = CollectionExtractor(
+        extractor_class = AsyncCollectionExtractor if self.async_collection else CollectionExtractor
+        self.collection_extractor = extractor_class(
             local_db=self.local_db,
             src_info=self.src_info,
             database=self.database,
             canonical_query_manager=canonical_query_manager,
             console=self.console,
             collection_identifier=self.collection_identifier,
+            collection_concurrency=self.collection_concurrency,
+            database_concurrency=self.database_concurrency,
+            fetch_size=self.fetch_size,
+            resume=self.resume,
+            delta=self.delta,
+            source_limits=self.source_limits,
         )
         self.collection_extractor.execute()
         self.db_version = self.collection_extractor.get_db_version()
@@ -133,6 +159,7 @@ class ReadinessCheckExecutor:
         self.readiness_check = readiness_check
         self.local_db = readiness_check.local_db
         self.db_version = readiness_check.db_version
+        self._result_buffer: list[tuple[str, str, str, str]] | None = None
 
     def execute(self) -> None:
         """Execute checks"""
@@ -157,7 +184,46 @@ class ReadinessCheckExecutor:
         severity: SeverityLevels,
         info: str,
     ) -> None:
+        if self._result_buffer is not None:
+            self._result_buffer.append((migration_target, rule_code, severity, info))
+            return
         self.local_db.execute(
             "insert into readiness_check_summary(migration_target, rule_code, severity, info) values (?,?,?,?)",
             [migration_target, rule_code, severity, info],
         )
+
+    @contextmanager
+    def buffered_results(self) -> Iterator[None]:
+        """Buffer the rule results saved within the block and write them to `readiness_check_summary` in bulk.
+
+        Nested blocks share the outermost buffer.  Results buffered before an error are still written.
+        """
+        if self._result_buffer is not None:
+            yield
+            return
+        self._result_buffer = []
+        try:
+            yield
+        finally:
+            results, self._result_buffer = self._result_buffer, None
+            self._write_rule_results(results)
+
+    def _write_rule_results(self, results: list[tuple[str, str, str, str]]) -> None:
+        if not results:
+            return
+        migration_targets, rule_codes, severities, infos = zip(*results, strict=True)
+        self.local_db.register(
+            "obj_readiness_check_summary",
+            pa.table({
+                "migration_target": migration_targets,
+                "rule_code": rule_codes,
+                "severity": severities,
+                "info": infos,
+            }),
+        )
+        try:
+            self.local_db.execute(
+                "insert into readiness_check_summary(migration_target, rule_code, severity, info) select migration_target, rule_code, severity, info from obj_readiness_check_summary"
+            )
+        finally:
+            self.local_db.unregister("obj_readiness_check_summary")
@@ -12,24 +12,3 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from __future__ import annotations
-
-import contextlib
-
-import aiosql
-
-with contextlib.suppress(ImportError):
-    from dma.lib.db.adapters.aioodbc import AIOODBCAdapter
-
-    aiosql.register_adapter("aioodbc", AIOODBCAdapter)  # type: ignore[arg-type]
-with contextlib.suppress(ImportError):
-    from dma.lib.db.adapters.oracledb import AsyncOracleDBAdapter
-
-    aiosql.register_adapter("async_oracledb", AsyncOracleDBAdapter)  # type: ignore[arg-type]
-with contextlib.suppress(ImportError):
-    from dma.lib.db.adapters.asyncmy import AsyncMYAdapter
-
-    aiosql.register_adapter("asyncmy", AsyncMYAdapter)  # type: ignore[arg-type]
-with contextlib.suppress(ImportError):
-    from dma.lib.db.adapters.asyncpg import AsyncPGAdapter
-
-    aiosql.register_adapter("asyncpg", AsyncPGAdapter)  # type: ignore[arg-type]
@@ -13,16 +13,26 @@
 # limitations under the License.
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import astuple, dataclass, field
+from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import URL, Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 if TYPE_CHECKING:
     from dma.types import (
         SupportedSources,
     )
 
+DEFAULT_MAX_ENGINES = 16
+"""The number of source engines kept by the engine registry before the least recently used one is disposed."""
+DEFAULT_ENGINE_IDLE_TIMEOUT = 300.0
+"""The number of seconds an unused source engine is kept by the engine registry."""
+
 
 @dataclass
 class SourceInfo:
@@ -36,7 +46,12 @@ class SourceInfo:
 def get_engine(
     src_info: SourceInfo,
     database: str,
+    **engine_options: Any,
 ) -> Engine:
+    """Create an engine for the source database.
+
+    `engine_options` are passed on to `create_engine`, such as the pool settings of the engine.
+    """
     if src_info.db_type == "POSTGRES":
         return create_engine(
             URL(
@@ -49,6 +64,7 @@ def get_engine(
                 query={},  # type: ignore[arg-type]
             ),
             isolation_level="AUTOCOMMIT",
+            **engine_options,
         )
     if src_info.db_type == "MYSQL":
         return create_engine(
@@ -61,6 +77,7 @@ def get_engine(
                 database=database,
                 query={},  # type: ignore[arg-type]
             ),
+            **engine_options,
         )
     if src_info.db_type == "MSSQL":
         return create_engine(
@@ -81,6 +98,7 @@ def get_engine(
                     "MARS_Connection": "yes",
                 },  # type: ignore[arg-type]
             ),
+            **engine_options,
         )
     if src_info.db_type == "ORACLE":
         return create_engine(
@@ -93,6 +111,165 @@ def get_engine(
                 "port": src_info.port,
                 "service_name": database,
             },
+            **engine_options,
         )
     msg = f"{src_info.db_type} is not a supported engine."  # type: ignore[unreachable]
     raise NotImplementedError(msg)
+
+
+def get_async_engine(
+    src_info: SourceInfo,
+    database: str,
+    pool_size: int = 5,
+) -> AsyncEngine:
+    """Create an asyncio engine for the source database.
+
+    The pool is sized for the number of connections that will be used concurrently.
+    """
+    if src_info.db_type == "POSTGRES":
+        return create_async_engine(
+            URL(
+                drivername="postgresql+psycopg",
+                username=src_info.username,
+                password=src_info.password,
+                host=src_info.hostname,
+                port=src_info.port,
+                database=database,
+                query={},  # type: ignore[arg-type]
+            ),
+            isolation_level="AUTOCOMMIT",
+            pool_size=pool_size,
+        )
+    if src_info.db_type == "MYSQL":
+        return create_async_engine(
+            URL(
+                drivername="mysql+asyncmy",
+                username=src_info.username,
+                password=src_info.password,
+                host=src_info.hostname,
+                port=src_info.port,
+                database=database,
+                query={},  # type: ignore[arg-type]
+            ),
+            pool_size=pool_size,
+        )
+    if src_info.db_type == "MSSQL":
+        return create_async_engine(
+            URL(
+                drivername="mssql+aioodbc",
+                username=src_info.username,
+                password=src_info.password,
+                host=src_info.hostname,
+                port=src_info.port,
+                database=database,
+                query={
+                    "driver": "ODBC Driver 18 for SQL Server",
+                    "encrypt": "no",
+                    "TrustServerCertificate": "yes",
+                    "MARS_Connection": "yes",
+                },  # type: ignore[arg-type]
+            ),
+            pool_size=pool_size,
+        )
+    if src_info.db_type == "ORACLE":
+        return create_async_engine(
+            "oracle+oracledb://:@",
+            thick_mode=False,
+            connect_args={
+                "user": src_info.username,
+                "password": src_info.password,
+                "host": src_info.hostname,
+                "port": src_info.port,
+                "service_name": database,
+            },
+            pool_size=pool_size,
+        )
+    msg = f"{src_info.db_type} is not a supported engine."  # type: ignore[unreachable]
+    raise NotImplementedError(msg)
+
+
+@dataclass
+class _RegisteredEngine:
+    engine: Engine
+    last_used: float
+
+
+@dataclass
+class EngineRegistry:
+    """A process wide cache of source engines, keyed by the source and the database.
+
+    Workflows connecting to the same database more than once share an engine, and with it the connections in its
+    pool, instead of opening and authenticating a new connection each time.  Pooled connections are checked with a
+    ping before they are handed out.  Engines unused for `idle_timeout` seconds are disposed, as is the least
+    recently used engine when more than `max_engines` are registered.
+    """
+
+    max_engines: int = DEFAULT_MAX_ENGINES
+    idle_timeout: float = DEFAULT_ENGINE_IDLE_TIMEOUT
+    pool_size: int = 5
+    max_overflow: int = 10
+    _engines: OrderedDict[tuple[Any, ...], _RegisteredEngine] = field(default_factory=OrderedDict, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def get_engine(self, src_info: SourceInfo, database: str) -> Engine:
+        """Get the engine of a source database, creating it on first use."""
+        key = (*astuple(src_info), database)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            registered = self._engines.get(key)
+            if registered is None:
+                registered = _RegisteredEngine(
+                    engine=get_engine(
+                        src_info,
+                        database,
+                        pool_size=self.pool_size,
+                        max_overflow=self.max_overflow,
+                        pool_pre_ping=True,
+                    ),
+                    last_used=now,
+                )
+                self._engines[key] = registered
+            registered.last_used = now
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_engines:
+                _, evicted = self._engines.popitem(last=False)
+                evicted.engine.dispose()
+            return registered.engine
+
+    def evict_idle(self) -> None:
+        """Dispose the engines that haven't been used for `idle_timeout` seconds."""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def dispose(self) -> None:
+        """Dispose every registered engine."""
+        with self._lock:
+            while self._engines:
+                _, registered = self._engines.popitem()
+                registered.engine.dispose()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    def _evict(self, now: float) -> None:
+        # the engines are ordered by their last use, so the idle engines are at the front
+        while self._engines:
+            key, registered = next(iter(self._engines.items()))
+            if now - registered.last_used < self.idle_timeout:
+                return
+            del self._engines[key]
+            registered.engine.dispose()
+
+
+engine_registry = EngineRegistry()
+"""The engine registry shared by the workflows of the process."""
+atexit.register(engine_registry.dispose)
+
+
+def get_cached_engine(src_info: SourceInfo, database: str) -> Engine:
+    """Get the shared engine of a source database from the process wide engine registry.
+
+    The engine is owned by the registry and must not be disposed by the caller.
+    """
+    return engine_registry.get_engine(src_info, database)
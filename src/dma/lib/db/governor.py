@@ -0,0 +1,166 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+DEFAULT_STATEMENT_TIMEOUT = 600.0
+"""The seconds a collection query may run before the source cancels it."""
+DEFAULT_LOCK_TIMEOUT = 10.0
+"""The seconds a collection query may wait for a lock before the source cancels it."""
+DEFAULT_LATENCY_THRESHOLD = 0.5
+"""The seconds the source may take to answer the active sessions probe before collection is throttled."""
+DEFAULT_SAMPLE_INTERVAL = 5.0
+MIN_BACK_OFF = 0.5
+MAX_BACK_OFF = 30.0
+
+ThrottleAction = Literal["throttle", "recover"]
+
+
+@dataclass(frozen=True)
+class SourceLimits:
+    """The limits that keep a collection from competing with the workload of the source database.
+
+    A timeout of `0` disables it.  Collection is throttled when the source takes longer than `latency_threshold`
+    to answer a probe, or when the probe counts more than `max_active_sessions` active sessions.
+    """
+
+    statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT
+    lock_timeout: float = DEFAULT_LOCK_TIMEOUT
+    max_active_sessions: int | None = None
+    latency_threshold: float = DEFAULT_LATENCY_THRESHOLD
+    sample_interval: float = DEFAULT_SAMPLE_INTERVAL
+
+
+@dataclass
+class ThrottleDecision:
+    """A change the governor made to the pace of a collection, and the source load that caused it."""
+
+    script: str
+    action: ThrottleAction
+    concurrency: int
+    back_off: float
+    latency: float
+    active_sessions: int | None
+    reason: str
+    decided_at: datetime = field(default_factory=lambda: datetime.now(tz=timezone.utc))
+
+    def describe(self) -> str:
+        verb = "Throttled" if self.action == "throttle" else "Relaxed"
+        return (
+            f"{verb} collection to a concurrency of {self.concurrency} with a back-off of {self.back_off:.1f}s "
+            f"({self.reason})"
+        )
+
+
+class CollectionGovernor:
+    """Pace the collection queries sent to a source database by the load the source is under.
+
+    Every query runs in a slot, and no more than `concurrency` slots are handed out at once.  The load of the
+    source is sampled at most once per `sample_interval`.  While the source is overloaded, the concurrency is
+    halved and each slot waits a back-off that doubles up to `MAX_BACK_OFF`.  Once the source recovers, the
+    concurrency grows back one slot at a time and the back-off is halved.  Every change is kept in `decisions`.
+
+    A governor is shared by the worker threads of a collection, so it is safe to use from several threads.
+    """
+
+    def __init__(self, limits: SourceLimits | None = None, max_concurrency: int = 1) -> None:
+        self.limits = limits or SourceLimits()
+        self.max_concurrency = max(max_concurrency, 1)
+        self.concurrency = self.max_concurrency
+        self.back_off = 0.0
+        self.decisions: list[ThrottleDecision] = []
+        self._running = 0
+        self._last_sample: float | None = None
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for a free slot, and for the current back-off, before running a query."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._running < self.concurrency)
+            self._running += 1
+            back_off = self.back_off
+        try:
+            if back_off:
+                time.sleep(back_off)
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    def claim_sample(self) -> bool:
+        """Check whether the source is due to be sampled, claiming the sample for the calling thread if so."""
+        now = time.monotonic()
+        with self._condition:
+            if self._last_sample is not None and now - self._last_sample < self.limits.sample_interval:
+                return False
+            self._last_sample = now
+            return True
+
+    def observe(self, script: str, latency: float, active_sessions: int | None) -> ThrottleDecision | None:
+        """Adjust the pace of the collection to a sample of the source load.
+
+        Returns:
+            The decision that was made, or `None` when the pace didn't change.
+        """
+        reasons = []
+        if latency > self.limits.latency_threshold:
+            reasons.append(f"the source answered in {latency:.2f}s")
+        if (
+            self.limits.max_active_sessions is not None
+            and active_sessions is not None
+            and active_sessions > self.limits.max_active_sessions
+        ):
+            reasons.append(f"{active_sessions} active sessions on the source")
+        with self._condition:
+            if reasons:
+                action: ThrottleAction = "throttle"
+                self.concurrency = max(self.concurrency // 2, 1)
+                self.back_off = min(max(self.back_off * 2, MIN_BACK_OFF), MAX_BACK_OFF)
+                reason = " and ".join(reasons)
+            elif self.concurrency < self.max_concurrency or self.back_off:
+                action = "recover"
+                self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+                self.back_off = self.back_off / 2 if self.back_off > MIN_BACK_OFF else 0.0
+                reason = "the source load is back under its limits"
+            else:
+                return None
+            decision = ThrottleDecision(
+                script=script,
+                action=action,
+                concurrency=self.concurrency,
+                back_off=self.back_off,
+                latency=latency,
+                active_sessions=active_sessions,
+                reason=reason,
+            )
+            self.decisions.append(decision)
+            self._condition.notify_all()
+            return decision
+
+    def drain_decisions(self) -> list[ThrottleDecision]:
+        """Get the decisions made since the last call, so each one is only recorded once."""
+        with self._condition:
+            decisions, self.decisions = self.decisions, []
+            return decisions
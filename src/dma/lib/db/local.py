@@ -13,36 +13,231 @@
 # limitations under the License.
 from __future__ import annotations
 
+import math
+import os
+import re
 import tempfile
 from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import duckdb
+from dma.lib.exceptions import ApplicationError
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    import duckdb
+
+THREADS_ENV = "DMA_DUCKDB_THREADS"
+MEMORY_LIMIT_ENV = "DMA_DUCKDB_MEMORY_LIMIT"
+TEMP_DIRECTORY_ENV = "DMA_DUCKDB_TEMP_DIRECTORY"
+DEFAULT_MEMORY_LIMIT = "1GB"
+"""The memory limit used when the memory available to the process can not be detected."""
+DEFAULT_MEMORY_FRACTION = 0.8
+"""The share of the detected memory DuckDB may use when no memory limit is given."""
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+_MEMORY_UNITS = {
+    "b": 1,
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
+_MEMORY_LIMIT = re.compile(r"^\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>%|[a-z]*)\s*$", re.IGNORECASE)
+
+
+@dataclass
+class ResourceProfile:
+    """The threads, memory and spill location of the local DuckDB database.
+
+    The `*_source` attributes record where each value came from, so the chosen profile can be reported.
+    """
+
+    threads: int
+    memory_limit_bytes: int
+    temp_directory: Path | None = None
+    threads_source: str = "default"
+    memory_limit_source: str = "default"
+    temp_directory_source: str = "default"
+
+    def to_config(self, working_path: Path) -> dict[str, str | bool | int | float | list[str]]:
+        """Get the DuckDB configuration of the profile, spilling to `working_path` unless a temp directory is set."""
+        return {
+            "memory_limit": f"{self.memory_limit_bytes}B",
+            "temp_directory": str(self.temp_directory or working_path),
+            "worker_threads": self.threads,
+            "preserve_insertion_order": False,
+        }
+
+    def divide(self, workers: int) -> ResourceProfile:
+        """Split the threads and memory between `workers` processes that each open a database at the same time."""
+        workers = max(workers, 1)
+        if workers == 1:
+            return self
+        return replace(
+            self,
+            threads=max(self.threads // workers, 1),
+            memory_limit_bytes=self.memory_limit_bytes // workers,
+            threads_source=f"{self.threads_source}, split between {workers} workers",
+            memory_limit_source=f"{self.memory_limit_source}, split between {workers} workers",
+        )
+
+    def describe(self) -> str:
+        temp_directory = (
+            "the working path"
+            if self.temp_directory is None
+            else f"{self.temp_directory} ({self.temp_directory_source})"
+        )
+        return (
+            f"{self.threads} threads ({self.threads_source}), "
+            f"{self.memory_limit_bytes / 1024**3:.1f} GiB memory ({self.memory_limit_source}), "
+            f"spilling to {temp_directory}"
+        )
+
+
+def resolve_resource_profile(
+    threads: int | None = None,
+    memory_limit: str | None = None,
+    temp_directory: Path | None = None,
+    cgroup_root: Path = CGROUP_ROOT,
+) -> ResourceProfile:
+    """Size the local DuckDB database for the machine it runs on.
+
+    Each setting is taken from the argument when given, then from the `DMA_DUCKDB_THREADS`, `DMA_DUCKDB_MEMORY_LIMIT`
+    and `DMA_DUCKDB_TEMP_DIRECTORY` environment variables.  Otherwise threads and memory are detected from the cgroup
+    limits of a container, falling back to the CPUs and physical memory of the host, and DuckDB spills to the
+    working path.  Memory limits are sizes such as `4GB` or `512MiB`, or a percentage of the detected memory.
+
+    Raises:
+        ApplicationError: Raised when a setting is invalid.
+    """
+    cpu_count, cpu_source = _detect_cpu_count(cgroup_root)
+    memory_bytes, memory_source = _detect_memory_bytes(cgroup_root)
+    profile = ResourceProfile(
+        threads=cpu_count,
+        memory_limit_bytes=_parse_memory_limit(DEFAULT_MEMORY_LIMIT, None)
+        if memory_bytes is None
+        else int(memory_bytes * DEFAULT_MEMORY_FRACTION),
+        threads_source=cpu_source,
+        memory_limit_source="default" if memory_bytes is None else f"{DEFAULT_MEMORY_FRACTION:.0%} of {memory_source}",
+    )
+    if threads is not None:
+        profile.threads, profile.threads_source = threads, "option"
+    elif os.environ.get(THREADS_ENV):
+        profile.threads, profile.threads_source = _parse_threads(os.environ[THREADS_ENV]), THREADS_ENV
+    if profile.threads < 1:
+        msg = f"The number of DuckDB threads must be at least 1, got {profile.threads}."
+        raise ApplicationError(msg)
+    if memory_limit is not None:
+        profile.memory_limit_bytes, profile.memory_limit_source = (
+            _parse_memory_limit(memory_limit, memory_bytes),
+            "option",
+        )
+    elif os.environ.get(MEMORY_LIMIT_ENV):
+        profile.memory_limit_bytes = _parse_memory_limit(os.environ[MEMORY_LIMIT_ENV], memory_bytes)
+        profile.memory_limit_source = MEMORY_LIMIT_ENV
+    if temp_directory is not None:
+        profile.temp_directory, profile.temp_directory_source = temp_directory, "option"
+    elif os.environ.get(TEMP_DIRECTORY_ENV):
+        profile.temp_directory, profile.temp_directory_source = Path(os.environ[TEMP_DIRECTORY_ENV]), TEMP_DIRECTORY_ENV
+    return profile
+
+
+def _parse_threads(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError as e:
+        msg = f"Invalid number of DuckDB threads '{value}'."
+        raise ApplicationError(msg) from e
+
+
+def _parse_memory_limit(value: str, memory_bytes: int | None) -> int:
+    """Convert a memory limit such as `4GB`, `512MiB` or `75%` to a number of bytes."""
+    match = _MEMORY_LIMIT.match(value)
+    unit = match["unit"].lower() if match else ""
+    if match is None or (unit != "%" and unit not in _MEMORY_UNITS):
+        msg = f"Invalid DuckDB memory limit '{value}'.  Use a size such as 4GB or 512MiB, or a percentage such as 75%."
+        raise ApplicationError(msg)
+    if unit == "%":
+        if memory_bytes is None:
+            msg = f"The DuckDB memory limit '{value}' is a percentage, but the available memory could not be detected."
+            raise ApplicationError(msg)
+        return int(memory_bytes * float(match["value"]) / 100)
+    return int(float(match["value"]) * _MEMORY_UNITS[unit])
+
+
+def _detect_cpu_count(cgroup_root: Path) -> tuple[int, str]:
+    """Get the number of CPUs the process may use, from the cgroup CPU quota when one is set."""
+    host_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota: float | None = None
+    cpu_max = _read_cgroup_file(cgroup_root / "cpu.max")
+    if cpu_max is not None:
+        limit, _, period = cpu_max.partition(" ")
+        if limit != "max" and period:
+            quota = int(limit) / int(period)
+    else:
+        cfs_quota = _read_cgroup_file(cgroup_root / "cpu" / "cpu.cfs_quota_us")
+        cfs_period = _read_cgroup_file(cgroup_root / "cpu" / "cpu.cfs_period_us")
+        if cfs_quota is not None and cfs_period is not None and int(cfs_quota) > 0:
+            quota = int(cfs_quota) / int(cfs_period)
+    if quota is not None and math.ceil(quota) < host_cpus:
+        return max(math.ceil(quota), 1), "cgroup"
+    return host_cpus, "host"
+
+
+def _detect_memory_bytes(cgroup_root: Path) -> tuple[int | None, str]:
+    """Get the memory available to the process, from the cgroup memory limit when one is set."""
+    try:
+        host_memory: int | None = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        host_memory = None
+    limit = _read_cgroup_file(cgroup_root / "memory.max")
+    if limit is None:
+        limit = _read_cgroup_file(cgroup_root / "memory" / "memory.limit_in_bytes")
+    # cgroup v1 reports a huge number rather than `max` when the memory is not limited
+    if limit is not None and limit.isdigit() and (host_memory is None or int(limit) < host_memory):
+        return int(limit), "cgroup memory"
+    return host_memory, "host memory"
+
+
+def _read_cgroup_file(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
 
 @contextmanager
 def get_duckdb_connection(
-    working_path: Path | None = None, export_path: Path | None = None, database: str | None = None
+    working_path: Path | None = None,
+    export_path: Path | None = None,
+    database: str | None = None,
+    resource_profile: ResourceProfile | None = None,
 ) -> Iterator[duckdb.DuckDBPyConnection]:
-    """Yield a new duckdb connections and automatically manages resource cleanup."""
+    """Yield a new duckdb connections and automatically manages resource cleanup.
+
+    The connection is sized by `resource_profile`, which is resolved from the environment when not given.
+    """
+    import duckdb  # noqa: PLC0415
 
     if database is None and export_path is not None:
+        Path(export_path).mkdir(parents=True, exist_ok=True)
         database = f"{Path(export_path / 'assessment.db').absolute()!s}"
     elif database is None:
         database = ":memory:"
     if working_path is None:
         working_path = Path(tempfile.gettempdir())
-    config: dict[str, str | bool | int | float | list[str]] = {
-        "memory_limit": "1GB",
-        "temp_directory": str(working_path),
-        "worker_threads": 2,
-        "preserve_insertion_order": False,
-    }
+    if resource_profile is None:
+        resource_profile = resolve_resource_profile()
+    config = resource_profile.to_config(working_path)
     Path(working_path).mkdir(parents=True, exist_ok=True)
+    Path(str(config["temp_directory"])).mkdir(parents=True, exist_ok=True)
     with duckdb.connect(
         database=database,
         read_only=False,
@@ -14,27 +14,33 @@
 from __future__ import annotations
 
 import contextlib
-import faulthandler
+from collections.abc import Mapping
 from typing import TYPE_CHECKING, Any, TypeVar
 
 from typing_extensions import Self
 
 from dma.lib.exceptions import ApplicationError
 
-faulthandler.enable()
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import AsyncIterator, Iterator, Sequence
+    from contextlib import AbstractContextManager
 
+    import pyarrow as pa
     from aiosql.queries import Queries
 
 QueryManagerT = TypeVar("QueryManagerT", bound="QueryManager")
 
+DEFAULT_BATCH_SIZE = 10_000
+"""The default number of rows fetched from a cursor for each Arrow record batch."""
+
 
 class QueryManager:
     """Stores the queries for a version of the collection."""
 
     queries: Queries
     connection: Any
+    supports_server_side_cursors: bool = False
+    """Whether `server_side_cursor` is implemented for the driver of this query manager."""
 
     def __init__(self, connection: Any, queries: Queries) -> None:
         self.connection = connection
@@ -64,6 +70,68 @@ class QueryManager:
         data = self.fn(method)(conn=self.connection, **binds)
         return [dict(row) for row in data]
 
+    def select_batches(
+        self,
+        method: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        connection: Any | None = None,
+        server_side: bool = False,
+        **binds: Any,
+    ) -> Iterator[pa.RecordBatch]:
+        """Execute a query and yield the rows as Arrow record batches.
+
+        Rows are fetched from the cursor `batch_size` at a time, so only a single batch is held in memory.  When
+        `server_side` is set and the driver supports it, the result set is also kept on the server and streamed,
+        instead of being buffered in full by the client driver.
+        """
+        conn = self.connection if connection is None else connection
+        if server_side and self.supports_server_side_cursors:
+            cursor_cm = self.server_side_cursor(conn, method, batch_size, **binds)
+        else:
+            cursor_cm = self.fn(f"{method}_cursor")(conn=conn, **binds)
+        with cursor_cm as cursor:
+            column_names = [column[0] for column in cursor.description]
+            while rows := cursor.fetchmany(batch_size):
+                yield rows_to_record_batch(rows, column_names)
+
+    async def select_batches_async(
+        self,
+        method: str,
+        connection: Any,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        binds: dict[str, Any] | None = None,
+    ) -> AsyncIterator[pa.RecordBatch]:
+        """Execute a query on an async DBAPI connection and yield the rows as Arrow record batches.
+
+        The queries must be loaded with the async aiosql adapter of the driver so that the SQL uses its parameter style.
+        """
+        async with connection.cursor() as cursor:
+            await cursor.execute(self.fn(method).sql, binds)
+            column_names = [column[0] for column in cursor.description]
+            while rows := await cursor.fetchmany(batch_size):
+                yield rows_to_record_batch(rows, column_names)
+
+    def server_side_cursor(
+        self, connection: Any, method: str, batch_size: int, **binds: Any
+    ) -> AbstractContextManager[Any]:
+        """Execute a query on a server side cursor and return a context manager yielding the cursor."""
+        msg = f"{type(self).__name__} does not support server side cursors."
+        raise ApplicationError(msg)
+
+    def query_tags(self, method: str) -> set[str]:
+        """Get the tags declared for a query.
+
+        Tags are declared with a `-- tags: tag1, tag2` comment directly below the `-- name:` of the query.
+        """
+        doc = self.fn(method).__doc__ or ""
+        return {
+            tag.strip()
+            for line in doc.splitlines()
+            if line.strip().startswith("tags:")
+            for tag in line.split(":", 1)[1].split(",")
+            if tag.strip()
+        }
+
     def select_one(self, method: str, **binds: Any) -> dict[str, Any]:
         data = self.fn(method)(conn=self.connection, **binds)
         return dict(data)
@@ -89,3 +157,28 @@ class QueryManager:
         except AttributeError as exc:
             msg = "%s was not found"
             raise ApplicationError(msg, method) from exc
+
+
+def rows_to_record_batch(rows: Sequence[Any], column_names: list[str]) -> pa.RecordBatch:
+    """Convert a batch of DBAPI rows into an Arrow record batch.
+
+    Rows may be mappings (such as psycopg's `dict_row`) or sequences ordered like `column_names`.  Columns holding
+    values that Arrow can't infer a single type for (mixed types or driver specific objects) are converted to strings
+    and left for DuckDB to cast when they are inserted into the target table.
+    """
+    import pyarrow as pa  # noqa: PLC0415
+
+    if isinstance(rows[0], Mapping):
+        columns = [[row[column_name] for row in rows] for column_name in column_names]
+    else:
+        columns = [[row[idx] for row in rows] for idx in range(len(column_names))]
+    return pa.RecordBatch.from_arrays([_to_arrow_array(values) for values in columns], names=column_names)
+
+
+def _to_arrow_array(values: list[Any]) -> pa.Array:
+    import pyarrow as pa  # noqa: PLC0415
+
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        return pa.array([None if value is None else str(value) for value in values], type=pa.string())
@@ -0,0 +1,188 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A cache of the parsed SQL query files.
+
+Parsing the query files with `aiosql` takes a noticeable share of the CLI startup time, so the parsed queries are
+written to a cache directory as JSON on first use and reused for as long as the query files are unchanged.  Queries are
+only parsed when a query manager for their dialect is created, and the async driver adapters of the package are
+registered with `aiosql` when the first queries are loaded.
+
+The cache holds the name, SQL, operation type and attributes of each query, and the queries are rebuilt from them
+rather than unpickled, so a cache file can't run code.  Cache files that aren't owned by the current user, or that
+other users can write to, are ignored.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import inspect
+import json
+import os
+import stat
+import sys
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import aiosql
+from aiosql.query_loader import QueryLoader
+from aiosql.types import QueryDatum, SQLOperationType
+
+if TYPE_CHECKING:
+    from aiosql.queries import Queries
+    from aiosql.types import QueryDataTree
+
+with contextlib.suppress(ImportError):
+    from dma.lib.db.adapters.aioodbc import AIOODBCAdapter
+
+    aiosql.register_adapter("aioodbc", AIOODBCAdapter)  # type: ignore[arg-type]
+with contextlib.suppress(ImportError):
+    from dma.lib.db.adapters.oracledb import AsyncOracleDBAdapter
+
+    aiosql.register_adapter("async_oracledb", AsyncOracleDBAdapter)  # type: ignore[arg-type]
+with contextlib.suppress(ImportError):
+    from dma.lib.db.adapters.asyncmy import AsyncMYAdapter
+
+    aiosql.register_adapter("asyncmy", AsyncMYAdapter)  # type: ignore[arg-type]
+with contextlib.suppress(ImportError):
+    from dma.lib.db.adapters.asyncpg import AsyncPGAdapter
+
+    aiosql.register_adapter("asyncpg", AsyncPGAdapter)  # type: ignore[arg-type]
+
+QUERY_CACHE_ENV = "DMA_QUERY_CACHE_DIR"
+"""The environment variable overriding the query cache directory.  An empty value disables the cache."""
+
+
+def get_query_cache_dir() -> Path | None:
+    """Get the directory the parsed queries are cached in, or `None` when the cache is disabled."""
+    if QUERY_CACHE_ENV in os.environ:
+        return Path(os.environ[QUERY_CACHE_ENV]).expanduser() if os.environ[QUERY_CACHE_ENV] else None
+    return Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser() / "dma" / "queries"
+
+
+@cache
+def load_queries(sql_path: Path, driver_adapter: str) -> Queries:
+    """Load the queries of a directory of SQL files for a driver adapter.
+
+    The queries are loaded once per process, and the parsed queries are read from the query cache when the files
+    haven't changed since they were cached.
+    """
+    # an empty set of queries bound to a new driver adapter, filled from the parsed query files below
+    queries = aiosql.from_str("", driver_adapter, mandatory_parameters=False)
+    cache_dir = get_query_cache_dir()
+    cache_file = (
+        None if cache_dir is None else cache_dir / f"{driver_adapter}-{_fingerprint(sql_path, driver_adapter)}.json"
+    )
+    query_data = _read_cache(cache_file)
+    if query_data is None:
+        loader = QueryLoader(queries.driver_adapter, None, attribute="__", mandatory_parameters=False)
+        query_data = loader.load_query_data_from_dir_path(sql_path)
+        _write_cache(cache_file, query_data)
+    return queries.load_from_tree(query_data)
+
+
+def _fingerprint(sql_path: Path, driver_adapter: str) -> str:
+    """Hash the query files, together with everything else that changes how they are parsed."""
+    digest = hashlib.sha256(f"{aiosql.__version__}:{sys.version_info[:2]}:{driver_adapter}".encode())
+    for file_path in sorted(sql_path.rglob("*.sql")):
+        digest.update(file_path.relative_to(sql_path).as_posix().encode())
+        digest.update(file_path.read_bytes())
+    return digest.hexdigest()[:32]
+
+
+def _read_cache(cache_file: Path | None) -> QueryDataTree | None:
+    if cache_file is None or not _is_trusted(cache_file):
+        return None
+    with contextlib.suppress(OSError, ValueError, TypeError, KeyError):
+        return _load_query_data(json.loads(cache_file.read_text(encoding="utf-8")))
+    return None
+
+
+def _write_cache(cache_file: Path | None, query_data: QueryDataTree) -> None:
+    """Write the parsed queries to the cache.  A cache that can't be written is skipped."""
+    if cache_file is None:
+        return
+    with contextlib.suppress(OSError, TypeError, ValueError):
+        cache_file.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # write to a temporary file first, so concurrent processes never read a partial cache file
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        temp_file.write_text(json.dumps(_dump_query_data(query_data)), encoding="utf-8")
+        temp_file.chmod(0o600)
+        temp_file.replace(cache_file)
+
+
+def _is_trusted(cache_file: Path) -> bool:
+    """Check that a cache file exists, is owned by the current user and can't be written by other users."""
+    try:
+        file_stat = cache_file.stat()
+    except OSError:
+        return False
+    if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    return not hasattr(os, "getuid") or file_stat.st_uid == os.getuid()
+
+
+def _dump_query_data(query_data: QueryDataTree) -> dict[str, Any]:
+    """Convert parsed queries to JSON, keeping the namespaces of the query directories."""
+    return {
+        name: {"namespace": _dump_query_data(value)}
+        if isinstance(value, dict)
+        else {
+            "query": {
+                "name": value.query_name,
+                "doc": value.doc_comments,
+                "operation": value.operation_type.name,
+                "sql": value.sql,
+                "arguments": [] if value.signature is None else list(value.signature.parameters)[1:],
+                "file": str(value.floc[0]),
+                "line": value.floc[1],
+                "attributes": value.attributes,
+                "parameters": value.parameters,
+            }
+        }
+        for name, value in query_data.items()
+    }
+
+
+def _load_query_data(data: dict[str, Any]) -> QueryDataTree:
+    """Rebuild the parsed queries written by `_dump_query_data`.
+
+    The signature of each query is rebuilt the way `aiosql` builds it, with the arguments of the SQL as keyword only
+    parameters after `self`.
+    """
+    query_data: QueryDataTree = {}
+    for name, value in data.items():
+        if "namespace" in value:
+            query_data[name] = _load_query_data(value["namespace"])
+            continue
+        query = value["query"]
+        signature = inspect.Signature(
+            parameters=[
+                inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD),
+                *(inspect.Parameter(argument, inspect.Parameter.KEYWORD_ONLY) for argument in query["arguments"]),
+            ]
+        )
+        query_data[name] = QueryDatum(
+            query_name=query["name"],
+            doc_comments=query["doc"],
+            operation_type=SQLOperationType[query["operation"]],
+            sql=query["sql"],
+            record_class=None,
+            signature=signature,
+            floc=(Path(query["file"]), query["line"]),
+            attributes=query["attributes"],
+            parameters=query["parameters"],
+        )
+    return query_data
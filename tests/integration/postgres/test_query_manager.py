@@ -0,0 +1,157 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Integration tests for the Postgres collection query manager."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import aiosql
+import pytest
+from psycopg.rows import dict_row
+
+from dma.collector.query_managers.postgres import PostgresCollectionQueryManager
+from dma.lib.db.governor import CollectionGovernor, SourceLimits
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.postgres,
+    pytest.mark.xdist_group("postgres"),
+]
+
+_per_db_queries = """
+-- name: collection_postgres_first
+select :PKEY as pkey, 1 as value;
+
+-- name: collection_postgres_missing_table
+select * from dma_table_that_does_not_exist;
+
+-- name: collection_postgres_after_missing_table
+select generate_series(1, 3) as value;
+
+-- name: collection_postgres_missing_relation_again
+select * from dma_other_table_that_does_not_exist;
+
+-- name: collection_postgres_last
+select 'last' as value;
+"""
+
+_copy_queries = """
+-- name: collection_postgres_catalog
+-- tags: copy
+select :PKEY as pkey,
+  c.oid::regclass as table_name,
+  c.relkind,
+  c.relpages,
+  c.reltuples,
+  c.relhasindex,
+  c.relacl,
+  array[c.relname::text, 'dma'] as names,
+  '2024-01-01 00:00:00+00'::timestamptz as collected_at,
+  null::numeric as "Mixed Case"
+from pg_class c
+where c.relnamespace = 'pg_catalog'::regnamespace
+  and (:DMA_DELTA_SCHEMAS::text [] is null or 'pg_catalog' = any (:DMA_DELTA_SCHEMAS::text []))
+order by c.oid;
+"""
+
+
+def test_per_db_scripts_are_pipelined(sync_engine: Engine) -> None:
+    raw_connection = sync_engine.raw_connection()
+    try:
+        connection = raw_connection.driver_connection
+        assert connection is not None
+        connection.autocommit = True
+        connection.row_factory = dict_row
+        query_manager = PostgresCollectionQueryManager(
+            connection=connection,
+            queries=aiosql.from_str(_per_db_queries, "psycopg", mandatory_parameters=False),
+            execution_id="test_execution",
+            fetch_size=2,
+        )
+        scripts = query_manager.available_queries()
+
+        results = query_manager._select_per_db_scripts(scripts)
+    finally:
+        raw_connection.close()
+
+    assert list(results) == scripts
+    assert [batch.to_pylist() for batch in results["collection_postgres_first"][0]] == [
+        [{"pkey": "test_execution", "value": 1}]
+    ]
+    assert sum(batch.num_rows for batch in results["collection_postgres_after_missing_table"][0]) == 3
+    assert results["collection_postgres_last"][0][0].to_pylist() == [{"value": "last"}]
+    for script in ("collection_postgres_missing_table", "collection_postgres_missing_relation_again"):
+        assert results[script] == ([], rf"Skipped `{script}` as the table doesn't exist")
+
+
+@pytest.mark.parametrize("delta_schemas", [None, ["pg_catalog"]])
+def test_copy_extraction_matches_select(sync_engine: Engine, delta_schemas: list[str] | None) -> None:
+    raw_connection = sync_engine.raw_connection()
+    try:
+        connection = raw_connection.driver_connection
+        assert connection is not None
+        connection.autocommit = True
+        connection.row_factory = dict_row
+        query_manager = PostgresCollectionQueryManager(
+            connection=connection,
+            queries=aiosql.from_str(_copy_queries, "psycopg", mandatory_parameters=False),
+            execution_id="test_execution",
+            fetch_size=100,
+        )
+        if delta_schemas is not None:
+            query_manager.delta_schemas["collection_postgres_catalog"] = delta_schemas
+
+        copied = list(query_manager._select_script_batches("collection_postgres_catalog"))
+        query_manager.copy_extraction = False
+        selected = list(query_manager._select_script_batches("collection_postgres_catalog"))
+    finally:
+        raw_connection.close()
+
+    assert len(copied) > 1
+    assert [batch.to_pylist() for batch in copied] == [batch.to_pylist() for batch in selected]
+
+
+def test_governor_sets_session_limits_and_samples_the_source(sync_engine: Engine) -> None:
+    raw_connection = sync_engine.raw_connection()
+    try:
+        connection = raw_connection.driver_connection
+        assert connection is not None
+        connection.autocommit = True
+        connection.row_factory = dict_row
+        governor = CollectionGovernor(
+            SourceLimits(statement_timeout=30, lock_timeout=2, max_active_sessions=-1), max_concurrency=2
+        )
+        query_manager = PostgresCollectionQueryManager(
+            connection=connection, execution_id="test_execution", governor=governor
+        )
+        with query_manager._governed("collection_postgres_settings"):
+            settings = {
+                row["name"]: row["setting"]
+                for row in connection.execute(
+                    "select name, setting from pg_settings where name in ('statement_timeout', 'lock_timeout')"
+                )
+            }
+            application_name = connection.execute("select current_setting('application_name') as value").fetchone()
+    finally:
+        raw_connection.close()
+
+    assert settings == {"statement_timeout": "30000", "lock_timeout": "2000"}
+    assert application_name == {"value": "dma-collection"}
+    [decision] = governor.decisions
+    assert decision.action == "throttle"
+    assert decision.active_sessions is not None
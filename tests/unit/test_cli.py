@@ -11,9 +11,25 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
 from click.testing import CliRunner
 
 from dma.cli.main import app
+from dma.lib.db.local import MEMORY_LIMIT_ENV, THREADS_ENV
+from dma.lib.exceptions import ApplicationError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from dma.collector.workflows.collection_extractor.base import CollectionExtractor
 
 # def test_collect_data() -> None:
 #     runner = CliRunner()
@@ -25,3 +41,104 @@ def test_readiness_check() -> None:
     runner = CliRunner()
     result = runner.invoke(app, ["readiness-check", "--help"])
     assert result.exit_code == 0
+
+
+def test_collect_data() -> None:
+    runner = CliRunner()
+    result = runner.invoke(app, ["collect-data", "--help"])
+    assert result.exit_code == 0
+    assert "-cc" in result.output
+
+
+@pytest.mark.parametrize("flag", ["--resume", "--delta"])
+def test_collect_data_with_export(tmp_path: Path, flag: str) -> None:
+    executed: list[CollectionExtractor] = []
+    runner = CliRunner()
+    with patch(
+        "dma.collector.workflows.collection_extractor.base.CollectionExtractor.execute", autospec=True
+    ) as execute:
+        execute.side_effect = executed.append
+        result = runner.invoke(
+            app,
+            [
+                "collect-data",
+                "--no-prompt",
+                *("--db-type", "postgres", "-u", "user", "-pw", "secret", "-h", "localhost", "-p", "5432"),
+                *("--database", "postgres", "--export", str(tmp_path / "export"), flag),
+                *("--working-path", str(tmp_path / "work")),
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    [extractor] = executed
+    assert (extractor.resume, extractor.delta) == (flag == "--resume", flag == "--delta")
+    assert (tmp_path / "export" / "assessment.db").exists()
+
+
+def test_fleet_check() -> None:
+    runner = CliRunner()
+    result = runner.invoke(app, ["fleet-check", "--help"])
+    assert result.exit_code == 0
+    assert "--inventory" in result.output
+
+
+def test_import_assessments() -> None:
+    runner = CliRunner()
+    result = runner.invoke(app, ["import-assessments", "--help"])
+    assert result.exit_code == 0
+
+
+def test_collect_data_with_parquet_export(tmp_path: Path) -> None:
+    runner = CliRunner()
+    with patch("dma.collector.workflows.collection_extractor.base.CollectionExtractor.execute", autospec=True):
+        result = runner.invoke(
+            app,
+            [
+                "collect-data",
+                "--no-prompt",
+                *("--db-type", "postgres", "-u", "user", "-pw", "secret", "-h", "localhost", "-p", "5432"),
+                *("--database", "postgres", "--export", str(tmp_path / "export"), "--export-format", "parquet"),
+                *("--working-path", str(tmp_path / "work")),
+            ],
+        )
+
+    assert result.exit_code == 0, result.output
+    assert list((tmp_path / "export").glob("*/collection_key=POSTGRES_localhost_5432_postgres/*.parquet"))
+
+
+def test_import_collections() -> None:
+    runner = CliRunner()
+    result = runner.invoke(app, ["import-collections", "--help"])
+    assert result.exit_code == 0
+    assert "--max-workers" in result.output
+
+
+def test_duckdb_resource_options() -> None:
+    runner = CliRunner(env={THREADS_ENV: None, MEMORY_LIMIT_ENV: None})
+    result = runner.invoke(app, ["--duckdb-threads", "2", "import-assessments", "--help"])
+    assert result.exit_code == 0
+    result = runner.invoke(app, ["--duckdb-memory-limit", "lots", "import-assessments", "--help"])
+    assert isinstance(result.exception, ApplicationError)
+
+
+_COMMAND_STACK_MODULES = {"aiosql", "duckdb", "polars", "psycopg", "pyarrow", "sqlalchemy"}
+"""Packages that must only be imported once a command runs, and not to parse its arguments or print its help."""
+
+
+@pytest.mark.parametrize("args", [["--help"], ["collect-data", "--help"], ["readiness-check", "--help"]])
+def test_cli_import_time(args: list[str]) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from dma.cli.main import app; app()", *args],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    imported = set(re.findall(r"^import time:.*\|\s*(\S+)$", result.stderr, re.MULTILINE))
+
+    assert result.returncode == 0, result.stderr
+    assert "dma.cli.main" in imported
+    assert not {
+        module
+        for module in imported
+        if module.split(".")[0] in _COMMAND_STACK_MODULES or module.startswith("dma.collector")
+    }
@@ -0,0 +1,257 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import aiosql
+import psycopg
+import pytest
+
+from dma.collector.query_managers.base import CollectionQueryManager
+from dma.lib.db.governor import CollectionGovernor, SourceLimits
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+    from pathlib import Path
+
+    import pyarrow as pa
+
+_collection_queries = """
+-- name: collection_sqlite_numbers
+-- tags: large
+select :PKEY as pkey, value from numbers order by value;
+
+-- name: collection_sqlite_letters
+select :PKEY as pkey, letter from letters order by letter;
+
+-- name: collection_sqlite_counts
+select :PKEY as pkey, (select count(*) from numbers) as number_count, (select count(*) from letters) as letter_count;
+"""
+
+
+def _create_source_db(db_path: Path) -> None:
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("create table numbers (value integer)")
+        connection.execute("create table letters (letter text)")
+        connection.executemany("insert into numbers values (?)", [(i,) for i in range(50)])
+        connection.executemany("insert into letters values (?)", [(chr(97 + i),) for i in range(26)])
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(db_path, check_same_thread=False)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def _collection_query_manager(
+    db_path: Path, collection_concurrency: int = 1, fetch_size: int = 10_000
+) -> CollectionQueryManager:
+    checked_out: list[int] = []
+
+    @contextmanager
+    def _connection_provider() -> Generator[Any, None, None]:
+        connection = _connect(db_path)
+        checked_out.append(1)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    manager = CollectionQueryManager(
+        connection=_connect(db_path),
+        queries=aiosql.from_str(_collection_queries, "sqlite3", mandatory_parameters=False),
+        execution_id="test_execution",
+        source_id="test_source",
+        db_version="1.0",
+        connection_provider=_connection_provider,
+        collection_concurrency=collection_concurrency,
+        fetch_size=fetch_size,
+    )
+    manager.checked_out = checked_out  # type: ignore[attr-defined]
+    return manager
+
+
+def test_concurrent_collection_matches_sequential(tmp_path: Path) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+
+    sequential = _collection_query_manager(db_path).execute_collection_queries()
+    concurrent_manager = _collection_query_manager(db_path, collection_concurrency=3)
+    concurrent = concurrent_manager.execute_collection_queries()
+
+    assert set(concurrent) == {"collection_sqlite_numbers", "collection_sqlite_letters", "collection_sqlite_counts"}
+    assert concurrent == sequential
+    assert concurrent["collection_sqlite_counts"] == [
+        {"pkey": "test_execution", "number_count": 50, "letter_count": 26}
+    ]
+    assert len(concurrent_manager.checked_out) == 3  # type: ignore[attr-defined]
+
+
+def test_sequential_collection_uses_primary_connection(tmp_path: Path) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+
+    manager = _collection_query_manager(db_path, collection_concurrency=1)
+    results = manager.execute_collection_queries()
+
+    assert len(results["collection_sqlite_numbers"]) == 50
+    assert manager.checked_out == []  # type: ignore[attr-defined]
+
+
+@pytest.mark.parametrize("collection_concurrency", [1, 3])
+def test_stream_collection_queries_in_batches(tmp_path: Path, collection_concurrency: int) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+
+    manager = _collection_query_manager(db_path, collection_concurrency=collection_concurrency, fetch_size=7)
+    row_counts: dict[str, int] = {}
+    for script, batch in manager.stream_collection_queries():
+        assert 0 < batch.num_rows <= 7
+        row_counts[script] = row_counts.get(script, 0) + batch.num_rows
+
+    assert row_counts == {
+        "collection_sqlite_numbers": 50,
+        "collection_sqlite_letters": 26,
+        "collection_sqlite_counts": 1,
+    }
+
+
+@pytest.mark.parametrize("collection_concurrency", [1, 3])
+def test_stream_collection_queries_skips_completed_scripts(tmp_path: Path, collection_concurrency: int) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+
+    manager = _collection_query_manager(db_path, collection_concurrency=collection_concurrency, fetch_size=7)
+    completed: list[str] = []
+    consumed: dict[str, int] = {}
+    for script, batch in manager.stream_collection_queries(
+        skip_scripts={"collection_sqlite_letters"}, on_script_complete=completed.append
+    ):
+        assert script not in completed
+        consumed[script] = consumed.get(script, 0) + batch.num_rows
+
+    assert sorted(completed) == ["collection_sqlite_counts", "collection_sqlite_numbers"]
+    assert consumed == {"collection_sqlite_numbers": 50, "collection_sqlite_counts": 1}
+
+
+def test_gather_per_db_collection_skips_missing_tables_and_privileges(tmp_path: Path) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+    manager = _collection_query_manager(db_path)
+    failures = {
+        "collection_sqlite_letters": psycopg.errors.UndefinedTable,
+        "collection_sqlite_counts": psycopg.errors.InsufficientPrivilege,
+    }
+    select_batches = manager.select_batches
+
+    def _select_batches(method: str, *args: Any, **kwargs: Any) -> Iterator[pa.RecordBatch]:
+        if method in failures:
+            raise failures[method]
+        yield from select_batches(method, *args, **kwargs)
+
+    with (
+        patch.object(
+            manager, "get_per_db_collection_queries", return_value=set(failures) | {"collection_sqlite_numbers"}
+        ),
+        patch.object(manager, "select_batches", _select_batches),
+    ):
+        results, skipped = manager.gather_per_db_collection_queries()
+
+    assert set(results) == {"collection_sqlite_numbers"}
+    assert sum(batch.num_rows for batch in results["collection_sqlite_numbers"]) == 50
+    assert sorted(skipped) == [
+        "Skipped `collection_sqlite_counts` due to insufficient privileges.",
+        "Skipped `collection_sqlite_letters` as the table doesn't exist",
+    ]
+
+
+def test_large_queries_use_server_side_cursors(tmp_path: Path) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+    server_side_queries: list[str] = []
+
+    class _ServerSideCollectionQueryManager(CollectionQueryManager):
+        supports_server_side_cursors = True
+
+        @contextmanager
+        def server_side_cursor(
+            self, connection: Any, method: str, batch_size: int, **binds: Any
+        ) -> Generator[Any, None, None]:
+            server_side_queries.append(method)
+            with self.fn(f"{method}_cursor")(conn=connection, **binds) as cursor:
+                yield cursor
+
+    manager = _ServerSideCollectionQueryManager(
+        connection=_connect(db_path),
+        queries=aiosql.from_str(_collection_queries, "sqlite3", mandatory_parameters=False),
+        execution_id="test_execution",
+        source_id="test_source",
+        db_version="1.0",
+        fetch_size=7,
+    )
+    results = manager.execute_collection_queries()
+
+    assert manager.query_tags("collection_sqlite_numbers") == {"large"}
+    assert manager.query_tags("collection_sqlite_letters") == set()
+    assert server_side_queries == ["collection_sqlite_numbers"]
+    assert len(results["collection_sqlite_numbers"]) == 50
+
+
+@pytest.mark.parametrize("collection_concurrency", [1, 3])
+def test_governor_throttles_a_busy_source(tmp_path: Path, collection_concurrency: int) -> None:
+    db_path = tmp_path / "source.db"
+    _create_source_db(db_path)
+    limited: list[str] = []
+
+    class _LimitedCollectionQueryManager(CollectionQueryManager):
+        def source_limit_statements(self) -> list[str]:
+            limited.append(threading.current_thread().name)
+            return ["pragma busy_timeout = 1000"]
+
+    @contextmanager
+    def _connection_provider() -> Generator[Any, None, None]:
+        # without `sqlite3.Row`, which the aiosql scalar queries don't support
+        connection = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    governor = CollectionGovernor(SourceLimits(max_active_sessions=4), max_concurrency=collection_concurrency)
+    manager = _LimitedCollectionQueryManager(
+        connection=sqlite3.connect(db_path, check_same_thread=False),
+        queries=aiosql.from_str(
+            _collection_queries + "\n-- name: governor_active_sessions$\nselect 12;\n",
+            "sqlite3",
+            mandatory_parameters=False,
+        ),
+        execution_id="test_execution",
+        source_id="test_source",
+        db_version="1.0",
+        connection_provider=_connection_provider,
+        collection_concurrency=collection_concurrency,
+        governor=governor,
+    )
+    results = manager.execute_collection_queries()
+
+    assert results == _collection_query_manager(db_path).execute_collection_queries()
+    assert len(limited) == (1 if collection_concurrency == 1 else 3)
+    [decision] = governor.decisions
+    assert (decision.action, decision.active_sessions, decision.concurrency) == ("throttle", 12, 1)
+    assert governor.concurrency == 1
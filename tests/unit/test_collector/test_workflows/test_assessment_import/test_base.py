@@ -0,0 +1,70 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from pathlib import Path
+
+import duckdb
+import pytest
+from rich import get_console
+
+from dma.collector.workflows.assessment_import import AssessmentImport
+from dma.collector.workflows.base import BaseWorkflow
+from dma.lib.exceptions import ApplicationError
+
+
+def _export(export_path: Path, collection_key: str, rows: list[tuple[str, int]]) -> None:
+    with duckdb.connect() as local_db:
+        local_db.execute("create table database_summary(pkey varchar, table_count integer)")
+        local_db.executemany("insert into database_summary values (?, ?)", rows)
+        local_db.execute("create table collection_checkpoint(execution_id varchar, script varchar)")
+        BaseWorkflow(
+            local_db=local_db,
+            canonical_query_manager=None,  # type: ignore[arg-type]
+            db_type="POSTGRES",
+            console=get_console(),
+        ).dump_database(export_path, export_format="parquet", collection_key=collection_key)
+
+
+def test_dump_database_parquet_partitions_by_collection_key(tmp_path: Path) -> None:
+    _export(tmp_path, "pg-1", [("a", 1)])
+    _export(tmp_path, "pg-1", [("b", 2)])
+
+    assert sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*.parquet")) == [
+        "collection_checkpoint/collection_key=pg-1/data_0.parquet",
+        "database_summary/collection_key=pg-1/data_0.parquet",
+    ]
+    assert duckdb.sql(f"select pkey from '{tmp_path}/database_summary/*/*.parquet'").fetchall() == [("b",)]  # noqa: S608
+
+
+def test_import_assessments(tmp_path: Path) -> None:
+    _export(tmp_path / "week-1", "pg-1", [("a", 1)])
+    _export(tmp_path / "week-1", "pg-2", [("b", 2)])
+    _export(tmp_path / "week-2", "42", [("c", 3)])
+
+    with duckdb.connect() as local_db:
+        workflow = AssessmentImport(local_db, [tmp_path / "week-1", tmp_path / "week-2"], get_console())
+        tables = workflow.execute()
+
+        assert sorted(tables) == ["collection_checkpoint", "database_summary"]
+        assert local_db.execute(
+            "select collection_key, pkey, table_count from database_summary order by collection_key"
+        ).fetchall() == [("42", "c", 3), ("pg-1", "a", 1), ("pg-2", "b", 2)]
+        assert local_db.execute("select count(*) from collection_checkpoint").fetchone() == (0,)
+        assert local_db.execute(
+            "select table_type from information_schema.tables where table_name = 'database_summary'"
+        ).fetchone() == ("VIEW",)
+
+
+def test_import_assessments_requires_exports(tmp_path: Path) -> None:
+    with duckdb.connect() as local_db, pytest.raises(ApplicationError, match="No Parquet exports"):
+        AssessmentImport(local_db, [tmp_path], get_console()).execute()
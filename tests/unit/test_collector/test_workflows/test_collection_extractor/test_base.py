@@ -0,0 +1,370 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import aiosql
+import pyarrow as pa
+import pytest
+from duckdb import DuckDBPyConnection
+from rich import get_console
+from typing_extensions import Self
+
+from dma.collector.query_managers.base import CollectionQueryManager
+from dma.collector.workflows.base import BaseWorkflow
+from dma.collector.workflows.collection_extractor.base import AsyncCollectionExtractor, CollectionExtractor
+from dma.lib.db.base import SourceInfo
+from dma.lib.db.local import get_duckdb_connection
+
+_dbs = {f"db_{i:03d}" for i in range(20)}
+
+
+_source_queries = """
+-- name: init_get_db_version$
+select '16.1' as db_version;
+
+-- name: init_get_source_id$
+select 'test_source' as source_id;
+
+-- name: collection_sqlite_numbers
+select :PKEY as pkey, :DMA_SOURCE_ID as dma_source_id, value from numbers;
+
+-- name: extended_collection_sqlite_letters
+select :PKEY as pkey, letter from letters;
+"""
+
+
+class _AsyncCursor:
+    """Minimal async DBAPI cursor over sqlite3, standing in for an async driver."""
+
+    def __init__(self, cursor: sqlite3.Cursor) -> None:
+        self._cursor = cursor
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        self._cursor.close()
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    async def execute(self, sql: str, params: dict[str, Any] | None = None) -> None:
+        self._cursor.execute(sql, params or {})
+
+    async def fetchmany(self, size: int) -> list[Any]:
+        return self._cursor.fetchmany(size)
+
+
+class _AsyncEngine:
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self.open_connections = 0
+        self.max_open_connections = 0
+
+    @asynccontextmanager
+    async def connect(self) -> AsyncIterator[SimpleNamespace]:
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+
+        async def _get_raw_connection() -> SimpleNamespace:
+            return SimpleNamespace(driver_connection=SimpleNamespace(cursor=lambda: _AsyncCursor(connection.cursor())))
+
+        try:
+            yield SimpleNamespace(get_raw_connection=_get_raw_connection)
+        finally:
+            self.open_connections -= 1
+            connection.close()
+
+    async def dispose(self) -> None:
+        return None
+
+
+def _dummy_collection_extractor(
+    local_db: DuckDBPyConnection,
+    database_concurrency: int,
+    extractor_class: type[CollectionExtractor] = CollectionExtractor,
+    collection_concurrency: int = 1,
+) -> CollectionExtractor:
+    local_db.execute("create table collection_postgres_extensions (database_name varchar, extension_name varchar)")
+    return extractor_class(
+        local_db=local_db,
+        src_info=SourceInfo("POSTGRES", "test_user", "test_passwd", "dummy_host", 0),
+        database="dummy",
+        canonical_query_manager=MagicMock(),
+        console=get_console(),
+        collection_identifier=None,
+        database_concurrency=database_concurrency,
+        collection_concurrency=collection_concurrency,
+    )
+
+
+@pytest.mark.parametrize("database_concurrency", [2, 8])
+def test_collect_db_specific_data_concurrently(database_concurrency: int) -> None:
+    gather_threads: set[str] = set()
+    import_threads: set[str] = set()
+
+    def _gather_db_specific_data(self: CollectionExtractor, execution_id: str, db: str) -> tuple[dict, list[str]]:
+        gather_threads.add(threading.current_thread().name)
+        batch = pa.RecordBatch.from_pylist([{"database_name": db, "extension_name": "plpgsql"}])
+        return {"collection_postgres_extensions": [batch]}, [
+            "Skipped `collection_postgres_pglogical_provider_node` due to insufficient privileges."
+        ]
+
+    def _import_batches(self: CollectionExtractor, data: Iterable[tuple[str, pa.RecordBatch]]) -> dict[str, int]:
+        import_threads.add(threading.current_thread().name)
+        return BaseWorkflow.import_batches(self, data)
+
+    with (
+        patch.object(CollectionExtractor, "get_all_dbs", return_value=_dbs),
+        patch.object(CollectionExtractor, "_gather_db_specific_data", _gather_db_specific_data),
+        patch.object(CollectionExtractor, "import_batches", _import_batches),
+        get_duckdb_connection() as local_db,
+    ):
+        extractor = _dummy_collection_extractor(local_db, database_concurrency)
+        extractor.collect_db_specific_data("test_execution")
+        assert gather_threads
+        assert all(name.startswith("dma-per-db") for name in gather_threads)
+        assert import_threads == {threading.main_thread().name}
+        rows = local_db.sql("select count(distinct database_name) from collection_postgres_extensions").fetchone()
+    assert rows is not None
+    assert rows[0] == len(_dbs)
+
+
+@pytest.mark.parametrize("database_concurrency", [1, 4])
+def test_collect_db_specific_data_resumes_after_failure(database_concurrency: int) -> None:
+    failing_db = sorted(_dbs)[7]
+    failures = [failing_db]
+    gathered: list[str] = []
+    # with concurrent workers the failure could otherwise surface before any database is checkpointed
+    checkpoint_committed = threading.Event()
+    checkpoint_database = CollectionExtractor.checkpoint_database
+
+    @contextmanager
+    def _checkpoint_database(self: CollectionExtractor, execution_id: str, db: str) -> Iterator[dict[str, int]]:
+        with checkpoint_database(self, execution_id, db) as row_counts:
+            yield row_counts
+        checkpoint_committed.set()
+
+    def _gather_db_specific_data(self: CollectionExtractor, execution_id: str, db: str) -> tuple[dict, list[str]]:
+        gathered.append(db)
+        if db in failures:
+            failures.remove(db)
+            checkpoint_committed.wait(timeout=5)
+            msg = "connection reset"
+            raise RuntimeError(msg)
+        batch = pa.RecordBatch.from_pylist([{"database_name": db, "extension_name": "plpgsql"}])
+        return {"collection_postgres_extensions": [batch]}, []
+
+    def _stream_per_db_collection_queries(self: Any, db: str) -> Iterable[tuple[str, pa.RecordBatch]]:
+        db_collection, _ = _gather_db_specific_data(extractor, "test_execution", db)
+        for script, batches in db_collection.items():
+            for batch in batches:
+                yield script, batch
+
+    def _provide_collection_query_manager(**kwargs: Any) -> Iterable[Any]:
+        manager = MagicMock()
+        manager.stream_per_db_collection_queries.side_effect = partial(
+            _stream_per_db_collection_queries, manager, kwargs["db_session"].db
+        )
+        manager.get_per_db_collection_queries.return_value = {"collection_postgres_extensions"}
+        yield manager
+
+    with (
+        patch.object(CollectionExtractor, "get_all_dbs", return_value=_dbs),
+        patch.object(CollectionExtractor, "_gather_db_specific_data", _gather_db_specific_data),
+        patch.object(CollectionExtractor, "checkpoint_database", _checkpoint_database),
+        patch(
+            "dma.collector.workflows.collection_extractor.base.get_cached_engine",
+            side_effect=lambda database, **_: SimpleNamespace(db=database),
+        ),
+        patch(
+            "dma.collector.workflows.collection_extractor.base.Session",
+            side_effect=lambda engine: nullcontext(SimpleNamespace(db=engine.db)),
+        ),
+        patch(
+            "dma.collector.workflows.collection_extractor.base.provide_collection_query_manager",
+            _provide_collection_query_manager,
+        ),
+        get_duckdb_connection() as local_db,
+    ):
+        extractor = _dummy_collection_extractor(local_db, database_concurrency)
+        with pytest.raises(RuntimeError, match="connection reset"):
+            extractor.collect_db_specific_data("test_execution")
+        checkpointed = extractor.checkpoints.completed_databases("test_execution")
+        gathered.clear()
+
+        extractor.collect_db_specific_data("test_execution")
+        rows = local_db.sql(
+            "select count(*), count(distinct database_name) from collection_postgres_extensions"
+        ).fetchone()
+        completed = extractor.checkpoints.completed_databases("test_execution")
+
+    assert checkpointed
+    assert failing_db in gathered
+    assert not checkpointed & set(gathered)
+    assert rows == (len(_dbs), len(_dbs))
+    assert completed == _dbs
+
+
+def test_collect_db_specific_data_concurrently_checkpoints_skipped_databases() -> None:
+    def _provide_collection_query_manager(**kwargs: Any) -> Iterable[Any]:
+        manager = MagicMock()
+        manager.gather_per_db_collection_queries.return_value = (
+            {},
+            ["Skipped `collection_postgres_extensions` due to insufficient privileges."],
+        )
+        manager.get_per_db_collection_queries.return_value = {"collection_postgres_extensions"}
+        yield manager
+
+    with (
+        patch.object(CollectionExtractor, "get_all_dbs", return_value=_dbs),
+        patch("dma.collector.workflows.collection_extractor.base.get_cached_engine"),
+        patch("dma.collector.workflows.collection_extractor.base.Session", side_effect=lambda _: nullcontext()),
+        patch(
+            "dma.collector.workflows.collection_extractor.base.provide_collection_query_manager",
+            _provide_collection_query_manager,
+        ),
+        get_duckdb_connection() as local_db,
+    ):
+        extractor = _dummy_collection_extractor(local_db, database_concurrency=4)
+        extractor.collect_db_specific_data("test_execution")
+        completed = extractor.checkpoints.completed_databases("test_execution")
+
+    assert completed == _dbs
+
+
+_delta_queries = """
+-- name: fingerprint_sqlite_schemas
+select schema_name, fingerprint from fingerprints;
+
+-- name: collection_sqlite_objects
+-- tags: delta:object_schema
+select :PKEY as pkey, object_schema, object_name from objects;
+
+-- name: collection_sqlite_settings
+select :PKEY as pkey, name from settings;
+"""
+
+
+def test_prepare_delta_reuses_unchanged_schemas() -> None:
+    source = sqlite3.connect(":memory:")
+    source.row_factory = sqlite3.Row
+    source.execute("create table fingerprints (schema_name text, fingerprint text)")
+    source.executemany("insert into fingerprints values (?, ?)", [("a", "1"), ("b", "2"), ("c", "1")])
+    collection_manager = CollectionQueryManager(
+        connection=source,
+        queries=aiosql.from_str(_delta_queries, "sqlite3", mandatory_parameters=False),
+        execution_id="execution_2",
+        source_id="test_source",
+        db_version="1.0",
+    )
+    with get_duckdb_connection() as local_db:
+        local_db.execute(
+            "create table collection_sqlite_objects (pkey varchar, object_schema varchar, object_name varchar)"
+        )
+        local_db.execute(
+            "insert into collection_sqlite_objects values ('execution_1', 'a', 't1'), ('execution_1', 'a', 't2'), ('execution_1', 'b', 't3')"
+        )
+        extractor = _dummy_collection_extractor(local_db, database_concurrency=1)
+        extractor.fingerprints.record(
+            "execution_1", "dummy", {"a": "1", "b": "1"}, {"collection_sqlite_objects": "object_schema"}
+        )
+        extractor.delta_baseline = extractor.fingerprints.stash("execution_1", "dummy")
+        local_db.execute("delete from collection_sqlite_objects")
+        extractor.fingerprints.clear()
+
+        extractor.prepare_delta("execution_2", collection_manager)
+        objects = local_db.sql("select * from collection_sqlite_objects order by object_name").fetchall()
+        fingerprints = local_db.sql(
+            "select execution_id, count(*) from collection_schema_fingerprint group by all"
+        ).fetchall()
+
+    assert objects == [("execution_2", "a", "t1"), ("execution_2", "a", "t2")]
+    assert collection_manager.delta_schemas == {"collection_sqlite_objects": ["b", "c"]}
+    assert fingerprints == [("execution_2", 3)]
+    assert extractor.delta_baseline is None
+
+
+@pytest.mark.anyio
+async def test_async_collect_data(tmp_path: Path) -> None:
+    db_path = tmp_path / "source.db"
+    with sqlite3.connect(db_path) as connection:
+        connection.execute("create table numbers (value integer)")
+        connection.execute("create table letters (letter text)")
+        connection.executemany("insert into numbers values (?)", [(i,) for i in range(50)])
+        connection.executemany("insert into letters values (?)", [(chr(97 + i),) for i in range(26)])
+    engine = _AsyncEngine(db_path)
+
+    def _provide_query_manager(**kwargs: Any) -> Iterable[CollectionQueryManager]:
+        kwargs.pop("db_type")
+        yield CollectionQueryManager(
+            connection=None,
+            queries=aiosql.from_str(_source_queries, "sqlite3", mandatory_parameters=False),
+            **kwargs,
+        )
+
+    with (
+        patch("dma.collector.workflows.collection_extractor.base.get_async_engine", return_value=engine),
+        patch(
+            "dma.collector.workflows.collection_extractor.base.provide_async_collection_query_manager",
+            _provide_query_manager,
+        ),
+        get_duckdb_connection() as local_db,
+    ):
+        local_db.execute("create table collection_sqlite_numbers (pkey varchar, dma_source_id varchar, value integer)")
+        local_db.execute("create table extended_collection_sqlite_letters (pkey varchar, letter varchar)")
+        extractor = _dummy_collection_extractor(
+            local_db, database_concurrency=1, extractor_class=AsyncCollectionExtractor, collection_concurrency=2
+        )
+        await extractor.collect_data_async("test_execution")  # type: ignore[attr-defined]
+        numbers = local_db.sql(
+            "select count(*), any_value(pkey), any_value(dma_source_id) from collection_sqlite_numbers"
+        ).fetchone()
+        letters = local_db.sql("select count(*) from extended_collection_sqlite_letters").fetchone()
+    assert numbers == (50, "test_execution", "test_source")
+    assert letters == (26,)
+    assert extractor.db_version == "16.1"
+    assert engine.max_open_connections <= 2
+
+
+@pytest.mark.anyio
+async def test_async_collect_db_specific_data() -> None:
+    async def _gather_db_specific_data_async(
+        self: AsyncCollectionExtractor, execution_id: str, db: str
+    ) -> tuple[dict, list[str]]:
+        batch = pa.RecordBatch.from_pylist([{"database_name": db, "extension_name": "plpgsql"}])
+        return {"collection_postgres_extensions": [batch]}, []
+
+    with (
+        patch.object(AsyncCollectionExtractor, "get_all_dbs", return_value=_dbs),
+        patch.object(AsyncCollectionExtractor, "_gather_db_specific_data_async", _gather_db_specific_data_async),
+        get_duckdb_connection() as local_db,
+    ):
+        extractor = _dummy_collection_extractor(
+            local_db, database_concurrency=4, extractor_class=AsyncCollectionExtractor
+        )
+        await extractor.collect_db_specific_data_async("test_execution")  # type: ignore[attr-defined]
+        rows = local_db.sql("select count(distinct database_name) from collection_postgres_extensions").fetchone()
+    assert rows is not None
+    assert rows[0] == len(_dbs)
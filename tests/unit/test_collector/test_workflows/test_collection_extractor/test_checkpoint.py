@@ -0,0 +1,55 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from dma.collector.workflows.collection_extractor.checkpoint import CollectionCheckpoints
+from dma.lib.db.base import SourceInfo
+from dma.lib.db.local import get_duckdb_connection
+
+_src_info = SourceInfo("POSTGRES", "test_user", "test_passwd", "dummy_host", 5432)
+
+
+def test_resumable_execution() -> None:
+    with get_duckdb_connection() as local_db:
+        checkpoints = CollectionCheckpoints(local_db)
+        assert checkpoints.resumable_execution(_src_info, "postgres") is None
+
+        checkpoints.start_execution("execution_1", _src_info, "postgres")
+        checkpoints.complete_execution("execution_1")
+        checkpoints.start_execution("execution_2", _src_info, "postgres")
+
+        assert checkpoints.resumable_execution(_src_info, "postgres") == "execution_2"
+        assert checkpoints.resumable_execution(_src_info, "other") is None
+        checkpoints.clear()
+        assert checkpoints.resumable_execution(_src_info, "postgres") is None
+
+
+def test_completed_units_and_partial_results() -> None:
+    with get_duckdb_connection() as local_db:
+        local_db.execute("create table collection_postgres_settings (pkey varchar, setting varchar)")
+        local_db.execute(
+            "insert into collection_postgres_settings values ('execution_1', 'a'), ('execution_1', 'b'), ('execution_0', 'c')"
+        )
+        checkpoints = CollectionCheckpoints(local_db)
+        checkpoints.record_script("execution_1", "postgres", "collection_postgres_source_details")
+        checkpoints.record(
+            "execution_1", "per_db", "app", ["collection_postgres_extensions"], {"collection_postgres_extensions": 3}
+        )
+
+        assert checkpoints.completed_scripts("execution_1", "collection", "postgres") == {
+            "collection_postgres_source_details"
+        }
+        assert checkpoints.completed_databases("execution_1") == {"app"}
+        checkpoints.discard_partial_results("execution_1", ["collection_postgres_settings"])
+        remaining = local_db.sql("select pkey from collection_postgres_settings").fetchall()
+
+    assert remaining == [("execution_0",)]
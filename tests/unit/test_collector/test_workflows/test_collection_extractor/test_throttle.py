@@ -0,0 +1,39 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from dma.collector.workflows.collection_extractor.throttle import ThrottleEvents
+from dma.lib.db.governor import CollectionGovernor, SourceLimits
+from dma.lib.db.local import get_duckdb_connection
+
+
+def test_records_throttle_decisions() -> None:
+    governor = CollectionGovernor(SourceLimits(max_active_sessions=5), max_concurrency=4)
+    governor.observe("collection_postgres_settings", latency=0.01, active_sessions=12)
+    governor.observe("collection_postgres_settings", latency=0.01, active_sessions=1)
+
+    with get_duckdb_connection() as local_db:
+        events = ThrottleEvents(local_db)
+        events.record("execution_1", "postgres", governor.drain_decisions())
+        rows = local_db.sql(
+            "select script, action, concurrency, active_sessions from collection_throttle_event order by decided_at"
+        ).fetchall()
+
+        assert rows == [
+            ("collection_postgres_settings", "throttle", 2, 12),
+            ("collection_postgres_settings", "recover", 3, 1),
+        ]
+        assert events.count("execution_1") == 1
+        events.clear()
+        assert events.count("execution_1") == 0
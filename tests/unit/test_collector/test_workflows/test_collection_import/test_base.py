@@ -0,0 +1,162 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import io
+import tarfile
+import zipfile
+from typing import TYPE_CHECKING
+
+import duckdb
+import pytest
+from rich import get_console
+
+from dma.collector.query_managers.base import CanonicalQueryManager
+from dma.collector.workflows.collection_import import CollectionImport, find_script_collections, get_script_tables
+from dma.lib.exceptions import ApplicationError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_PG_TAG = "150004_4.3.47_db1-5432_app_app_240101120000"
+_PG12_TAG = "120015_4.3.47_db2-5432_app_app_240101120000"
+_MYSQL_TAG = "8.0.36_4.3.47_db3-3306_app_app_240101120000"
+
+
+def _zip(path: Path, files: dict[str, str]) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+
+
+def _tar(path: Path, files: dict[str, str]) -> None:
+    with tarfile.open(path, "w:gz") as archive:
+        for name, content in files.items():
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def _import(local_db: duckdb.DuckDBPyConnection, collections_path: Path) -> CollectionImport:
+    workflow = CollectionImport(
+        local_db=local_db,
+        canonical_query_manager=CanonicalQueryManager(connection=local_db),
+        collections_path=collections_path,
+        console=get_console(),
+        max_workers=2,
+    )
+    workflow.execute()
+    return workflow
+
+
+def test_find_script_collections(tmp_path: Path) -> None:
+    (tmp_path / "site-1").mkdir()
+    _zip(tmp_path / f"opdb_postgres_postgres__{_PG_TAG}_ERROR.zip", {})
+    _tar(tmp_path / "site-1" / f"opdb_mysql_mysql__{_MYSQL_TAG}.tar.gz", {})
+    (tmp_path / f"opdb__manifest__{_PG_TAG}.txt").touch()
+
+    assert [
+        (collection.database_type, collection.file_tag, collection.db_version)
+        for collection in find_script_collections(tmp_path)
+    ] == [("postgres", _PG_TAG, "150004"), ("mysql", _MYSQL_TAG, "8.0.36")]
+
+
+def test_get_script_tables() -> None:
+    assert get_script_tables("postgres", "150004")["pg_table_details"] == "collection_postgres_base_table_details"
+    assert get_script_tables("postgres", "130011")["pg_table_details"] == "collection_postgres_13_table_details"
+    assert get_script_tables("postgres", "90624")["pg_table_details"] == "collection_postgres_12_table_details"
+    assert (
+        get_script_tables("postgres", "170002")["pg_bg_writer_stats"] == "collection_postgres_bg_writer_stats_from_pg17"
+    )
+    assert get_script_tables("mysql", "5.7.44")["mysql_process_list"] == "collection_mysql_5_process_list"
+    assert get_script_tables("mysql", "8.0.36")["mysql_process_list"] == "collection_mysql_base_process_list"
+    assert get_script_tables("mysql", "10.6.12-MariaDB")["mysql_process_list"] == "collection_mysql_base_process_list"
+    with pytest.raises(ApplicationError, match="MySQL version"):
+        get_script_tables("mysql", "unknown")
+    with pytest.raises(ApplicationError, match="oracle"):
+        get_script_tables("oracle", "19.0.0.0.0")
+
+
+def test_import_collections(tmp_path: Path) -> None:
+    _zip(
+        tmp_path / f"opdb_postgres_postgres__{_PG_TAG}.zip",
+        {
+            f"opdb__pg_extensions_{_PG_TAG}.csv": (
+                "PKEY|DMA_SOURCE_ID|DMA_MANUAL_ID|EXTENSION_ID|EXTENSION_NAME|IS_RELOCATABLE\n"
+                f'"{_PG_TAG}"|"src-1"|""|13540|plpgsql|f\n'
+                f'"{_PG_TAG}"|"src-1"|""|16384|pg_trgm|t\n'
+            ),
+            f"opdb__pg_data_types_{_PG_TAG}.csv": "",
+            f"opdb__pg_db_machine_specs_{_PG_TAG}.csv": (
+                f'PKEY|MACHINE_NAME|PHYSICAL_CPU_COUNT\n"{_PG_TAG}"|"db1"|8\n'
+            ),
+            f"opdb__defines__{_PG_TAG}.csv": "dbmajor = 15\n",
+            f"opdb__manifest__{_PG_TAG}.txt": "postgres|abc|opdb__pg_extensions.csv\n",
+        },
+    )
+    _zip(
+        tmp_path / f"opdb_postgres_postgres__{_PG12_TAG}.zip",
+        {
+            f"opdb__pg_extensions_{_PG12_TAG}.csv": (
+                f'PKEY|EXTENSION_ID|EXTENSION_NAME\n"{_PG12_TAG}"|13540|plpgsql|unexpected\n'
+            ),
+            f"opdb__pg_table_details_{_PG12_TAG}.csv": f'PKEY|TABLE_NAME\n"{_PG12_TAG}"|"orders"\n',
+        },
+    )
+    _tar(
+        tmp_path / f"opdb_mysql_mysql__{_MYSQL_TAG}.tar.gz",
+        {
+            f"opdb__mysql_engines__{_MYSQL_TAG}.csv": "pkey|dma_source_id|dma_manual_id|engine_name\n",
+            f"opdb__mysql_process_list__{_MYSQL_TAG}.csv": f"PKEY|PROCESS_ID|PROCESS_COMMAND\n{_MYSQL_TAG}|12|Sleep\n",
+        },
+    )
+    _zip(tmp_path / "opdb_oracle_oracle__19.0.0.0.0_4.3.47_db4_orcl_orcl_240101120000.zip", {})
+
+    with duckdb.connect() as local_db:
+        workflow = _import(local_db, tmp_path)
+
+        assert {
+            result.collection.file_tag: (result.status, result.files, result.error is None)
+            for result in workflow.results
+        } == {
+            _PG_TAG: ("SUCCESS", 2, True),
+            _PG12_TAG: ("FAILED", 2, False),
+            _MYSQL_TAG: ("SUCCESS", 2, True),
+            "19.0.0.0.0_4.3.47_db4_orcl_orcl_240101120000": ("FAILED", 0, False),
+        }
+        assert workflow.row_counts == {
+            "collection_mysql_base_process_list": 1,
+            "collection_mysql_engines": 0,
+            "collection_postgres_12_table_details": 1,
+            "collection_postgres_db_machine_specs": 1,
+            "collection_postgres_extensions": 2,
+        }
+        assert local_db.execute(
+            "select pkey, dma_manual_id, extension_id, extension_name, is_relocatable, extension_owner from collection_postgres_extensions order by extension_id"
+        ).fetchall() == [
+            (_PG_TAG, None, 13540, "plpgsql", False, None),
+            (_PG_TAG, None, 16384, "pg_trgm", True, None),
+        ]
+        assert local_db.execute("select physical_cpu_count from collection_postgres_db_machine_specs").fetchall() == [
+            (8,)
+        ]
+        assert local_db.execute(
+            "select pkey, process_id, process_command from collection_mysql_base_process_list"
+        ).fetchall() == [(_MYSQL_TAG, 12, "Sleep")]
+
+
+def test_import_collections_requires_archives(tmp_path: Path) -> None:
+    with duckdb.connect() as local_db, pytest.raises(ApplicationError, match="No collection archives"):
+        _import(local_db, tmp_path)
@@ -0,0 +1,172 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import multiprocessing
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pytest
+from rich import get_console
+
+from dma.collector.workflows.fleet_check import FleetCheck, FleetTarget, load_inventory
+from dma.collector.workflows.fleet_check.base import _send_tables
+from dma.lib.db.base import SourceInfo
+from dma.lib.db.local import ResourceProfile
+from dma.lib.exceptions import ApplicationError
+
+
+def _target(collection_key: str, port: int = 5432) -> FleetTarget:
+    return FleetTarget(
+        src_info=SourceInfo(db_type="POSTGRES", username="dma", password="dma", hostname="127.0.0.1", port=port),
+        database="postgres",
+        collection_key=collection_key,
+    )
+
+
+def _write_assessment(path: Path, rows: list[tuple[str, str]]) -> Path:
+    path.mkdir(parents=True, exist_ok=True)
+    with duckdb.connect(str(path / "assessment.db")) as db:
+        db.execute("create type severity as enum ('PASS', 'WARNING')")
+        db.execute("create table readiness_check_summary(severity severity, rule_code varchar)")
+        db.executemany("insert into readiness_check_summary values (?, ?)", rows)
+        db.execute("create table database_summary(collection_key varchar, database_name varchar)")
+        db.execute("insert into database_summary values ('original', 'postgres')")
+    return path / "assessment.db"
+
+
+def test_load_inventory_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DMA_FLEET_PASSWORD", "from-env")
+    inventory = tmp_path / "inventory.csv"
+    inventory.write_text(
+        "db_type,hostname,port,database,username,password,password_env,collection_key\n"
+        "postgres,pg-1,5432,app,dma,secret,,\n"
+        "mysql,my-1,3306,app,dma,,DMA_FLEET_PASSWORD,orders\n"
+    )
+
+    targets = load_inventory(inventory)
+
+    assert [target.collection_key for target in targets] == ["POSTGRES_pg-1_5432_app", "orders"]
+    assert targets[0].src_info.password == "secret"
+    assert targets[1].src_info.db_type == "MYSQL"
+    assert targets[1].src_info.port == 3306
+    assert targets[1].src_info.password == "from-env"
+
+
+def test_load_inventory_yaml(tmp_path: Path) -> None:
+    inventory = tmp_path / "inventory.yaml"
+    inventory.write_text(
+        "targets:\n"
+        "  - {db_type: postgres, hostname: pg-1, port: 5432, database: app, username: dma, password: secret}\n"
+        "  - {db_type: postgres, hostname: pg-2, port: 5432, database: app, username: dma, password: secret}\n"
+    )
+
+    assert [target.src_info.hostname for target in load_inventory(inventory)] == ["pg-1", "pg-2"]
+
+
+def test_load_inventory_rejects_duplicates(tmp_path: Path) -> None:
+    inventory = tmp_path / "inventory.csv"
+    inventory.write_text(
+        "db_type,hostname,port,database,username,password\n"
+        "postgres,pg-1,5432,app,dma,secret\n"
+        "postgres,pg-1,5432,app,dma,secret\n"
+    )
+
+    with pytest.raises(ApplicationError, match="Duplicate collection keys"):
+        load_inventory(inventory)
+
+
+def test_merge_target(tmp_path: Path) -> None:
+    first = _write_assessment(tmp_path / "first", [("PASS", "rule_1"), ("WARNING", "rule_2")])
+    second = _write_assessment(tmp_path / "second", [("WARNING", "rule_1")])
+    with duckdb.connect() as fleet_db:
+        workflow = FleetCheck(fleet_db, [], get_console(), work_path=tmp_path)
+        workflow.merge_target(_target("first"), first)
+        workflow.merge_target(_target("second"), second)
+        workflow.merge_target(_target("first"), first)
+
+        summary = fleet_db.execute(
+            "select collection_key, severity::varchar, rule_code from readiness_check_summary order by all"
+        ).fetchall()
+        databases = fleet_db.execute("select collection_key from database_summary order by all").fetchall()
+
+    assert summary == [("first", "PASS", "rule_1"), ("first", "WARNING", "rule_2"), ("second", "WARNING", "rule_1")]
+    assert databases == [("first",), ("second",)]
+
+
+def test_warehouse_stages_streamed_tables(tmp_path: Path) -> None:
+    reader, writer = multiprocessing.Pipe(duplex=False)
+    with duckdb.connect() as local_db:
+        local_db.execute("create table readiness_check_summary as select 'PASS' as severity, 'rule_1' as rule_code")
+        local_db.execute("create table database_summary(collection_key varchar, database_name varchar)")
+        _send_tables(local_db, writer)
+    messages = []
+    while reader.poll():
+        messages.append(reader.recv())
+    with duckdb.connect() as fleet_db:
+        workflow = FleetCheck(fleet_db, [], get_console(), work_path=tmp_path, warehouse=True)
+        fleet_db.execute("attach ':memory:' as fleet_staging")
+        for table_name, batch in messages:
+            workflow.stage_batch(_target("first"), table_name, batch)
+        workflow.stage_batch(_target("second"), "readiness_check_summary", pa.record_batch({"rule_code": ["rule_2"]}))
+        workflow.stage_batch(_target("second"), "readiness_check_summary", pa.record_batch({"rule_code": ["rule_3"]}))
+        workflow.merge_staged(_target("second"))
+        workflow.merge_staged(_target("first"))
+        workflow.discard_staged(_target("first"))
+        workflow.stage_batch(_target("first"), "readiness_check_summary", pa.record_batch({"rule_code": ["rule_4"]}))
+        workflow.merge_staged(_target("first"))
+        workflow.discard_staged(_target("first"))
+        workflow.discard_staged(_target("second"))
+
+        summary = fleet_db.execute(
+            "select collection_key, severity, rule_code from readiness_check_summary order by all"
+        ).fetchall()
+        staged = fleet_db.execute(
+            "select count(*) from duckdb_tables() where database_name = 'fleet_staging'"
+        ).fetchone()
+
+    assert sorted(table_name for table_name, _ in messages) == ["readiness_check_summary"]
+    assert summary == [("first", None, "rule_4"), ("second", None, "rule_2"), ("second", None, "rule_3")]
+    assert staged == (0,)
+
+
+@pytest.mark.parametrize("warehouse", [False, True])
+def test_execute_retries_unreachable_targets(tmp_path: Path, warehouse: bool) -> None:
+    with duckdb.connect() as fleet_db:
+        workflow = FleetCheck(
+            fleet_db,
+            [_target("unreachable_1", port=1), _target("unreachable_2", port=1)],
+            get_console(),
+            work_path=tmp_path,
+            max_workers=2,
+            retries=1,
+            poll_interval=0.1,
+            warehouse=warehouse,
+        )
+        results = workflow.execute()
+        status = fleet_db.execute(
+            "select collection_key, status, attempts from fleet_check_status order by all"
+        ).fetchall()
+
+    assert {result.status for result in results} == {"FAILED"}
+    assert all(result.error for result in results)
+    assert status == [("unreachable_1", "FAILED", 2), ("unreachable_2", "FAILED", 2)]
+
+
+def test_workers_share_the_resource_profile(tmp_path: Path) -> None:
+    profile = ResourceProfile(threads=16, memory_limit_bytes=64 * 1024**3)
+
+    with duckdb.connect() as fleet_db:
+        workflow = FleetCheck(fleet_db, [], get_console(), work_path=tmp_path, max_workers=4, resource_profile=profile)
+
+    assert (workflow.worker_profile.threads, workflow.worker_profile.memory_limit_bytes) == (4, 16 * 1024**3)
@@ -176,3 +176,88 @@ def test_rds_db_version(database_version, expected_severity):
         ).fetchall()
         for row in rows:
             assert row[0] == expected_severity
+
+
+def _create_per_db_collection_tables(local_db: DuckDBPyConnection) -> None:
+    local_db.execute("create table collection_postgres_extensions (database_name varchar, extension_name varchar)")
+    local_db.execute(
+        "create table collection_postgres_pglogical_schema_usage_privilege (database_name varchar, has_schema_usage_privilege boolean)"
+    )
+    local_db.execute(
+        "create table collection_postgres_pglogical_privileges (database_name varchar, has_tables_select_privilege boolean, has_local_node_select_privilege boolean, has_node_select_privilege boolean, has_node_interface_select_privilege boolean)"
+    )
+    local_db.execute("create table collection_postgres_pglogical_provider_node (database_name varchar)")
+    local_db.execute(
+        "create table collection_postgres_user_schemas_without_privilege (database_name varchar, namespace_name varchar)"
+    )
+    for table in ("tables", "views"):
+        local_db.execute(
+            f"create table collection_postgres_user_{table}_without_privilege (database_name varchar, schema_name varchar, {table[:-1]}_name varchar)"
+        )
+    local_db.execute(
+        "create table collection_postgres_user_sequences_without_privilege (database_name varchar, namespace_name varchar, rel_name varchar)"
+    )
+    for table in ("tables_with_no_primary_key", "tables_with_primary_key_replica_identity"):
+        local_db.execute(
+            f"create table collection_postgres_{table} (database_name varchar, nspname varchar, relname varchar)"
+        )
+
+
+def test_check_databases():
+    with get_duckdb_connection() as local_db:
+        _create_per_db_collection_tables(local_db)
+        local_db.execute(
+            "insert into collection_postgres_extensions values ('db_node', 'pglogical'), ('db_denied', 'pglogical'), ('db_plain', 'plpgsql')"
+        )
+        local_db.execute(
+            "insert into collection_postgres_pglogical_schema_usage_privilege values ('db_node', true), ('db_denied', true)"
+        )
+        local_db.execute(
+            "insert into collection_postgres_pglogical_privileges values ('db_node', true, true, true, true), ('db_denied', false, true, true, true)"
+        )
+        local_db.execute("insert into collection_postgres_pglogical_provider_node values ('db_node')")
+        local_db.execute(
+            "insert into collection_postgres_user_tables_without_privilege values ('db_denied', 'app', 'orders')"
+        )
+        local_db.execute(
+            "insert into collection_postgres_tables_with_no_primary_key values ('db_plain', 'app', 'events')"
+        )
+        local_db.execute(
+            "insert into collection_postgres_tables_with_primary_key_replica_identity values ('db_node', 'app', 'users')"
+        )
+        executor = _dummy_postgres_readiness_executor(local_db)
+        results = executor._check_databases(["db_denied", "db_node", "db_plain"])
+
+    assert results["PGLOGICAL_INSTALLED"]["PASS"] == ["db_denied", "db_node"]
+    assert results["PGLOGICAL_INSTALLED"]["ACTION REQUIRED"] == ["db_plain"]
+    assert results["PRIVILEGES"]["ACTION REQUIRED"] == [
+        (
+            "user doesn't have SELECT privilege on table pglogical.tables\n"
+            "user doesn't have SELECT privilege on table app.orders in database db_denied"
+        )
+    ]
+    assert results["PRIVILEGES"]["PASS"] == ["User has all privileges required for migration for the database db_node"]
+    assert results["PGLOGICAL_NODE_ALREADY_EXISTS"]["ACTION REQUIRED"] == ["db_node"]
+    assert results["TABLES_WITH_NO_PK"]["WARNING"] == ["In database db_plain, app.events don't have primary keys"]
+    assert results["UNSUPPORTED_TABLES_WITH_REPLICA_IDENTITY"]["ACTION REQUIRED"] == ["app.users in database db_node"]
+
+
+def test_buffered_results():
+    with get_duckdb_connection() as local_db:
+        executor = _dummy_postgres_readiness_executor(local_db)
+        _create_readiness_check_summary_table(local_db)
+        with executor.buffered_results():
+            for idx in range(100):
+                executor.save_rule_result("ALLOYDB", f"RULE_{idx}", "WARNING", "buffered")
+            with executor.buffered_results():
+                executor.save_rule_result("CLOUDSQL", "NESTED", "PASS", "buffered")
+            buffered = local_db.sql("select count(*) from readiness_check_summary").fetchone()
+        written = local_db.sql(
+            "select count(*), count(distinct rule_code), min(severity) from readiness_check_summary"
+        ).fetchone()
+        executor.save_rule_result("ALLOYDB", "UNBUFFERED", "PASS", "written immediately")
+        unbuffered = local_db.sql("select count(*) from readiness_check_summary").fetchone()
+
+    assert buffered == (0,)
+    assert written == (101, 101, "PASS")
+    assert unbuffered == (102,)
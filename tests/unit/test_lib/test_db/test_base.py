@@ -0,0 +1,84 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.pool import QueuePool
+
+from dma.lib.db import base
+from dma.lib.db.base import EngineRegistry, SourceInfo
+
+pytestmark = pytest.mark.usefixtures("_clock")
+
+
+@pytest.fixture
+def _clock(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    now = [1000.0]
+    monkeypatch.setattr(base.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _source(hostname: str = "localhost") -> SourceInfo:
+    return SourceInfo(db_type="POSTGRES", username="dma", password="dma", hostname=hostname, port=5432)
+
+
+def test_engine_registry_shares_engines() -> None:
+    registry = EngineRegistry()
+
+    engine = registry.get_engine(_source(), "postgres")
+
+    assert registry.get_engine(_source(), "postgres") is engine
+    assert registry.get_engine(_source(), "other") is not engine
+    assert registry.get_engine(_source("replica"), "postgres") is not engine
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool._pre_ping
+    assert engine.pool.size() == registry.pool_size
+    assert len(registry) == 3
+
+
+def test_engine_registry_evicts_least_recently_used_engines() -> None:
+    registry = EngineRegistry(max_engines=2)
+    first = registry.get_engine(_source(), "first")
+    second = registry.get_engine(_source(), "second")
+    registry.get_engine(_source(), "first")
+
+    registry.get_engine(_source(), "third")
+
+    assert len(registry) == 2
+    assert registry.get_engine(_source(), "first") is first
+    assert registry.get_engine(_source(), "second") is not second
+
+
+def test_engine_registry_evicts_idle_engines(_clock: list[float]) -> None:
+    registry = EngineRegistry(idle_timeout=60)
+    idle = registry.get_engine(_source(), "idle")
+    _clock[0] += 30
+    active = registry.get_engine(_source(), "active")
+    _clock[0] += 45
+
+    registry.evict_idle()
+
+    assert len(registry) == 1
+    assert registry.get_engine(_source(), "active") is active
+    assert registry.get_engine(_source(), "idle") is not idle
+
+
+def test_engine_registry_dispose() -> None:
+    registry = EngineRegistry()
+    engine = registry.get_engine(_source(), "postgres")
+
+    registry.dispose()
+
+    assert len(registry) == 0
+    assert registry.get_engine(_source(), "postgres") is not engine
@@ -0,0 +1,82 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import threading
+import time
+
+from dma.lib.db.governor import MAX_BACK_OFF, MIN_BACK_OFF, CollectionGovernor, SourceLimits
+
+
+def test_throttles_on_latency_and_active_sessions() -> None:
+    governor = CollectionGovernor(SourceLimits(max_active_sessions=10, latency_threshold=0.5), max_concurrency=8)
+
+    assert governor.observe("collection_a", latency=0.01, active_sessions=3) is None
+    slow = governor.observe("collection_b", latency=2.0, active_sessions=3)
+    busy = governor.observe("collection_c", latency=0.01, active_sessions=25)
+
+    assert slow is not None
+    assert busy is not None
+    assert (slow.action, slow.concurrency, slow.back_off) == ("throttle", 4, MIN_BACK_OFF)
+    assert (busy.action, busy.concurrency, busy.back_off) == ("throttle", 2, MIN_BACK_OFF * 2)
+    assert busy.reason == "25 active sessions on the source"
+    assert governor.decisions == [slow, busy]
+
+
+def test_recovers_one_slot_at_a_time() -> None:
+    governor = CollectionGovernor(SourceLimits(latency_threshold=0.5), max_concurrency=4)
+    for _ in range(10):
+        governor.observe("collection_a", latency=5.0, active_sessions=None)
+    assert (governor.concurrency, governor.back_off) == (1, MAX_BACK_OFF)
+
+    recovered = [governor.observe("collection_a", latency=0.01, active_sessions=None) for _ in range(10)]
+
+    assert [decision.concurrency for decision in recovered if decision is not None][:3] == [2, 3, 4]
+    assert (governor.concurrency, governor.back_off) == (4, 0.0)
+    assert recovered[-1] is None
+    assert len(governor.drain_decisions()) > 10
+    assert governor.decisions == []
+
+
+def test_slots_are_limited_to_the_concurrency() -> None:
+    governor = CollectionGovernor(max_concurrency=4)
+    governor.concurrency = 2
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def _run() -> None:
+        nonlocal running, peak
+        with governor.slot():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=_run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+
+
+def test_samples_once_per_interval() -> None:
+    governor = CollectionGovernor(SourceLimits(sample_interval=60.0))
+
+    assert governor.claim_sample()
+    assert not governor.claim_sample()
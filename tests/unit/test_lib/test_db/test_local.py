@@ -0,0 +1,126 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from dma.lib.db.local import (
+    MEMORY_LIMIT_ENV,
+    TEMP_DIRECTORY_ENV,
+    THREADS_ENV,
+    get_duckdb_connection,
+    resolve_resource_profile,
+)
+from dma.lib.exceptions import ApplicationError
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+pytestmark = pytest.mark.usefixtures("_clear_resource_env")
+
+_GIB = 1024**3
+
+
+@pytest.fixture
+def _clear_resource_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    for env in (THREADS_ENV, MEMORY_LIMIT_ENV, TEMP_DIRECTORY_ENV):
+        monkeypatch.delenv(env, raising=False)
+
+
+@pytest.fixture
+def host(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A host with 64 CPUs and 256 GiB of memory."""
+    monkeypatch.setattr("os.sched_getaffinity", lambda _: set(range(64)), raising=False)
+    monkeypatch.setattr("os.sysconf", lambda name: {"SC_PAGE_SIZE": 4096, "SC_PHYS_PAGES": 256 * _GIB // 4096}[name])
+
+
+@pytest.mark.usefixtures("host")
+def test_resource_profile_from_host(tmp_path: Path) -> None:
+    profile = resolve_resource_profile(cgroup_root=tmp_path)
+
+    assert (profile.threads, profile.threads_source) == (64, "host")
+    assert profile.memory_limit_bytes == int(256 * _GIB * 0.8)
+    assert profile.temp_directory is None
+
+
+@pytest.mark.usefixtures("host")
+def test_resource_profile_from_cgroup_v2(tmp_path: Path) -> None:
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    (tmp_path / "memory.max").write_text(f"{4 * _GIB}\n")
+
+    profile = resolve_resource_profile(cgroup_root=tmp_path)
+
+    assert (profile.threads, profile.threads_source) == (3, "cgroup")
+    assert (profile.memory_limit_bytes, profile.memory_limit_source) == (
+        int(4 * _GIB * 0.8),
+        "80% of cgroup memory",
+    )
+
+
+@pytest.mark.usefixtures("host")
+def test_resource_profile_from_cgroup_v1(tmp_path: Path) -> None:
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text("9223372036854771712\n")
+
+    profile = resolve_resource_profile(cgroup_root=tmp_path)
+
+    assert (profile.threads, profile.threads_source) == (64, "host")
+    assert profile.memory_limit_source == "80% of host memory"
+
+
+@pytest.mark.usefixtures("host")
+def test_resource_profile_overrides(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(THREADS_ENV, "16")
+    monkeypatch.setenv(MEMORY_LIMIT_ENV, "25%")
+    monkeypatch.setenv(TEMP_DIRECTORY_ENV, str(tmp_path / "spill"))
+
+    profile = resolve_resource_profile(cgroup_root=tmp_path)
+    assert (profile.threads, profile.memory_limit_bytes, profile.temp_directory) == (16, 64 * _GIB, tmp_path / "spill")
+    assert profile.threads_source == THREADS_ENV
+
+    profile = resolve_resource_profile(threads=8, memory_limit="512MiB", cgroup_root=tmp_path)
+    assert (profile.threads, profile.memory_limit_bytes) == (8, 512 * 1024**2)
+    assert profile.memory_limit_source == "option"
+
+
+@pytest.mark.parametrize("memory_limit", ["lots", "4XB", "-1GB"])
+def test_resource_profile_rejects_invalid_memory_limit(tmp_path: Path, memory_limit: str) -> None:
+    with pytest.raises(ApplicationError, match="Invalid DuckDB memory limit"):
+        resolve_resource_profile(memory_limit=memory_limit, cgroup_root=tmp_path)
+
+
+def test_get_duckdb_connection_applies_resource_profile(tmp_path: Path) -> None:
+    profile = resolve_resource_profile(threads=3, memory_limit="2GiB", temp_directory=tmp_path / "spill")
+
+    with get_duckdb_connection(working_path=tmp_path, resource_profile=profile) as local_db:
+        assert local_db.execute(
+            "select current_setting('threads'), current_setting('memory_limit'), current_setting('temp_directory')"
+        ).fetchone() == (3, "2.0 GiB", str(tmp_path / "spill"))
+    assert (tmp_path / "spill").is_dir()
+
+
+def test_resource_profile_divided_between_workers(tmp_path: Path) -> None:
+    profile = resolve_resource_profile(threads=8, memory_limit="8GiB", cgroup_root=tmp_path)
+
+    worker_profile = profile.divide(3)
+
+    assert (worker_profile.threads, worker_profile.memory_limit_bytes) == (2, 8 * _GIB // 3)
+    assert worker_profile.memory_limit_source == "option, split between 3 workers"
+    assert profile.divide(16).threads == 1
+    assert profile.divide(1) is profile
@@ -0,0 +1,144 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import inspect
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from dma.lib.db import query_registry
+from dma.lib.db.query_manager import QueryManager
+from dma.lib.db.query_registry import QUERY_CACHE_ENV, get_query_cache_dir, load_queries
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+_QUERIES = """
+-- name: select-version
+select 1 as version;
+
+-- name: select-table-names
+-- Tables of a schema.
+select table_name from information_schema.tables where table_schema = :schema_name;
+"""
+
+
+@pytest.fixture
+def sql_path(tmp_path: Path) -> Path:
+    path = tmp_path / "sql"
+    path.mkdir()
+    (path / "queries.sql").write_text(_QUERIES, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    monkeypatch.setenv(QUERY_CACHE_ENV, str(tmp_path / "cache"))
+    load_queries.cache_clear()
+    yield tmp_path / "cache"
+    load_queries.cache_clear()
+
+
+def test_load_queries_reuses_the_query_cache(sql_path: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    queries = load_queries(sql_path, "duckdb")
+    cache_files = list(cache_dir.glob("duckdb-*.json"))
+    load_queries.cache_clear()
+    monkeypatch.setattr(query_registry, "QueryLoader", None)
+
+    cached_queries = load_queries(sql_path, "duckdb")
+
+    assert queries.available_queries == [
+        "select_table_names",
+        "select_table_names_cursor",
+        "select_version",
+        "select_version_cursor",
+    ]
+    assert cached_queries.available_queries == queries.available_queries
+    assert (
+        QueryManager(None, cached_queries).fn("select_version").sql
+        == QueryManager(None, queries).fn("select_version").sql
+    )
+    cached_fn = QueryManager(None, cached_queries).fn("select_table_names")
+    fn = QueryManager(None, queries).fn("select_table_names")
+    assert (cached_fn.sql, cached_fn.__doc__, inspect.signature(cached_fn)) == (
+        fn.sql,
+        fn.__doc__,
+        inspect.signature(fn),
+    )
+    assert len(cache_files) == 1
+    assert load_queries(sql_path, "duckdb") is cached_queries
+
+
+def test_load_queries_parses_changed_files(sql_path: Path, cache_dir: Path) -> None:
+    load_queries(sql_path, "duckdb")
+    load_queries.cache_clear()
+    (sql_path / "more.sql").write_text("-- name: select-name\nselect 'dma' as name;\n", encoding="utf-8")
+
+    queries = load_queries(sql_path, "duckdb")
+
+    assert "select_name" in queries.available_queries
+    assert len(list(cache_dir.glob("duckdb-*.json"))) == 2
+
+
+def test_load_queries_ignores_a_corrupt_cache(sql_path: Path, cache_dir: Path) -> None:
+    load_queries(sql_path, "duckdb")
+    load_queries.cache_clear()
+    for cache_file in cache_dir.glob("duckdb-*.json"):
+        cache_file.write_bytes(b"not json")
+
+    queries = load_queries(sql_path, "duckdb")
+
+    assert "select_version" in queries.available_queries
+
+
+def test_load_queries_ignores_a_cache_other_users_can_write(
+    sql_path: Path, cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    load_queries(sql_path, "duckdb")
+    load_queries.cache_clear()
+    [cache_file] = cache_dir.glob("duckdb-*.json")
+    cache_file.chmod(0o666)
+    loads: list[object] = []
+    monkeypatch.setattr(query_registry, "_load_query_data", loads.append)
+
+    queries = load_queries(sql_path, "duckdb")
+
+    assert "select_version" in queries.available_queries
+    assert loads == []
+
+
+def test_query_cache_can_be_disabled(sql_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(QUERY_CACHE_ENV, "")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert get_query_cache_dir() is None
+    assert "select_version" in load_queries.__wrapped__(sql_path, "duckdb").available_queries
+    assert not (tmp_path / "dma").exists()
+
+
+def test_cli_import_does_not_parse_queries() -> None:
+    code = (
+        "import sys\n"
+        "from aiosql.query_loader import QueryLoader\n"
+        "QueryLoader.load_query_data_from_dir_path = None\n"
+        "import dma.cli.main\n"
+        "print('loaded')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=False)
+
+    assert result.stdout.strip() == "loaded", result.stderr
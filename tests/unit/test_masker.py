@@ -0,0 +1,270 @@
+# Copyright 2024 Google LLC
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#     https://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import random
+import sys
+import tarfile
+import zipfile
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+_masker_path = Path(__file__).parents[2] / "scripts" / "masker" / "dma-collection-masker"
+
+_tag = "190000_4.3.47_dbhost01_ORCL_ORCL1_240101120000"
+_pkey = "dbhost01_ORCL_240101120000"
+_source_id = "dbhost01_ORCL1_1234567890"
+
+
+def _rows(*rows: tuple[str, ...]) -> str:
+    return "".join("|".join(row) + "\n" for row in rows)
+
+
+_collection_files = {
+    f"opdb__dbobjects__{_tag}.csv": _rows(
+        ("PKEY", "CON_ID", "OWNER", "OBJECT_TYPE", "CNT", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "0", "HR", "TABLE", "7", _source_id, ""),
+        (_pkey, "0", "HR", "INDEX", "12", _source_id, ""),
+        (_pkey, "0", "SALES", "TABLE", "3", _source_id, ""),
+        (_pkey, "0", "SYS", "TABLE", "1200", _source_id, ""),
+        (_pkey, "0", "APEX_050000", "TABLE", "410", _source_id, ""),
+    ),
+    f"opdb__columntypes__{_tag}.csv": _rows(
+        ("PKEY", "CON_ID", "OWNER", "TABLE_NAME", "DATA_TYPE", "CNT", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "0", "HR", "EMPLOYEES", "NUMBER", "4", _source_id, ""),
+        (_pkey, "0", "HR", "DEPARTMENTS", "VARCHAR2", "2", _source_id, ""),
+        (_pkey, "0", "SALES", "EMPLOYEES", "NUMBER", "5", _source_id, ""),
+        (_pkey, "0", "SYS", "OBJ$", "NUMBER", "9", _source_id, ""),
+    ),
+    f"opdb__users__{_tag}.csv": _rows(
+        ("PKEY", "CON_ID", "USERNAME", "DEFAULT_TABLESPACE", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "0", "HR", "USERS", _source_id, ""),
+        (_pkey, "0", "SCOTT", "USERS", _source_id, ""),
+        (_pkey, "0", "SYSTEM", "SYSTEM", _source_id, ""),
+    ),
+    f"opdb__dbsummary__{_tag}.csv": _rows(
+        ("PKEY", "DBID", "DB_NAME", "CDB", "DB_VERSION", "DB_UNIQUE_NAME", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "1234", "ORCL", "NO", "19.0.0.0.0", "ORCL_PRIMARY", _source_id, ""),
+    ),
+    f"opdb__dbinstances__{_tag}.csv": _rows(
+        ("PKEY", "INST_ID", "INSTANCE_NAME", "HOST_NAME", "VERSION", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "1", "ORCL1", "dbhost01", "19.0.0.0.0", _source_id, ""),
+    ),
+    f"opdb__dbparameters__{_tag}.csv": _rows(
+        ("PKEY", "CON_ID", "INST_ID", "NAME", "VALUE", "DEFAULT_VALUE", "DMA_SOURCE_ID", "DMA_MANUAL_ID"),
+        (_pkey, "0", "1", "diagnostic_dest", "/u01/app/oracle", "/u01/app/oracle", _source_id, ""),
+        (_pkey, "0", "1", "processes", "300", "100", _source_id, ""),
+    ),
+    f"opdb__app_cloud__{_tag}.csv": "SCHEMA: HR\nSCHEMA: SALES\n",
+    f"opdb__defines__{_tag}.csv": "DEFINE V_TAG = dbhost01_ORCL\n",
+    f"opdb__{_tag}_errors.log": "",
+}
+
+# The cells masked by the masker before collection files were masked in a single pass, by table and (row, column).
+_baseline_masked_cells = {
+    "app_cloud": [(0, 1), (1, 1)],
+    "columntypes": [
+        *((1, 0), (1, 2), (1, 3), (1, 6)),
+        *((2, 0), (2, 2), (2, 3), (2, 6)),
+        *((3, 0), (3, 2), (3, 3), (3, 6)),
+        *((4, 0), (4, 3), (4, 6)),
+    ],
+    "dbinstances": [(1, 0), (1, 2), (1, 3), (1, 5)],
+    "dbobjects": [
+        *((1, 0), (1, 2), (1, 5)),
+        *((2, 0), (2, 2), (2, 5)),
+        *((3, 0), (3, 2), (3, 5)),
+        *((4, 0), (4, 5)),
+        *((5, 0), (5, 5)),
+    ],
+    "dbparameters": [(1, 0), (1, 4), (1, 5), (1, 6), (2, 0), (2, 6)],
+    "dbsummary": [(1, 0), (1, 2), (1, 5), (1, 6)],
+    "log": [],
+    "users": [(1, 0), (1, 2), (1, 4), (2, 0), (2, 2), (2, 4), (3, 0), (3, 4)],
+}
+
+
+@pytest.fixture(scope="module")
+def masker() -> ModuleType:
+    loader = SourceFileLoader("dma_collection_masker", str(_masker_path))
+    spec = spec_from_loader(loader.name, loader)
+    assert spec is not None
+    module = module_from_spec(spec)
+    # registered so that worker processes can find the masking functions
+    sys.modules[loader.name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _manifest_lines(files: dict[str, bytes]) -> str:
+    return "".join(
+        f"oracle|{hashlib.md5(contents, usedforsecurity=False).hexdigest()}|{name}\n"
+        for name, contents in sorted(files.items())
+        if "opdb__manifest" not in name
+    )
+
+
+def _manifest(archive: Path) -> str:
+    with zipfile.ZipFile(archive) as f:
+        return _manifest_lines({info.filename: f.read(info) for info in f.infolist()})
+
+
+def _write_collection(input_dir: Path, tag: str = _tag, suffix: str = ".zip") -> Path:
+    input_dir.mkdir(parents=True, exist_ok=True)
+    collection = input_dir / f"opdb_oracle_NoDiag__{tag}{suffix}"
+    files = {name.replace(_tag, tag): contents.encode() for name, contents in _collection_files.items()}
+    files[f"opdb__manifest__{tag}.txt"] = _manifest_lines(files).encode()
+    if suffix == ".zip":
+        with zipfile.ZipFile(collection, "w") as archive:
+            for name, contents in files.items():
+                archive.writestr(name, contents)
+    else:
+        with tarfile.open(collection, "w:gz") as archive:
+            for name, contents in files.items():
+                info = tarfile.TarInfo(f"./{name}")
+                info.size = len(contents)
+                archive.addfile(info, io.BytesIO(contents))
+    return collection
+
+
+def _table_name(member_name: str) -> str:
+    parts = member_name.split("__")
+    return parts[1] if len(parts) == 3 else "log"
+
+
+def _read_members(archive: Path) -> dict[str, str]:
+    if archive.suffix == ".zip":
+        with zipfile.ZipFile(archive) as f:
+            return {_table_name(info.filename): f.read(info).decode() for info in f.infolist()}
+    with tarfile.open(archive) as f:
+        return {
+            _table_name(info.name): member.read().decode()
+            for info in f.getmembers()
+            if (member := f.extractfile(info)) is not None
+        }
+
+
+def _read_archives(output_path: Path) -> dict[str, dict[str, bytes]]:
+    archives = {}
+    for archive in sorted(output_path.glob("*.zip")):
+        with zipfile.ZipFile(archive) as f:
+            archives[archive.name] = {info.filename: f.read(info) for info in f.infolist()}
+    return archives
+
+
+def _read_key(input_dir: Path) -> dict[str, str]:
+    [key_file] = input_dir.glob("*.key")
+    lines = key_file.read_text(encoding="utf-8").splitlines()[2:]
+    return dict(csv.reader(lines, delimiter="|", quotechar='"'))
+
+
+def _parse(table_name: str, contents: str) -> list[list[str]]:
+    delimiter = ":" if table_name == "app_cloud" else "|"
+    return [[cell.strip() for cell in row] for row in csv.reader(io.StringIO(contents), delimiter=delimiter)]
+
+
+def _masked_cells(original: dict[str, str], masked: dict[str, str]) -> dict[str, list[tuple[int, int]]]:
+    cells = {}
+    for table_name, contents in original.items():
+        if table_name in {"defines", "manifest"}:
+            continue
+        original_rows, masked_rows = _parse(table_name, contents), _parse(table_name, masked[table_name])
+        assert len(original_rows) == len(masked_rows)
+        cells[table_name] = [
+            (rn, cn)
+            for rn, (original_row, masked_row) in enumerate(zip(original_rows, masked_rows, strict=True))
+            for cn, (original_value, masked_value) in enumerate(zip(original_row, masked_row, strict=True))
+            if original_value != masked_value
+        ]
+    return cells
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_masks_the_baseline_cells(masker: ModuleType, tmp_path: Path, suffix: str) -> None:
+    collection = _write_collection(tmp_path / "input", suffix=suffix)
+    masker.run_masker(tmp_path / "input", tmp_path / "masked")
+
+    [masked_collection] = (tmp_path / "masked").glob("*.zip")
+    original, masked = _read_members(collection), _read_members(masked_collection)
+    identity_map = _read_key(tmp_path / "input")
+
+    assert _masked_cells(original, masked) == _baseline_masked_cells
+    for table_name, cells in _baseline_masked_cells.items():
+        original_rows, masked_rows = _parse(table_name, original[table_name]), _parse(table_name, masked[table_name])
+        for rn, cn in cells:
+            assert masked_rows[rn][cn] == identity_map[original_rows[rn][cn]]
+    assert "DMA_MASKER applied" in masked["defines"]
+    assert masked["manifest"] == _manifest(masked_collection)
+
+
+def test_identity_map_is_one_to_one(masker: ModuleType, tmp_path: Path) -> None:
+    _write_collection(tmp_path / "input")
+    masker.run_masker(tmp_path / "input", tmp_path / "masked")
+
+    identity_map = _read_key(tmp_path / "input")
+
+    assert len(set(identity_map.values())) == len(identity_map)
+
+
+@pytest.mark.parametrize(("collections", "suffix"), [(1, ".zip"), (1, ".tar.gz"), (2, ".zip")])
+def test_masked_output_does_not_depend_on_jobs(
+    masker: ModuleType, tmp_path: Path, collections: int, suffix: str
+) -> None:
+    for date_time in ("240101120000", "240102120000")[:collections]:
+        _write_collection(tmp_path / "input", _tag.replace("240101120000", date_time), suffix)
+
+    outputs = []
+    for jobs in (1, 4):
+        random.seed(20240101)
+        masker.run_masker(tmp_path / "input", tmp_path / f"masked_{jobs}", jobs=jobs)
+        key_files = {key_file.name: key_file.read_text() for key_file in (tmp_path / "input").glob("*.key")}
+        outputs.append((_read_archives(tmp_path / f"masked_{jobs}"), key_files))
+
+    assert len(outputs[0][0]) == collections
+    assert outputs[0] == outputs[1]
+
+
+def test_identity_store_masks_collections_the_same_way_across_runs(masker: ModuleType, tmp_path: Path) -> None:
+    _write_collection(tmp_path / "input")
+
+    outputs = []
+    for seed in (1, 2):
+        random.seed(seed)
+        masker.fake.dbid = str(seed) * 10
+        masker.run_masker(tmp_path / "input", tmp_path / f"masked_{seed}", identity_store=tmp_path / "identity.db")
+        outputs.append(_read_archives(tmp_path / f"masked_{seed}"))
+
+    assert outputs[0] == outputs[1]
+
+
+def test_identity_store_keeps_replacements_unique(masker: ModuleType, tmp_path: Path) -> None:
+    store = masker.IdentityStore(tmp_path / "identity.db")
+    try:
+        assert store.add(masker.DataMaskTypes.SCHEMA_NAME, "HR", "USER_A") == "USER_A"
+        assert store.add(masker.DataMaskTypes.SCHEMA_NAME, "HR", "USER_B") == "USER_A"
+        assert store.add(masker.DataMaskTypes.SCHEMA_NAME, "SALES", "USER_A") is None
+        assert store.add(masker.DataMaskTypes.OBJECT_NAME, "SALES", "USER_A") == "USER_A"
+        assert store.get(masker.DataMaskTypes.SCHEMA_NAME, "SALES") is None
+    finally:
+        store.close()